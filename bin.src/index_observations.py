@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from astro_metadata_translator import ObservationIndex, find_files
+
+parser = argparse.ArgumentParser(description="Build and query an index of translated headers")
+parser.add_argument("database", type=str, help="SQLite database file holding the index.")
+subparsers = parser.add_subparsers(dest="command")
+subparsers.required = True
+
+add_parser = subparsers.add_parser("add", help="Translate files and add them to the index")
+add_parser.add_argument("files", metavar="file", type=str, nargs="+",
+                        help="File(s) to index.  Directories are searched recursively for files"
+                        " matching the regular expression defined in --regex.")
+re_default = r"\.fit[s]?\b"
+add_parser.add_argument("--regex", "-r", default=re_default,
+                        help="When looking in a directory, regular expression to use to determine whether"
+                        f" a file should be examined. Default: '{re_default}'")
+add_parser.add_argument("--hdu", type=int, default=1, help="Header data unit to read. Default: 1")
+add_parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of reader threads to use.")
+
+update_parser = subparsers.add_parser("update", help="Translate new and changed files and mark deleted"
+                                      " files in the index")
+update_parser.add_argument("files", metavar="file", type=str, nargs="*",
+                           help="File(s) that should be in the index.  Directories are searched"
+                           " recursively for files matching the regular expression defined in --regex."
+                           " If no files are given only files with outdated translations are updated.")
+update_parser.add_argument("--regex", "-r", default=re_default,
+                           help="When looking in a directory, regular expression to use to determine"
+                           f" whether a file should be examined. Default: '{re_default}'")
+update_parser.add_argument("--hdu", type=int, default=1, help="Header data unit to read. Default: 1")
+update_parser.add_argument("-j", "--jobs", type=int, default=None, help="Number of reader threads to use.")
+
+query_parser = subparsers.add_parser("query", help="Find observations in the index")
+query_parser.add_argument("--instrument", help="Instrument name.")
+query_parser.add_argument("--filter", dest="physical_filter", help="Physical filter name.")
+query_parser.add_argument("--type", dest="observation_type", help="Observation type, e.g. science.")
+query_parser.add_argument("--exposure", dest="exposure_id", type=int, help="Exposure ID.")
+query_parser.add_argument("--begin", help="Earliest start time (ISO-8601 UTC).")
+query_parser.add_argument("--end", help="Latest start time (ISO-8601 UTC), exclusive.")
+query_parser.add_argument("--where", help="Additional SQL constraint on the index columns.")
+query_parser.add_argument("--limit", type=int, help="Maximum number of results.")
+query_parser.add_argument("--columns", default="instrument,exposure_id,physical_filter,observation_type",
+                          help="Comma-separated columns to report after the path.")
+
+args = parser.parse_args()
+
+with ObservationIndex(args.database) as index:
+    if args.command == "add":
+        n_added, failed = index.add_files(find_files(args.files, args.regex, recursive=True),
+                                          hdu=args.hdu, max_workers=args.jobs)
+        print(f"Added {n_added} files to {args.database}", file=sys.stderr)
+        if failed:
+            print("Files with failed translations:", file=sys.stderr)
+            for file, error in failed:
+                print(f"\t{file}: {error!r}", file=sys.stderr)
+    elif args.command == "update":
+        if args.files:
+            summary = index.update(find_files(args.files, args.regex, recursive=True),
+                                   hdu=args.hdu, max_workers=args.jobs)
+        else:
+            summary = index.update_outdated(hdu=args.hdu, max_workers=args.jobs)
+        print(", ".join(f"{value} {key}" for key, value in summary.items() if key != "failed"),
+              file=sys.stderr)
+        if summary["failed"]:
+            print("Files with failed translations:", file=sys.stderr)
+            for file, error in summary["failed"]:
+                print(f"\t{file}: {error!r}", file=sys.stderr)
+    else:
+        columns = [c for c in args.columns.split(",") if c]
+        for row in index.query(instrument=args.instrument, physical_filter=args.physical_filter,
+                               observation_type=args.observation_type, exposure_id=args.exposure_id,
+                               begin=args.begin, end=args.end, where=args.where, limit=args.limit):
+            print("\t".join([row["path"]] + [str(row[c]) for c in columns]))
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import argparse
+import sys
+from astro_metadata_translator import merge_shards, make_writer, write_observation_store, OUTPUT_FORMATS
+
+parser = argparse.ArgumentParser(description="Combine the outputs of sharded translate_header.py runs and"
+                                 " report observations that were translated more than once.")
+parser.add_argument("shards", metavar="shard", type=str, nargs="+",
+                    help="JSON Lines output (--format jsonl) or journal (--journal) of each shard.")
+parser.add_argument("--format", "-f", choices=list(OUTPUT_FORMATS), default="jsonl",
+                    help="Format of the combined table. Default: 'jsonl'")
+parser.add_argument("--output", "-o", default=None,
+                    help="File to write the combined table to. Default: standard output")
+parser.add_argument("--store", default=None,
+                    help="Write the combined translations to an observation store in this directory"
+                    " instead of a table.")
+
+args = parser.parse_args()
+
+if args.store:
+    rows, duplicates = merge_shards(args.shards)
+    write_observation_store(args.store, rows, overwrite=True)
+else:
+    output = sys.stdout
+    if args.output:
+        output = open(args.output, "wb" if OUTPUT_FORMATS[args.format].binary else "w")
+    try:
+        try:
+            writer = make_writer(args.format, output)
+        except ImportError as e:
+            parser.error(str(e))
+        with writer:
+            rows, duplicates = merge_shards(args.shards, writer=writer)
+    finally:
+        if args.output:
+            output.close()
+
+print(f"Merged {len(rows)} translations from {len(args.shards)} shards", file=sys.stderr)
+if duplicates:
+    print("Observations translated from more than one file (instrument, exposure_id,"
+          " detector_exposure_id):", file=sys.stderr)
+    for key, files in duplicates.items():
+        print(f"\t{key}: {', '.join(files)}", file=sys.stderr)
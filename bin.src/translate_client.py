@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+# Deliberately only uses the standard library so that it starts quickly.
+
+import argparse
+import json
+import os
+import socket
+import sys
+
+parser = argparse.ArgumentParser(description="Translate headers using a server started with"
+                                 " translate_header.py --serve. Writes one JSON object per file"
+                                 " to standard output.")
+parser.add_argument("socket", help="Unix socket of the translation server.")
+parser.add_argument("files", metavar="file", type=str, nargs="*",
+                    help="File(s) to translate. Read from standard input, one per line, if none given.")
+parser.add_argument("--hdu", type=int, default=None,
+                    help="Header data unit to read. Default: chosen by the server")
+
+args = parser.parse_args()
+
+files = args.files if args.files else (line.strip() for line in sys.stdin if line.strip())
+
+failed = []
+with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+    sock.connect(args.socket)
+    with sock.makefile("rb") as responses:
+        for file in files:
+            request = {"file": os.path.abspath(file)}
+            if args.hdu is not None:
+                request["hdu"] = args.hdu
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            response = json.loads(responses.readline())
+            if "error" in response:
+                print(f"{file}: {response['error']}", file=sys.stderr)
+                failed.append(file)
+            else:
+                print(json.dumps(dict(path=file, **response["observation"])))
+
+if failed:
+    sys.exit(1)
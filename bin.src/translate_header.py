@@ -1,26 +1,16 @@
 #!/usr/bin/env python3
 
 import argparse
-import os
-import re
+import signal
 import sys
 import traceback
 import yaml
-from astro_metadata_translator import ObservationInfo
-
-# Prefer afw over Astropy
-try:
-    from lsst.afw.fits import readMetadata as read_metadata  # noqa: N813
-    import lsst.daf.base  # noqa: F401 need PropertyBase for readMetadata
-except ImportError:
-    from astropy.io import fits
-
-    def read_metadata(file, hdu=1):
-        fits_file = fits.open(file)
-        return fits_file[hdu].header
+from astro_metadata_translator import ObservationInfo, read_basic_metadata_from_file, find_files, \
+    make_writer, OUTPUT_FORMATS, determine_translator_from_file, TranslationServer, TranslationJournal, \
+    parse_shard, select_shard, SHARD_KEYS
 
 parser = argparse.ArgumentParser(description="Summarize headers from astronomical data files")
-parser.add_argument("files", metavar="file", type=str, nargs="+",
+parser.add_argument("files", metavar="file", type=str, nargs="*",
                     help="File(s) from which headers will be parsed."
                     " If a directory is given it will be scanned for files matching the regular"
                     " expression defined in --regex.")
@@ -36,37 +26,144 @@ parser.add_argument("--regex", "-r", default=re_default,
                     help="When looking in a directory, regular expression to use to determine whether"
                     f" a file should be examined. Default: '{re_default}'")
 
+parser.add_argument("--format", "-f", choices=["text"] + list(OUTPUT_FORMATS), default="text",
+                    help="Format of the translations written to standard output or --output."
+                    " 'text' gives a human-readable summary of each header, the other formats"
+                    " give one table row per file. Default: 'text'")
+parser.add_argument("--output", "-o", default=None,
+                    help="File to write the table to when using a tabular --format."
+                    " Default: standard output")
+
+parser.add_argument("--serve", metavar="SOCKET", default=None,
+                    help="Rather than translating files, run a server translating files and headers"
+                    " sent to this Unix socket until interrupted. See translate_client.py.")
+parser.add_argument("--hdu", type=int, default=1, help="Header data unit to read. Default: 1")
+parser.add_argument("--whitelist-cards", const=True, default=False, action="store_const",
+                    help="Only parse the header cards that the translator declares that it reads. Faster,"
+                    " but translations that read other cards will fail.")
+parser.add_argument("--journal", default=None,
+                    help="Append the result of translating each file to this checkpoint journal.")
+parser.add_argument("--resume", const=True, default=False, action="store_const",
+                    help="Do not translate files already recorded in --journal, reporting the"
+                    " recorded results instead.")
+parser.add_argument("--shard", default=None, metavar="i/N",
+                    help="Only translate the files in shard i of N, counting from zero. Shards are"
+                    " assigned by hashing the paths so independent runs over the same file list"
+                    " agree. Combine the outputs with merge_shards.py.")
+parser.add_argument("--shard-by", choices=SHARD_KEYS, default="path",
+                    help="Assign files to shards individually or by directory. Default: 'path'")
+
 args = parser.parse_args()
 
+if args.serve:
+    try:
+        server = TranslationServer(args.serve, hdu=args.hdu, pedantic=True,
+                                   translation_cards_only=args.whitelist_cards)
+    except OSError as e:
+        parser.error(str(e))
+    # Clean up the socket when terminated
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Serving translations on {args.serve}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    sys.exit(0)
+
+if not args.files:
+    parser.error("At least one file is required unless --serve is given")
+if args.resume and not args.journal:
+    parser.error("--resume requires --journal")
+if args.journal and args.dumphdr:
+    parser.error("--journal can not be used with --dumphdr")
+
+files = find_files(args.files, args.regex)
+if args.shard:
+    try:
+        shard, n_shards = parse_shard(args.shard)
+    except ValueError as e:
+        parser.error(str(e))
+    files = select_shard(files, shard, n_shards, by=args.shard_by)
+
+# Results of files translated by an earlier run
+previous = TranslationJournal.read(args.journal) if args.resume else {}
+journal = TranslationJournal(args.journal) if args.journal else None
+
+# Report problems on stderr when stdout carries a table
+report = sys.stdout if args.format == "text" or args.output else sys.stderr
+
 
-def read_file(file, failed):
+def read_file(file, failed, writer=None):
+    record = previous.get(file)
+    if record is not None and "error" in record:
+        print(f"Previously failed {file}: {record['error']}", file=report)
+        failed.append(file)
+        return
     print(f"Analyzing {file}...", file=sys.stderr)
     try:
-        md = read_metadata(file)
-        if args.dumphdr:
-            print(yaml.dump(md))
-            return
-        obs_info = ObservationInfo(md, pedantic=True)
-        if not args.quiet:
+        if record is not None:
+            obs_info = ObservationInfo.from_simple(record["observation"])
+        else:
+            obs_info = translate_file(file)
+            if obs_info is None:
+                return
+        if writer is not None:
+            writer.write(file, obs_info)
+        elif not args.quiet:
             print(f"{obs_info}")
+        if journal is not None and record is None:
+            journal.record(file, obs_info)
     except Exception as e:
         if args.traceback:
-            traceback.print_exc(file=sys.stdout)
+            traceback.print_exc(file=report)
         else:
-            print(repr(e))
+            print(repr(e), file=report)
+        if journal is not None and record is None:
+            journal.record_failure(file, e)
         failed.append(file)
 
 
-file_regex = re.compile(args.regex)
+def translate_file(file):
+    """Translate a file, or dump its header and return `None`."""
+    translator_class = None
+    if not args.dumphdr:
+        # Reject unsupported files before parsing the full header
+        translator_class = determine_translator_from_file(file, hdu=args.hdu)
+    keywords = None
+    if args.whitelist_cards and translator_class is not None:
+        # Only the cards needed for translation are parsed
+        keywords = translator_class.translation_cards()
+    md = read_basic_metadata_from_file(file, hdu=args.hdu, keywords=keywords)
+    if args.dumphdr:
+        print(yaml.dump(md))
+        return None
+    return ObservationInfo(md, translator_class=translator_class, pedantic=True)
+
+
 failed = []
-for file in args.files:
-    if os.path.isdir(file):
-        for name in os.listdir(file):
-            path = os.path.join(file, name)
-            if os.path.isfile(path) and file_regex.search(name):
-                read_file(path, failed)
-    else:
+if args.format == "text" or args.dumphdr:
+    for file in files:
         read_file(file, failed)
+else:
+    output = sys.stdout
+    if args.output:
+        output = open(args.output, "wb" if OUTPUT_FORMATS[args.format].binary else "w")
+    try:
+        try:
+            writer = make_writer(args.format, output)
+        except ImportError as e:
+            parser.error(str(e))
+        with writer:
+            for file in files:
+                read_file(file, failed, writer)
+    finally:
+        if args.output:
+            output.close()
+
+if journal is not None:
+    journal.close()
 
 if failed:
     print("Files with failed translations:", file=sys.stderr)
@@ -19,7 +19,23 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from .dates import *
+from .memo import *
+from .coordinates import *
+from .columns import *
+from .failures import *
 from .observationInfo import *
 from .translator import *
 from .translators import *
+from .file_helpers import *
+from .batch import *
+from .serialization import *
+from .spatial import *
+from .intervals import *
+from .store import *
+from .index import *
+from .server import *
+from .journal import *
+from .shards import *
+from .output import *
 from .version import *
@@ -0,0 +1,534 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Translate many headers or files in a single call"""
+
+__all__ = ("translate_files", "atranslate_files", "translate_headers",
+           "gather_coordinates", "HeaderFingerprints")
+
+import asyncio
+import collections
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .coordinates import batch_coordinates, split_coordinates
+from .file_helpers import read_basic_metadata_from_file, determine_translator_from_file
+from .observationInfo import ObservationInfo
+from .translator import MetadataTranslator, _CARD_TABLE_LOCK
+
+_COORDINATE_PROPERTIES = ("tracking_radec", "altaz_begin")
+
+
+def _default_max_workers():
+    """Number of worker threads to use if none is specified.
+
+    Returns
+    -------
+    n : `int`
+        Default number of threads.
+    """
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class HeaderFingerprints:
+    """Reuse translations of headers that contain the same content.
+
+    A header is fingerprinted by hashing the values of the cards its
+    translator depends on: every card the translator class declares that it
+    reads and every card reported by `ObservationInfo.cards_used` for the
+    headers it has already translated.  Headers with the same translator
+    and fingerprint translate identically, so a single translation can be
+    shared between them.
+
+    Parameters
+    ----------
+    cards : `dict` [`str`, iterable of `str`], optional
+        Cards used by each translator in a previous run, keyed by
+        translator name, as returned by `card_sets`.  Prevents early
+        headers from being fingerprinted with an incomplete set of cards.
+
+    Notes
+    -----
+    Instances are thread safe and can be passed to `translate_files` and
+    `translate_headers`.  Whenever the set of cards for a translator grows
+    the translations that were fingerprinted with the smaller set are
+    discarded.  Only the translated values are kept for each fingerprint,
+    not the header or translator, so a long-lived instance grows slowly
+    with the number of distinct headers.
+    """
+
+    def __init__(self, cards=None):
+        self._lock = threading.Lock()
+        self._learned = {name: frozenset(keywords) for name, keywords in (cards or {}).items()}
+        self._results = {}
+        self._groups = {}
+
+    def card_sets(self):
+        """Return the cards learned from translations so far.
+
+        Returns
+        -------
+        cards : `dict` [`str`, `list` of `str`]
+            Sorted card names used by each translator, keyed by
+            translator name.  Suitable for the ``cards`` parameter of a
+            later run.
+        """
+        with self._lock:
+            return {name: sorted(keywords) for name, keywords in self._learned.items()}
+
+    def _cards(self, translator_class):
+        """Cards included in the fingerprints of a translator's headers."""
+        with _CARD_TABLE_LOCK:
+            known = frozenset(translator_class._card_names)
+        return tuple(sorted(known | self._learned.get(translator_class.name, frozenset())))
+
+    def fingerprint(self, header, translator_class):
+        """Calculate the fingerprint of a header.
+
+        Parameters
+        ----------
+        header : `dict`-like
+            Header to fingerprint.
+        translator_class : `MetadataTranslator`-class
+            Translator that will be used for the header.
+
+        Returns
+        -------
+        fingerprint : `str`
+            Hex digest identifying the translator and the content of the
+            cards it uses.
+        """
+        if hasattr(header, "toOrderedDict"):
+            header = header.toOrderedDict()
+        with self._lock:
+            cards = self._cards(translator_class)
+        digest = hashlib.sha1(translator_class.name.encode())
+        for keyword in cards:
+            # Absence must be distinguishable from any value
+            value = repr(header[keyword]) if keyword in header else "\0"
+            digest.update(f"\n{keyword}={value}".encode())
+        return digest.hexdigest()
+
+    def translate(self, key, header, translator_class=None, pedantic=False, **kwargs):
+        """Translate a header, reusing a previous translation if possible.
+
+        Parameters
+        ----------
+        key : `object`
+            Identifier of the header, such as its index or file name,
+            recorded in `duplicates`.
+        header : `dict`-like
+            Header to translate.
+        translator_class : `MetadataTranslator`-class, optional
+            Translation class to use.  Determined automatically if `None`.
+        pedantic : `bool`, optional
+            Passed to `ObservationInfo`.
+        **kwargs
+            Other parameters for `ObservationInfo`.
+
+        Returns
+        -------
+        obsinfo : `ObservationInfo`
+            The translation.  Headers with the same fingerprint share the
+            translated values but each is given its own object, bound to
+            its own header, and any failures are reported for each of them.
+        """
+        # Each translation is bound to the header as supplied
+        original = header
+        if hasattr(header, "toOrderedDict"):
+            header = header.toOrderedDict()
+        if translator_class is None:
+            translator_class = MetadataTranslator.determine_translator(header)
+        fingerprint = self.fingerprint(header, translator_class)
+        with self._lock:
+            result = self._results.get(fingerprint)
+            if result is not None:
+                self._groups[fingerprint].append(key)
+        if result is not None:
+            return ObservationInfo._from_shared(result, original, pedantic=pedantic, **kwargs)
+
+        obsinfo = ObservationInfo(original, translator_class=translator_class, pedantic=pedantic, **kwargs)
+
+        name = translator_class.name
+        with self._lock:
+            before = self._learned.get(name, frozenset())
+            learned = before | obsinfo.cards_used
+            if learned != before:
+                self._learned[name] = learned
+                # Earlier fingerprints omitted some cards this translator
+                # can depend on.
+                for stale in [f for f, r in self._results.items() if r.translator_class is translator_class]:
+                    del self._results[stale]
+        fingerprint = self.fingerprint(header, translator_class)
+        with self._lock:
+            # Another thread may have translated an equivalent header first.
+            # Only the shareable parts are kept so that the header and
+            # translator are not held for every distinct fingerprint.
+            if fingerprint not in self._results:
+                self._results[fingerprint] = obsinfo._shared()
+            self._groups.setdefault(fingerprint, []).append(key)
+        return obsinfo
+
+    def duplicates(self):
+        """Report headers that shared a translation.
+
+        Returns
+        -------
+        duplicates : `list` of `list`
+            The keys of each group of headers with the same fingerprint,
+            for groups of more than one header, in the order translated.
+        """
+        with self._lock:
+            return [list(keys) for keys in self._groups.values() if len(keys) > 1]
+
+
+def _translate_file(file, hdu, translator_class, pedantic, fingerprints=None,
+                    translation_cards_only=False, failures=None):
+    """Read the header from a file and translate it.
+
+    Parameters
+    ----------
+    file : `str`
+        File to read.
+    hdu : `int`
+        Header data unit to read.
+    translator_class : `MetadataTranslator`-class or `None`
+        Translation class to use.  Determined automatically if `None`,
+        from the raw header if possible so that unsupported files are
+        rejected without being fully read.
+    pedantic : `bool`
+        Passed to `ObservationInfo`.
+    fingerprints : `HeaderFingerprints`, optional
+        If given, used to share translations between identical headers.
+    translation_cards_only : `bool`, optional
+        If `True` only read the cards the translator uses from the file.
+    failures : `TranslationFailures`, optional
+        Passed to `ObservationInfo`.
+
+    Returns
+    -------
+    result : `ObservationInfo` or `Exception`
+        The translated header, or the exception raised whilst reading or
+        translating the file.
+    """
+    try:
+        if translator_class is None:
+            translator_class = determine_translator_from_file(file, hdu=hdu)
+        keywords = None
+        if translation_cards_only and translator_class is not None:
+            keywords = translator_class.translation_cards()
+        header = read_basic_metadata_from_file(file, hdu=hdu, keywords=keywords)
+        if fingerprints is not None:
+            return fingerprints.translate(file, header, translator_class=translator_class,
+                                          pedantic=pedantic, filename=file, failures=failures)
+        return ObservationInfo(header, translator_class=translator_class, pedantic=pedantic, filename=file,
+                               failures=failures)
+    except Exception as e:
+        return e
+
+
+def translate_files(files, hdu=1, translator_class=None, pedantic=False, max_workers=None,
+                    fingerprints=None, translation_cards_only=False, failures=None):
+    """Read and translate headers from many files using a pool of threads.
+
+    The GIL is released whilst waiting for files to be read from disk so
+    using threads allows file I/O for some files to proceed whilst the
+    headers of other files are being parsed and translated.  Parsing and
+    translation themselves hold the GIL.  Threads are used rather than processes to avoid paying
+    the memory cost of importing astropy in each worker.
+
+    Parameters
+    ----------
+    files : iterable of `str`
+        Files to translate.  The iterable is consumed lazily.
+    hdu : `int`, optional
+        Header data unit to read from each file.
+    translator_class : `MetadataTranslator`-class, optional
+        If not `None`, the class to use to translate every header.
+        Otherwise the translator is determined for each header in turn.
+    pedantic : `bool`, optional
+        Passed to `ObservationInfo`.
+    max_workers : `int`, optional
+        Number of threads to use.  A default based on the number of CPUs
+        is used if not specified.
+    fingerprints : `HeaderFingerprints`, optional
+        If given, files whose headers have the same fingerprint share a
+        single translation and are reported by
+        `HeaderFingerprints.duplicates`, keyed by file name.
+    translation_cards_only : `bool`, optional
+        If `True` only the cards listed by
+        `MetadataTranslator.translation_cards` are extracted from each
+        file, skipping the parsing of all the other cards.  The header of
+        each result then only contains those cards.
+    failures : `TranslationFailures`, optional
+        If given, properties that can not be translated are counted here
+        rather than logged for each header, and a summary of them is
+        logged at the end of the batch.
+
+    Yields
+    ------
+    file : `str`
+        The file that was translated.
+    result : `ObservationInfo` or `Exception`
+        The translation of the header from ``file``.  If the file could not
+        be read or translated the exception is returned rather than
+        raised so that a single bad file does not abort the whole batch.
+
+    Notes
+    -----
+    Results are returned in the same order as ``files``.  At most
+    ``2 * max_workers`` files are in flight at any one time so memory use
+    is bounded even for very long lists of files.  Files that have not yet
+    started processing are cancelled if the generator is closed early.
+    """
+    yield from _ordered_map(lambda file: _translate_file(file, hdu, translator_class, pedantic,
+                                                         fingerprints, translation_cards_only, failures),
+                            files, max_workers)
+    if failures is not None:
+        failures.log_summary()
+
+
+def _ordered_map(func, items, max_workers=None):
+    """Apply a function to items using a pool of threads.
+
+    Parameters
+    ----------
+    func : callable
+        Function to call with each item.  Must not raise.
+    items : iterable
+        Items to process.  The iterable is consumed lazily.
+    max_workers : `int`, optional
+        Number of threads to use.  A default based on the number of CPUs
+        is used if not specified.
+
+    Yields
+    ------
+    item : `object`
+        The item.
+    result : `object`
+        The result of calling ``func`` with the item.
+
+    Notes
+    -----
+    Results are returned in the same order as ``items`` with at most
+    ``2 * max_workers`` items in flight.  Items that have not yet started
+    are cancelled if the generator is closed early.
+    """
+    if max_workers is None:
+        max_workers = _default_max_workers()
+    window = 2 * max_workers
+
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for item in items:
+                pending.append((item, executor.submit(func, item)))
+                if len(pending) >= window:
+                    item, future = pending.popleft()
+                    yield item, future.result()
+            while pending:
+                item, future = pending.popleft()
+                yield item, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def translate_headers(headers, translator_class=None, pedantic=False, coordinates="split",
+                      fingerprints=None, failures=None):
+    """Translate many headers, constructing coordinates for all of them
+    at once.
+
+    Creating astropy coordinate objects one header at a time dominates
+    the cost of translation.  This function translates each header with
+    deferred coordinates and then creates one array-valued coordinate
+    object per frame and observatory location.
+
+    Parameters
+    ----------
+    headers : iterable of `dict`-like
+        Headers to translate.
+    translator_class : `MetadataTranslator`-class, optional
+        If not `None`, the class to use to translate every header.
+        Otherwise the translator is determined for each header in turn.
+    pedantic : `bool`, optional
+        Passed to `ObservationInfo`.
+    coordinates : `str`, optional
+        How to return the ``tracking_radec`` and ``altaz_begin``
+        properties.  ``split`` sets them to per-row views of the
+        array-valued coordinates.  ``records`` leaves them as
+        `~astro_metadata_translator.CoordinateRecord` objects; the
+        array-valued coordinates can then be obtained with
+        `gather_coordinates` if needed.
+    fingerprints : `HeaderFingerprints`, optional
+        If given, headers with the same fingerprint share a single
+        `ObservationInfo` and are reported by
+        `HeaderFingerprints.duplicates`, keyed by index in ``headers``.
+    failures : `TranslationFailures`, optional
+        If given, properties that can not be translated are counted here
+        rather than logged for each header, and a summary of them is
+        logged at the end of the batch.
+
+    Returns
+    -------
+    obsinfos : `list` of `ObservationInfo`
+        Translated observations, in the same order as ``headers``.
+    """
+    if coordinates not in ("split", "records"):
+        raise ValueError(f"Unrecognized coordinates option: {coordinates!r}")
+    if fingerprints is not None:
+        obsinfos = [fingerprints.translate(i, header, translator_class=translator_class, pedantic=pedantic,
+                                           deferred_coordinates=True, failures=failures)
+                    for i, header in enumerate(headers)]
+    else:
+        obsinfos = [ObservationInfo(header, translator_class=translator_class, pedantic=pedantic,
+                                    deferred_coordinates=True, failures=failures) for header in headers]
+    if failures is not None:
+        failures.log_summary()
+    if coordinates == "split":
+        for name in _COORDINATE_PROPERTIES:
+            coords = split_coordinates(gather_coordinates(obsinfos, name), len(obsinfos))
+            for obsinfo, coord in zip(obsinfos, coords):
+                setattr(obsinfo, f"_{name}", coord)
+    return obsinfos
+
+
+def gather_coordinates(obsinfos, name):
+    """Construct array-valued coordinates for a property of many
+    observations.
+
+    Parameters
+    ----------
+    obsinfos : sequence of `ObservationInfo`
+        Observations translated with deferred coordinates.
+    name : `str`
+        Property to gather, ``tracking_radec`` or ``altaz_begin``.
+
+    Returns
+    -------
+    groups : `list` of `tuple`
+        One entry per frame and location, each containing an array of
+        indices into ``obsinfos`` and the corresponding array-valued
+        `~astropy.coordinates.SkyCoord` or `~astropy.coordinates.AltAz`.
+        See `~astro_metadata_translator.batch_coordinates`.
+    """
+    return batch_coordinates([getattr(obsinfo, name) for obsinfo in obsinfos])
+
+
+async def _aiterate(files):
+    """Iterate over a synchronous or asynchronous iterable.
+
+    Parameters
+    ----------
+    files : iterable or async iterable
+        Items to iterate over.
+
+    Yields
+    ------
+    item : `object`
+        Each item in turn.
+    """
+    if hasattr(files, "__aiter__"):
+        async for file in files:
+            yield file
+    else:
+        for file in files:
+            yield file
+
+
+async def atranslate_files(files, hdu=1, translator_class=None, pedantic=False, concurrency=None,
+                           executor=None, failures=None):
+    """Read and translate headers from many files without blocking the
+    event loop.
+
+    Asynchronous equivalent of `translate_files`.  Reading and translating
+    each file is offloaded to an executor.
+
+    Parameters
+    ----------
+    files : iterable or async iterable of `str`
+        Files to translate.  The iterable is consumed lazily, only
+        requesting a new file when there is capacity to process it.
+    hdu : `int`, optional
+        Header data unit to read from each file.
+    translator_class : `MetadataTranslator`-class, optional
+        If not `None`, the class to use to translate every header.
+        Otherwise the translator is determined for each header in turn.
+    pedantic : `bool`, optional
+        Passed to `ObservationInfo`.
+    concurrency : `int`, optional
+        Maximum number of files being read or translated at any one time.
+        A default based on the number of CPUs is used if not specified.
+    executor : `concurrent.futures.Executor`, optional
+        Executor to use.  If `None` a thread pool with ``concurrency``
+        workers is created for the duration of the iteration.
+    failures : `TranslationFailures`, optional
+        If given, properties that can not be translated are counted here
+        rather than logged for each header, and a summary of them is
+        logged at the end of the batch.
+
+    Yields
+    ------
+    file : `str`
+        The file that was translated.
+    result : `ObservationInfo` or `Exception`
+        The translation of the header from ``file``.  If the file could not
+        be read or translated the exception is returned rather than
+        raised.
+
+    Notes
+    -----
+    Results are returned in the same order as ``files``.  No more than
+    ``concurrency`` files are submitted ahead of the consumer so a slow
+    consumer applies backpressure to the reading of new files.  If the
+    consuming task is cancelled, or the generator is closed, files that
+    have not yet started processing are cancelled.  Translations that
+    are already running in a thread will complete but their results
+    are discarded.
+    """
+    loop = asyncio.get_running_loop()
+    if concurrency is None:
+        concurrency = _default_max_workers()
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    pending = collections.deque()
+    try:
+        async for file in _aiterate(files):
+            pending.append((file, loop.run_in_executor(executor, _translate_file, file, hdu,
+                                                       translator_class, pedantic, None, False,
+                                                       failures)))
+            if len(pending) >= concurrency:
+                file, future = pending.popleft()
+                yield file, await future
+        while pending:
+            file, future = pending.popleft()
+            yield file, await future
+        if failures is not None:
+            failures.log_summary()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if own_executor:
+            executor.shutdown(wait=False)
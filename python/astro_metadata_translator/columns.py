@@ -0,0 +1,265 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Flat representation of translated properties using simple types.
+
+Every property of `ObservationInfo` is mapped to one or more columns
+holding a `str`, `int` or `float`.  This form is cheap to serialize and
+can be stored directly in tables and arrays.  Times are stored as MJD in
+the TAI scale, quantities in fixed units and coordinates in degrees.
+"""
+
+__all__ = ("COLUMNS", "NULL_VALUES", "simple_from_properties", "properties_from_simple",
+           "column_dtype", "icrs_degrees")
+
+import math
+
+import astropy.units as u
+from astropy.coordinates import AltAz, Angle, EarthLocation, SkyCoord
+from astropy.time import Time
+
+from .coordinates import CoordinateRecord
+
+COLUMNS = {"telescope": ("str", "Full name of the telescope."),
+           "instrument": ("str", "The instrument used to observe the exposure."),
+           "location_x": ("float", "Geocentric X coordinate of the observatory (m)."),
+           "location_y": ("float", "Geocentric Y coordinate of the observatory (m)."),
+           "location_z": ("float", "Geocentric Z coordinate of the observatory (m)."),
+           "exposure_id": ("int", "Unique (with instrument) integer identifier for this observation."),
+           "visit_id": ("int", "ID of the Visit this Exposure is associated with."),
+           "physical_filter": ("str", "The bandpass filter used for this observation."),
+           "datetime_begin": ("float", "Time of the start of the observation (MJD, TAI)."),
+           "datetime_end": ("float", "Time of the end of the observation (MJD, TAI)."),
+           "exposure_time": ("float", "Duration of the exposure with shutter open (s)."),
+           "dark_time": ("float", "Duration of the exposure with shutter closed (s)."),
+           "boresight_airmass": ("float", "Airmass of the boresight of the telescope."),
+           "boresight_rotation_angle": ("float", "Angle of the instrument in boresight_rotation_coord"
+                                        " frame (deg)."),
+           "boresight_rotation_coord": ("str", "Coordinate frame of the instrument rotation angle."),
+           "detector_num": ("int", "Unique (for instrument) integer identifier for the sensor."),
+           "detector_name": ("str", "Name of the detector within the instrument."),
+           "detector_exposure_id": ("int", "Unique integer identifier for this detector in this"
+                                    " exposure."),
+           "object": ("str", "Object of interest or field name."),
+           "temperature": ("float", "Temperature outside the dome (K)."),
+           "pressure": ("float", "Atmospheric pressure outside the dome (hPa)."),
+           "relative_humidity": ("float", "Relative humidity outside the dome."),
+           "tracking_ra": ("float", "Requested ICRS right ascension to track (deg)."),
+           "tracking_dec": ("float", "Requested ICRS declination to track (deg)."),
+           "altaz_az": ("float", "Telescope boresight azimuth at start of observation (deg)."),
+           "altaz_alt": ("float", "Telescope boresight altitude at start of observation (deg)."),
+           "science_program": ("str", "Observing program (survey or proposal) identifier."),
+           "observation_type": ("str", "Type of observation."),
+           "observation_id": ("str", "Label uniquely identifying this observation.")}
+"""Columns of the simple form, mapping column name to a tuple of the
+column type and a description."""
+
+NULL_VALUES = {"str": "", "int": -1, "float": math.nan}
+"""Values used for undefined properties when the simple form is stored
+in a fixed-type container such as an array."""
+
+_DTYPES = {"str": "U", "int": "i8", "float": "f8"}
+
+
+def column_dtype(name):
+    """Return the numpy type code for the named column.
+
+    Parameters
+    ----------
+    name : `str`
+        Name of a column in `COLUMNS`.
+
+    Returns
+    -------
+    dtype : `str`
+        ``i8``, ``f8`` or ``U``.
+    """
+    return _DTYPES[COLUMNS[name][0]]
+
+
+def _to_value(value, unit):
+    """Return the value of a quantity in the given unit or `None`."""
+    if value is None:
+        return None
+    return float(value.to_value(unit))
+
+
+def icrs_degrees(radec):
+    """Return the ICRS position of a tracking coordinate in degrees.
+
+    Parameters
+    ----------
+    radec : `astropy.coordinates.SkyCoord`, `CoordinateRecord` or `None`
+        The coordinate, as found in the ``tracking_radec`` property.
+
+    Returns
+    -------
+    ra : `float` or `None`
+        ICRS right ascension in degrees.
+    dec : `float` or `None`
+        ICRS declination in degrees.
+    """
+    if radec is None:
+        return None, None
+    if isinstance(radec, CoordinateRecord) and radec.frame == "icrs":
+        return radec.ra, radec.dec
+    if isinstance(radec, CoordinateRecord):
+        radec = radec.to_skycoord()
+    icrs = radec.icrs
+    return float(icrs.ra.degree), float(icrs.dec.degree)
+
+
+def simple_from_properties(get):
+    """Convert translated properties to the simple form.
+
+    Parameters
+    ----------
+    get : `callable`
+        Function taking a property name and returning its value.
+
+    Returns
+    -------
+    simple : `dict`
+        Dict mapping each column in `COLUMNS` to a `str`, `int`, `float`
+        or `None`.
+    """
+    simple = {}
+    for name in ("telescope", "instrument", "physical_filter", "boresight_rotation_coord",
+                 "detector_name", "object", "science_program", "observation_type", "observation_id"):
+        value = get(name)
+        simple[name] = None if value is None else str(value)
+    for name in ("exposure_id", "visit_id", "detector_num", "detector_exposure_id"):
+        value = get(name)
+        simple[name] = None if value is None else int(value)
+    for name in ("boresight_airmass", "relative_humidity"):
+        value = get(name)
+        simple[name] = None if value is None else float(value)
+
+    location = get("location")
+    if location is None:
+        x = y = z = None
+    else:
+        x, y, z = (float(c.to_value(u.m)) for c in location.geocentric)
+    simple["location_x"], simple["location_y"], simple["location_z"] = x, y, z
+
+    for name in ("datetime_begin", "datetime_end"):
+        value = get(name)
+        if value is not None:
+            value = float(value) if isinstance(value, float) else float(value.tai.mjd)
+        simple[name] = value
+
+    simple["exposure_time"] = _to_value(get("exposure_time"), u.s)
+    simple["dark_time"] = _to_value(get("dark_time"), u.s)
+    simple["boresight_rotation_angle"] = _to_value(get("boresight_rotation_angle"), u.deg)
+    temperature = get("temperature")
+    simple["temperature"] = None if temperature is None else \
+        float(temperature.to_value(u.K, equivalencies=u.temperature()))
+    simple["pressure"] = _to_value(get("pressure"), u.hPa)
+
+    simple["tracking_ra"], simple["tracking_dec"] = icrs_degrees(get("tracking_radec"))
+
+    altaz = get("altaz_begin")
+    if altaz is None:
+        az = alt = None
+    elif isinstance(altaz, CoordinateRecord):
+        az, alt = altaz.az, altaz.alt
+    else:
+        az, alt = float(altaz.az.degree), float(altaz.alt.degree)
+    simple["altaz_az"], simple["altaz_alt"] = az, alt
+
+    return {c: simple[c] for c in COLUMNS}
+
+
+def _is_null(value):
+    """Return `True` if the value represents an undefined property."""
+    if value is None:
+        return True
+    if isinstance(value, float):
+        return math.isnan(value)
+    return False
+
+
+def properties_from_simple(simple):
+    """Convert the simple form back to translated properties.
+
+    Parameters
+    ----------
+    simple : `dict`
+        Dict mapping column name to value.  Missing columns, `None` and
+        NaN are treated as undefined.
+
+    Returns
+    -------
+    properties : `dict`
+        Dict mapping `ObservationInfo` property name to value.
+
+    Notes
+    -----
+    Times are returned in the UTC scale and ``tracking_radec`` in the
+    ICRS frame regardless of the scale and frame originally used by the
+    translator.
+    """
+    def get(name):
+        value = simple.get(name)
+        return None if _is_null(value) else value
+
+    properties = {}
+    for name in ("telescope", "instrument", "physical_filter", "boresight_rotation_coord",
+                 "detector_name", "object", "science_program", "observation_type", "observation_id"):
+        value = get(name)
+        # Empty strings are the array null for strings
+        properties[name] = None if value == "" else value
+    for name in ("exposure_id", "visit_id", "detector_num", "detector_exposure_id"):
+        value = get(name)
+        properties[name] = None if value is None or value == NULL_VALUES["int"] else int(value)
+    for name in ("boresight_airmass", "relative_humidity"):
+        properties[name] = get(name)
+
+    x, y, z = (get(f"location_{c}") for c in "xyz")
+    location = None if x is None else EarthLocation.from_geocentric(x, y, z, unit=u.m)
+    properties["location"] = location
+
+    for name in ("datetime_begin", "datetime_end"):
+        mjd = get(name)
+        if mjd is not None:
+            value = Time(mjd, format="mjd", scale="tai").utc
+            value.format = "isot"
+        else:
+            value = None
+        properties[name] = value
+    obstime = properties["datetime_begin"]
+
+    for name, unit in (("exposure_time", u.s), ("dark_time", u.s), ("pressure", u.hPa),
+                       ("temperature", u.K)):
+        value = get(name)
+        properties[name] = None if value is None else u.Quantity(value, unit=unit)
+    # Translators use a NaN angle to indicate that the rotation is unknown
+    angle = simple.get("boresight_rotation_angle")
+    properties["boresight_rotation_angle"] = None if angle is None else Angle(angle, unit=u.deg)
+
+    ra, dec = get("tracking_ra"), get("tracking_dec")
+    properties["tracking_radec"] = None if ra is None else \
+        SkyCoord(ra, dec, frame="icrs", unit=u.deg, obstime=obstime, location=location)
+    az, alt = get("altaz_az"), get("altaz_alt")
+    properties["altaz_begin"] = None if az is None else \
+        AltAz(az*u.deg, alt*u.deg, obstime=obstime, location=location)
+
+    return properties
@@ -0,0 +1,289 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Lightweight coordinate records that defer construction of astropy
+coordinate objects."""
+
+__all__ = ("CoordinateRecord", "batch_coordinates", "split_coordinates")
+
+import numpy as np
+import astropy.units as u
+from astropy.coordinates import AltAz, Angle, SkyCoord
+from astropy.time import Time
+
+
+def _to_degrees(value, unit):
+    """Convert a raw angle to degrees.
+
+    Parameters
+    ----------
+    value : `float` or `str`
+        Raw value.  Strings are parsed as sexagesimal if required.
+    unit : `astropy.units.UnitBase`
+        Unit of the raw value.
+
+    Returns
+    -------
+    degrees : `float`
+        Value in degrees.
+    """
+    if not isinstance(value, str):
+        if unit is u.deg:
+            return float(value)
+        if unit is u.hourangle:
+            return float(value) * 15.0
+    return float(Angle(value, unit=unit).degree)
+
+
+def _as_time(obstime):
+    """Return an `~astropy.time.Time` for an observation time.
+
+    Parameters
+    ----------
+    obstime : `astropy.time.Time`, `float` or `None`
+        Time.  A `float` is interpreted as an MJD in the TAI scale.
+
+    Returns
+    -------
+    time : `astropy.time.Time` or `None`
+        The time.
+    """
+    if obstime is None or isinstance(obstime, Time):
+        return obstime
+    return Time(obstime, format="mjd", scale="tai")
+
+
+class CoordinateRecord:
+    """Raw coordinate values with the information needed to construct
+    a full astropy coordinate object on request.
+
+    Constructing `~astropy.coordinates.SkyCoord` and
+    `~astropy.coordinates.AltAz` objects is expensive.  This record holds
+    the header values so that bulk processing can use plain floats and
+    only pay for the astropy machinery when it is needed.
+
+    Parameters
+    ----------
+    lon : `float` or `str`
+        Longitude-like angle (RA or azimuth) as read from the header.
+    lat : `float` or `str`
+        Latitude-like angle (Dec or altitude) as read from the header.
+    frame : `str`
+        Name of the coordinate frame, for example ``icrs``, ``fk5`` or
+        ``altaz``.
+    unit : `astropy.units.UnitBase` or `tuple`, optional
+        Unit of the raw values.  A tuple can be used to specify different
+        units for ``lon`` and ``lat``.
+    obstime : `astropy.time.Time` or `float`, optional
+        Time of the observation.  A `float` is an MJD in the TAI scale.
+    location : `astropy.coordinates.EarthLocation`, optional
+        Location of the observatory.
+    """
+
+    __slots__ = ("_lon", "_lat", "_lon_unit", "_lat_unit", "frame", "obstime", "location", "_degrees")
+
+    def __init__(self, lon, lat, frame, unit=u.deg, obstime=None, location=None):
+        if isinstance(unit, tuple):
+            self._lon_unit, self._lat_unit = unit
+        else:
+            self._lon_unit = self._lat_unit = unit
+        self._lon = lon
+        self._lat = lat
+        self.frame = frame
+        self.obstime = obstime
+        self.location = location
+        self._degrees = None
+
+    def _get_degrees(self):
+        """Return the coordinates in degrees, converting on first use."""
+        if self._degrees is None:
+            self._degrees = (_to_degrees(self._lon, self._lon_unit),
+                             _to_degrees(self._lat, self._lat_unit))
+        return self._degrees
+
+    @property
+    def lon(self):
+        """Longitude-like coordinate in degrees (`float`)."""
+        return self._get_degrees()[0]
+
+    @property
+    def lat(self):
+        """Latitude-like coordinate in degrees (`float`)."""
+        return self._get_degrees()[1]
+
+    ra = lon
+    dec = lat
+    az = lon
+    alt = lat
+
+    @property
+    def is_altaz(self):
+        """`True` if this record represents horizontal coordinates."""
+        return self.frame == "altaz"
+
+    def to_skycoord(self):
+        """Construct the corresponding `~astropy.coordinates.SkyCoord`.
+
+        Returns
+        -------
+        coord : `astropy.coordinates.SkyCoord`
+            The coordinates.
+        """
+        if self.is_altaz:
+            return SkyCoord(self.to_altaz())
+        return SkyCoord(self._lon, self._lat, frame=self.frame, unit=(self._lon_unit, self._lat_unit),
+                        obstime=_as_time(self.obstime), location=self.location)
+
+    def to_altaz(self):
+        """Construct the corresponding `~astropy.coordinates.AltAz`.
+
+        Returns
+        -------
+        altaz : `astropy.coordinates.AltAz`
+            Horizontal coordinates.  Sky coordinates are transformed using
+            the observation time and location.
+        """
+        if not self.is_altaz:
+            return self.to_skycoord().altaz
+        return AltAz(Angle(self._lon, unit=self._lon_unit), Angle(self._lat, unit=self._lat_unit),
+                     obstime=_as_time(self.obstime), location=self.location)
+
+    def __str__(self):
+        lon, lat = self._get_degrees()
+        return f"{self.frame}: ({lon}, {lat}) deg"
+
+    def __repr__(self):
+        return (f"{type(self).__name__}({self._lon!r}, {self._lat!r}, frame={self.frame!r},"
+                f" obstime={self.obstime!r})")
+
+    def __getstate__(self):
+        return (self._lon, self._lat, self._lon_unit, self._lat_unit, self.frame, self.obstime,
+                self.location)
+
+    def __setstate__(self, state):
+        (self._lon, self._lat, self._lon_unit, self._lat_unit, self.frame, self.obstime,
+         self.location) = state
+        self._degrees = None
+
+
+def _time_arrays(obstimes):
+    """Convert a sequence of observation times into a single `Time`.
+
+    Parameters
+    ----------
+    obstimes : `list` of `astropy.time.Time` or `float`
+        Times, all in the same scale.  Floats are MJD in the TAI scale.
+
+    Returns
+    -------
+    times : `astropy.time.Time`
+        Array-valued time.
+    """
+    first = obstimes[0]
+    if isinstance(first, Time):
+        jd1 = np.array([t.jd1 for t in obstimes])
+        jd2 = np.array([t.jd2 for t in obstimes])
+        times = Time(jd1, jd2, format="jd", scale=first.scale)
+        times.format = first.format
+    else:
+        mjd = np.array(obstimes, dtype=float)
+        times = Time(np.full_like(mjd, 2400000.5), mjd, format="jd", scale="tai")
+        times.format = "mjd"
+    return times
+
+
+def batch_coordinates(records):
+    """Construct array-valued astropy coordinates from many records.
+
+    Records are grouped by frame, observatory location and time scale and
+    a single array-valued coordinate object is created for each group.
+    This is far faster than creating an astropy coordinate for each
+    record individually.
+
+    Parameters
+    ----------
+    records : sequence of `CoordinateRecord` or `None`
+        Records to convert.  `None` entries are skipped.
+
+    Returns
+    -------
+    groups : `list` of `tuple`
+        One entry per group, containing an array of the indices into
+        ``records`` and the coordinates for those records.  Horizontal
+        coordinates are returned as an `~astropy.coordinates.AltAz`
+        frame and all others as a `~astropy.coordinates.SkyCoord`.
+    """
+    # Locations are usually shared objects so group them by identity first
+    location_keys = {}
+    groups = {}
+    for i, record in enumerate(records):
+        if record is None:
+            continue
+        location = record.location
+        location_key = location_keys.get(id(location))
+        if location_key is None:
+            location_key = None if location is None else \
+                tuple(float(c) for c in location.to_value(u.m).item())
+            location_keys[id(location)] = location_key
+        obstime = record.obstime
+        scale = None if obstime is None else getattr(obstime, "scale", "mjd")
+        key = (record.frame, location_key, scale)
+        if key not in groups:
+            groups[key] = ([], [])
+        indices, members = groups[key]
+        indices.append(i)
+        members.append(record)
+
+    results = []
+    for (frame, _, scale), (indices, members) in groups.items():
+        lon = np.array([r.lon for r in members])
+        lat = np.array([r.lat for r in members])
+        obstime = None if scale is None else _time_arrays([r.obstime for r in members])
+        location = members[0].location
+        if frame == "altaz":
+            coords = AltAz(lon * u.deg, lat * u.deg, obstime=obstime, location=location)
+        else:
+            coords = SkyCoord(lon, lat, frame=frame, unit=u.deg, obstime=obstime, location=location)
+        results.append((np.array(indices, dtype=int), coords))
+    return results
+
+
+def split_coordinates(groups, n):
+    """Split grouped array-valued coordinates into per-row objects.
+
+    Parameters
+    ----------
+    groups : `list` of `tuple`
+        Result of `batch_coordinates`.
+    n : `int`
+        Number of rows.
+
+    Returns
+    -------
+    coords : `list`
+        Scalar coordinate object for each row, or `None` if the row was
+        not present in any group.
+    """
+    coords = [None] * n
+    for indices, group in groups:
+        for j, i in enumerate(indices):
+            coords[i] = group[j]
+    return coords
@@ -0,0 +1,182 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Fast conversion of FITS ISO-8601 date strings to Modified Julian Date.
+
+Creating an `astropy.time.Time` for every header is expensive when all
+that is needed is a number.  The functions here parse the standard FITS
+date format directly and return MJD values in the TAI scale as floats,
+falling back to astropy for anything they do not understand.
+"""
+
+__all__ = ("isot_to_mjd", "isot_to_mjd_array", "as_tai_mjd")
+
+import re
+
+import erfa
+import numpy as np
+from astropy.time import Time
+
+_ISOT_RE = re.compile(r"^\s*(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}):(\d{2}):(\d{2}(?:\.\d*)?))?\s*$")
+
+_SCALE_OFFSETS = {"tai": 0.0, "tt": -32.184, "gps": 19.0}
+"""Offsets in seconds to add to convert from the given scale to TAI."""
+
+
+def _days_from_civil(year, month, day):
+    """Count days since 0000-03-01 in the proleptic Gregorian calendar.
+
+    Parameters
+    ----------
+    year : `int`
+        Year.
+    month : `int`
+        Month (1-12).
+    day : `int`
+        Day of month.
+
+    Returns
+    -------
+    days : `int`
+        Number of days.
+    """
+    if month <= 2:
+        year -= 1
+        month += 12
+    month -= 3
+    return 365*year + year//4 - year//100 + year//400 + (153*month + 2)//5 + day - 1
+
+
+_MJD_EPOCH_DAYS = _days_from_civil(1858, 11, 17)
+"""Days from 0000-03-01 to the MJD epoch, 1858-11-17."""
+
+
+def _astropy_mjd(date_str, scale):
+    """Convert using astropy, for cases the fast path can not handle."""
+    return float(Time(date_str, scale=scale).tai.mjd)
+
+
+def isot_to_mjd(date_str, scale="utc"):
+    """Convert a FITS ISO-8601 date string to an MJD in the TAI scale.
+
+    Parameters
+    ----------
+    date_str : `str`
+        Date in the form ``YYYY-MM-DD`` or ``YYYY-MM-DDThh:mm:ss[.s...]``.
+    scale : `str`, optional
+        Time scale of ``date_str``, for example from the ``TIMESYS``
+        header.  ``utc``, ``tai``, ``tt`` and ``gps`` are handled directly;
+        other scales are passed to astropy.
+
+    Returns
+    -------
+    mjd : `float`
+        Modified Julian Date in the TAI scale.  Agrees with
+        ``Time(date_str, scale=scale).tai.mjd`` to better than a
+        microsecond.
+    """
+    scale = scale.lower()
+    match = _ISOT_RE.match(date_str)
+    if match is None or (scale != "utc" and scale not in _SCALE_OFFSETS):
+        return _astropy_mjd(date_str, scale)
+    year, month, day, hour, minute, second = match.groups()
+    year, month, day = int(year), int(month), int(day)
+    seconds = 0.0
+    if hour is not None:
+        seconds = int(hour)*3600 + int(minute)*60 + float(second)
+
+    if scale == "utc":
+        # erfa.dat includes the drift of pre-1972 UTC using the day fraction
+        seconds += erfa.dat(year, month, day, min(seconds / 86400.0, 1.0))
+    else:
+        seconds += _SCALE_OFFSETS[scale]
+
+    return float((_days_from_civil(year, month, day) - _MJD_EPOCH_DAYS) + seconds / 86400.0)
+
+
+def isot_to_mjd_array(date_strs, scale="utc"):
+    """Convert many FITS ISO-8601 date strings to MJDs in the TAI scale.
+
+    Parameters
+    ----------
+    date_strs : sequence of `str`
+        Dates to convert.  See `isot_to_mjd` for the supported format.
+    scale : `str`, optional
+        Time scale of all the dates.
+
+    Returns
+    -------
+    mjd : `numpy.ndarray`
+        Modified Julian Dates in the TAI scale.
+    """
+    date_strs = [s.strip() for s in date_strs]
+    scale = scale.lower()
+    if scale != "utc" and scale not in _SCALE_OFFSETS:
+        return np.array([_astropy_mjd(s, scale) for s in date_strs])
+    try:
+        times = np.array(date_strs, dtype="datetime64[ns]")
+    except ValueError:
+        # Leap seconds and non-standard forms can not be parsed by numpy
+        return np.array([isot_to_mjd(s, scale) for s in date_strs])
+
+    days = times.astype("datetime64[D]")
+    seconds = (times - days).astype(np.int64) / 1e9
+    mjd_days = (days - np.datetime64("1858-11-17", "D")).astype(np.int64)
+
+    if scale == "utc":
+        years = days.astype("datetime64[Y]")
+        months = days.astype("datetime64[M]")
+        year = years.astype(np.int64) + 1970
+        month = (months - years).astype(np.int64) + 1
+        day = (days - months).astype(np.int64) + 1
+        seconds += erfa.dat(year, month, day, seconds / 86400.0)
+    else:
+        seconds += _SCALE_OFFSETS[scale]
+
+    return mjd_days + seconds / 86400.0
+
+
+def as_tai_mjd(value):
+    """Convert a time in any of the supported forms to a TAI MJD.
+
+    Parameters
+    ----------
+    value : `astropy.time.Time`, `float`, `str` or `None`
+        The time.  A `float` is assumed to already be a TAI MJD, as used
+        for raw translated times, and a `str` is interpreted as an
+        ISO-8601 UTC date.  Array-valued times and sequences of floats are
+        also accepted.
+
+    Returns
+    -------
+    mjd : `float` or `numpy.ndarray`
+        The MJD, ``nan`` if ``value`` is `None`.
+    """
+    if value is None:
+        return np.nan
+    if isinstance(value, str):
+        return isot_to_mjd(value)
+    if isinstance(value, Time):
+        mjd = value.tai.mjd
+        return float(mjd) if np.isscalar(mjd) or mjd.ndim == 0 else mjd
+    if np.ndim(value) == 0:
+        return float(value)
+    return np.asarray(value, dtype=float)
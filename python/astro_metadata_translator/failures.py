@@ -0,0 +1,171 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Aggregation of property translation failures over many headers."""
+
+__all__ = ("TranslationFailures", )
+
+import logging
+import threading
+
+log = logging.getLogger(__name__)
+
+
+def _message(exception):
+    """Return the message of an exception or missing value sentinel."""
+    if isinstance(exception, BaseException):
+        return str(exception)
+    return exception.reason
+
+
+class TranslationFailures:
+    """Count failed property translations instead of logging each one.
+
+    When a header is translated without ``pedantic``, a property that can
+    not be calculated is left undefined and a warning is logged.  Passing
+    an instance of this class to `ObservationInfo` records the failure
+    here instead so that a batch of similar headers produces one summary
+    line per kind of failure rather than one line per header.
+
+    Parameters
+    ----------
+    max_samples : `int`, optional
+        Number of example file names to keep for each kind of failure.
+
+    Notes
+    -----
+    Failures are grouped by translator class name, property name and exception
+    type.  Instances are thread safe.
+    """
+
+    def __init__(self, max_samples=3):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._counts = {}
+        self._samples = {}
+        self._messages = {}
+
+    def __len__(self):
+        """Number of failures recorded."""
+        with self._lock:
+            return sum(self._counts.values())
+
+    def add(self, translator, property, exception, filename=None):
+        """Record a failed property translation.
+
+        Parameters
+        ----------
+        translator : `str`
+            Name of the translator class.
+        property : `str`
+            Name of the property that could not be calculated.
+        exception : `Exception` or `~astro_metadata_translator.translator._Missing`
+            The exception raised by the translator, or the sentinel it
+            returned.  Only the first of each kind is kept and its message
+            is only formatted when a summary is requested.
+        filename : `str`, optional
+            File the header came from, kept as an example.
+        """
+        if isinstance(exception, BaseException):
+            exception_type = type(exception)
+        else:
+            exception_type = exception.exception_type
+        key = (translator, property, exception_type.__name__)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            if count == 0:
+                self._messages[key] = exception
+                self._samples[key] = []
+            if filename is not None and len(self._samples[key]) < self.max_samples:
+                self._samples[key].append(filename)
+
+    def counts(self):
+        """Return the number of failures of each kind.
+
+        Returns
+        -------
+        counts : `dict` [`tuple`, `int`]
+            Number of failures keyed by translator class name, property name and
+            exception type name.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def samples(self, translator, property, exception_type):
+        """Return example files for one kind of failure.
+
+        Parameters
+        ----------
+        translator : `str`
+            Name of the translator class.
+        property : `str`
+            Name of the property.
+        exception_type : `str`
+            Name of the exception type.
+
+        Returns
+        -------
+        files : `list` of `str`
+            Up to ``max_samples`` files whose translation failed this way.
+        """
+        with self._lock:
+            return list(self._samples.get((translator, property, exception_type), []))
+
+    def summary(self):
+        """Summarize the recorded failures.
+
+        Returns
+        -------
+        lines : `list` of `str`
+            One line per kind of failure, most frequent first.
+        """
+        with self._lock:
+            items = sorted(self._counts.items(), key=lambda item: -item[1])
+            lines = []
+            for key, count in items:
+                translator, property, exception_type = key
+                line = (f"{count} failures calculating property '{property}' using translator"
+                        f" {translator} ({exception_type}: {_message(self._messages[key])})")
+                if self._samples[key]:
+                    line += f", e.g. {', '.join(self._samples[key])}"
+                lines.append(line)
+            return lines
+
+    def log_summary(self, logger=None):
+        """Log a summary of the recorded failures as warnings.
+
+        Parameters
+        ----------
+        logger : `logging.Logger`, optional
+            Logger to use.  Defaults to the logger of this module.
+        """
+        if logger is None:
+            logger = log
+        for line in self.summary():
+            logger.warning("%s", line)
+
+    def clear(self):
+        """Forget all the recorded failures."""
+        with self._lock:
+            self._counts.clear()
+            self._samples.clear()
+            self._messages.clear()
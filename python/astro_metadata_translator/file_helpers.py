@@ -0,0 +1,368 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Support functions for reading headers from files"""
+
+__all__ = ("read_basic_metadata_from_file", "find_files", "read_raw_cards",
+           "determine_translator_from_file")
+
+import os
+import re
+
+from .translator import MetadataTranslator
+
+# Prefer afw over Astropy
+try:
+    from lsst.afw.fits import readMetadata as read_metadata  # noqa: N813
+    import lsst.daf.base  # noqa: F401 need PropertyBase for readMetadata
+    # afw combines the primary header with the requested header
+    _MERGE_PRIMARY = True
+except ImportError:
+    from astropy.io import fits
+    _MERGE_PRIMARY = False
+
+    def read_metadata(file, hdu=1):
+        with fits.open(file) as fits_file:
+            return fits_file[hdu].header
+
+_BLOCK_SIZE = 2880
+_CARD_SIZE = 80
+
+_STRUCTURAL_CARDS = frozenset((b"BITPIX  ", b"NAXIS   ", b"PCOUNT  ", b"GCOUNT  "))
+"""Padded keywords needed to calculate the size of the data following a
+header.  The ``NAXISn`` keywords are also needed."""
+
+_STRING_VALUE = re.compile(r"'((?:[^']|'')*)'")
+
+
+def read_basic_metadata_from_file(file, hdu=1, keywords=None):
+    """Read a raw header from a file.
+
+    Uses ``lsst.afw.fits.readMetadata`` if it is available, falling back
+    to `astropy.io.fits` otherwise.  The GIL is released whilst waiting for
+    the file to be read from disk, so threads can overlap I/O, but astropy
+    parses the header in Python whilst holding the GIL.
+
+    Parameters
+    ----------
+    file : `str`
+        Name of file to read.
+    hdu : `int`, optional
+        Header data unit to read.
+    keywords : iterable of `str`, optional
+        If given, only these cards are extracted, directly from the raw
+        header blocks, and all other cards are skipped without being
+        interpreted.  Suitable values are given by
+        `MetadataTranslator.translation_cards`.  The full header is read if
+        the file can not be parsed directly.
+
+    Returns
+    -------
+    header : `dict`-like
+        The header read from the file.  Can be a
+        ``lsst.daf.base.PropertyList`` or an `astropy.io.fits.Header`, or
+        a `dict` if ``keywords`` was given.
+    """
+    if keywords is not None:
+        header = read_raw_cards(file, keywords, hdu=hdu)
+        if header is not None:
+            return header
+    return read_metadata(file, hdu=hdu)
+
+
+def _parse_string(text):
+    """Extract a quoted string from the value field of a card.
+
+    Parameters
+    ----------
+    text : `str`
+        The value field, starting with the opening quote.
+
+    Returns
+    -------
+    value : `str` or `None`
+        The string, including trailing spaces, or `None` if ``text`` does
+        not start with a quoted string.
+    """
+    match = _STRING_VALUE.match(text)
+    if match is None:
+        return None
+    # Quotes are doubled within strings
+    return match.group(1).replace("''", "'")
+
+
+def _parse_card_value(text):
+    """Interpret the value field of a raw FITS header card.
+
+    Parameters
+    ----------
+    text : `str`
+        The card after the value indicator.
+
+    Returns
+    -------
+    value : `str`, `int`, `float`, `bool` or `None`
+        The value.  Strings have trailing spaces removed, as they are
+        by `astropy.io.fits`.
+    """
+    text = text.strip()
+    if text.startswith("'"):
+        value = _parse_string(text)
+        return text if value is None else value.rstrip()
+    text = text.split("/", 1)[0].strip()
+    if not text:
+        return None
+    if text == "T":
+        return True
+    if text == "F":
+        return False
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text.replace("D", "E"))
+    except ValueError:
+        return text
+
+
+def _read_raw_header(fd, keywords):
+    """Parse selected cards from the header at the current position.
+
+    Parameters
+    ----------
+    fd : file-like
+        Binary file positioned at the start of a header.  On return it is
+        positioned at the end of the header.
+    keywords : `frozenset` of `str`
+        Keywords to parse.  The structural keywords describing the size of
+        the data are always parsed.  Keywords that are not valid standard
+        FITS keywords are looked for in ``HIERARCH`` cards.
+
+    Returns
+    -------
+    cards : `dict` or `None`
+        The parsed cards, or `None` if the file ended before the ``END``
+        card.  Long strings written using ``CONTINUE`` cards are joined.
+        If a keyword appears more than once the first value is used.
+    """
+    # Compare the raw bytes so that unwanted cards are never decoded
+    standard = {}
+    hierarch = set()
+    for keyword in keywords:
+        if len(keyword) <= 8 and " " not in keyword:
+            standard[keyword.encode("ascii").ljust(8)] = keyword
+        else:
+            hierarch.add(keyword)
+
+    cards = {}
+    # Keyword and pieces of a string that is continued on later cards
+    continued = None
+    while True:
+        block = fd.read(_BLOCK_SIZE)
+        if len(block) < _BLOCK_SIZE:
+            return None
+        for start in range(0, _BLOCK_SIZE, _CARD_SIZE):
+            card = block[start:start + _CARD_SIZE]
+            key = card[:8]
+            if continued is not None:
+                keyword, pieces = continued
+                piece = _parse_string(card[8:].decode("ascii", errors="replace").strip()) \
+                    if key == b"CONTINUE" else None
+                if piece is not None:
+                    if piece.endswith("&"):
+                        pieces.append(piece[:-1])
+                        continue
+                    pieces.append(piece)
+                else:
+                    # The last piece kept its ampersand
+                    pieces[-1] += "&"
+                cards[keyword] = "".join(pieces).rstrip()
+                continued = None
+                if piece is not None:
+                    continue
+
+            if key == b"END     ":
+                return cards
+            if key == b"HIERARCH":
+                if not hierarch:
+                    continue
+                keyword, equals, text = card[8:].decode("ascii", errors="replace").partition("=")
+                keyword = keyword.strip()
+                if not equals or keyword not in hierarch or keyword in cards:
+                    continue
+            elif card[8:10] != b"= ":
+                continue
+            else:
+                keyword = standard.get(key)
+                if keyword is None:
+                    if key not in _STRUCTURAL_CARDS and not key.startswith(b"NAXIS"):
+                        continue
+                    keyword = key.decode("ascii").rstrip()
+                if keyword in cards:
+                    continue
+                text = card[10:].decode("ascii", errors="replace")
+
+            text = text.strip()
+            if text.startswith("'"):
+                value = _parse_string(text)
+                if value is not None and value.endswith("&"):
+                    continued = (keyword, [value[:-1]])
+                    continue
+            cards[keyword] = _parse_card_value(text)
+
+
+def _data_size(cards):
+    """Calculate the padded size of the data following a header.
+
+    Parameters
+    ----------
+    cards : `dict`
+        Structural cards of the header.
+
+    Returns
+    -------
+    size : `int`
+        Size of the data in bytes, including padding to a whole block.
+    """
+    naxis = cards.get("NAXIS") or 0
+    if not naxis:
+        return 0
+    n_values = 1
+    for axis in range(1, naxis + 1):
+        n_values *= cards.get(f"NAXIS{axis}") or 0
+    size = abs(cards.get("BITPIX") or 8) // 8 * (cards.get("GCOUNT") or 1) \
+        * ((cards.get("PCOUNT") or 0) + n_values)
+    return -(-size // _BLOCK_SIZE) * _BLOCK_SIZE
+
+
+def read_raw_cards(file, keywords, hdu=1):
+    """Read selected cards directly from the bytes of a FITS file.
+
+    Only the requested cards are interpreted and the data of preceding
+    header data units are skipped without being read, so this is much
+    cheaper than reading the full header.
+
+    Parameters
+    ----------
+    file : `str`
+        Name of file to read.
+    keywords : iterable of `str`
+        Keywords of the cards to return.  Keywords longer than eight
+        characters or containing spaces are found in ``HIERARCH`` cards,
+        using the same names as `astropy.io.fits`.
+    hdu : `int`, optional
+        Header data unit to read.  When `read_basic_metadata_from_file`
+        merges the primary header into the requested header, cards that
+        are only in the primary header are also returned.
+
+    Returns
+    -------
+    cards : `dict` or `None`
+        The requested cards that were present.  `None` if the file is not
+        an uncompressed FITS file or does not contain the requested header
+        data unit.
+    """
+    keywords = frozenset(keywords)
+    with open(file, "rb") as fd:
+        if fd.read(6) != b"SIMPLE":
+            return None
+        fd.seek(0)
+        primary = {}
+        for index in range(hdu + 1):
+            cards = _read_raw_header(fd, keywords)
+            if cards is None:
+                return None
+            if index == 0:
+                primary = cards
+            if index < hdu:
+                fd.seek(_data_size(cards), os.SEEK_CUR)
+
+    found = {k: v for k, v in cards.items() if k in keywords}
+    if hdu > 0 and _MERGE_PRIMARY:
+        merged = {k: v for k, v in primary.items() if k in keywords}
+        merged.update(found)
+        found = merged
+    return found
+
+
+def determine_translator_from_file(file, hdu=1):
+    """Determine the translation class for a file without reading its
+    full header.
+
+    Parameters
+    ----------
+    file : `str`
+        Name of file to examine.
+    hdu : `int`, optional
+        Header data unit that will be translated.
+
+    Returns
+    -------
+    translator : `MetadataTranslator`-class or `None`
+        The translation class, or `None` if the raw header could not be
+        examined and the full header must be read to decide.
+
+    Raises
+    ------
+    ValueError
+        None of the registered translation classes understood the header.
+    """
+    cards = read_raw_cards(file, MetadataTranslator.dispatch_cards(), hdu=hdu)
+    if cards is None:
+        return None
+    return MetadataTranslator.determine_translator(cards)
+
+
+def find_files(files, regex, recursive=False):
+    """Expand a list of files and directories into a list of files.
+
+    Parameters
+    ----------
+    files : iterable of `str`
+        Files and directories to examine.  Files are always returned.
+    regex : `str`
+        Regular expression used to determine whether a file found in a
+        directory should be returned.
+    recursive : `bool`, optional
+        If `True` search the whole tree below each directory, otherwise
+        only look at the files directly inside it.
+
+    Yields
+    ------
+    path : `str`
+        Path to a file.
+    """
+    file_regex = re.compile(regex)
+    for file in files:
+        if not os.path.isdir(file):
+            yield file
+        elif recursive:
+            for root, dirs, names in os.walk(file):
+                dirs.sort()
+                for name in sorted(names):
+                    if file_regex.search(name):
+                        yield os.path.join(root, name)
+        else:
+            for name in sorted(os.listdir(file)):
+                path = os.path.join(file, name)
+                if os.path.isfile(path) and file_regex.search(name):
+                    yield path
@@ -0,0 +1,569 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Searchable SQLite index of translated observation metadata.
+
+Each indexed file is stored as one row holding the simple form of its
+`ObservationInfo` (see `~astro_metadata_translator.columns`), so queries
+never need to read or translate the original headers again.
+
+The modification time, size and a digest of the header of each file are
+also stored, along with the translator name and version, so that the index
+can be refreshed incrementally.  Files that disappear are kept as
+tombstones rather than being deleted from the table.
+"""
+
+__all__ = ("ObservationIndex", "INDEXED_COLUMNS")
+
+import hashlib
+import os
+import sqlite3
+
+import numpy as np
+
+from .batch import _ordered_map
+from .columns import COLUMNS
+from .dates import as_tai_mjd
+from .file_helpers import read_basic_metadata_from_file
+from .observationInfo import ObservationInfo
+from .spatial import SpatialIndex
+from .translator import MetadataTranslator
+
+INDEXED_COLUMNS = ("instrument", "physical_filter", "datetime_begin", "exposure_id", "observation_type")
+"""Columns that have a database index to make queries on them fast."""
+
+_SQL_TYPES = {"str": "TEXT", "int": "INTEGER", "float": "REAL"}
+
+_BOOKKEEPING_COLUMNS = {"mtime": "REAL",
+                        "size": "INTEGER",
+                        "header_digest": "TEXT",
+                        "translator": "TEXT",
+                        "translator_version": "TEXT",
+                        "deleted": "INTEGER NOT NULL DEFAULT 0"}
+"""Columns describing the source of each row, used for incremental
+updates."""
+
+_TABLE = "observations"
+
+_MAX_PARAMETERS = 500
+"""Maximum number of parameters to use in a single SQL statement."""
+
+
+def _header_digest(header):
+    """Calculate a digest of the content of a header.
+
+    Parameters
+    ----------
+    header : `dict`-like
+        The header.
+
+    Returns
+    -------
+    digest : `str`
+        Hexadecimal digest.
+    """
+    if hasattr(header, "toOrderedDict"):
+        header = header.toOrderedDict()
+    digest = hashlib.sha1()
+    for key, value in header.items():
+        digest.update(f"{key}={value!r}\n".encode())
+    return digest.hexdigest()
+
+
+def _current_version(translator):
+    """Current version of the named translator.
+
+    Parameters
+    ----------
+    translator : `str` or `None`
+        Name of a registered translator.
+
+    Returns
+    -------
+    version : `str` or `None`
+        The version, or `None` if the translator is not known.
+    """
+    translator_class = MetadataTranslator.translators.get(translator)
+    if translator_class is None:
+        return None
+    return translator_class.translator_version
+
+
+class ObservationIndex:
+    """Index of translated headers stored in an SQLite database.
+
+    Parameters
+    ----------
+    path : `str`, optional
+        Name of the database file.  It is created if it does not exist.
+        The default is a temporary in-memory database.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.row_factory = sqlite3.Row
+        self._spatial = None
+        self._create_schema()
+
+    def _create_schema(self):
+        """Create the table and its indexes if they do not exist.
+
+        Bookkeeping columns missing from an index created by an older
+        version are added.
+        """
+        columns = ", ".join(f'"{name}" {_SQL_TYPES[typ]}' for name, (typ, _) in COLUMNS.items())
+        with self._connection:
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS {_TABLE} "
+                                     f"(path TEXT PRIMARY KEY, {columns})")
+            existing = {row["name"] for row in self._connection.execute(f"PRAGMA table_info({_TABLE})")}
+            for name, sql_type in _BOOKKEEPING_COLUMNS.items():
+                if name not in existing:
+                    self._connection.execute(f"ALTER TABLE {_TABLE} ADD COLUMN {name} {sql_type}")
+            for name in INDEXED_COLUMNS:
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS {_TABLE}_{name} "
+                                         f'ON {_TABLE} ("{name}")')
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def __len__(self):
+        return self._connection.execute(f"SELECT COUNT(*) FROM {_TABLE} WHERE deleted = 0").fetchone()[0]
+
+    def __contains__(self, path):
+        return self._connection.execute(f"SELECT 1 FROM {_TABLE} WHERE path = ? AND deleted = 0",
+                                        (os.path.abspath(path), )).fetchone() is not None
+
+    def _insert(self, rows):
+        """Insert or replace rows.
+
+        Parameters
+        ----------
+        rows : iterable of `tuple`
+            The path followed by the value of each column and then the
+            values of the bookkeeping columns, excluding ``deleted``.
+        """
+        self._spatial = None
+        names = ", ".join([f'"{name}"' for name in COLUMNS] + list(_BOOKKEEPING_COLUMNS)[:-1])
+        placeholders = ", ".join("?" * (len(COLUMNS) + len(_BOOKKEEPING_COLUMNS)))
+        self._connection.executemany(f"INSERT OR REPLACE INTO {_TABLE} (path, {names}) "
+                                     f"VALUES ({placeholders})", rows)
+
+    @staticmethod
+    def _row(path, obsinfo, stat=None, digest=None):
+        """Form the values of a row for `_insert`.
+
+        Parameters
+        ----------
+        path : `str`
+            Absolute path to the file.
+        obsinfo : `ObservationInfo` or `dict`
+            Translated information, or its simple form.
+        stat : `os.stat_result`, optional
+            Status of the file.
+        digest : `str`, optional
+            Digest of the header.
+
+        Returns
+        -------
+        row : `tuple`
+            The row.
+        """
+        if isinstance(obsinfo, ObservationInfo):
+            simple = obsinfo.to_simple()
+            translator_class = obsinfo.translator_class
+        else:
+            simple = obsinfo
+            translator_class = None
+        if translator_class is None:
+            translator = version = None
+        else:
+            translator = getattr(translator_class, "name", translator_class.__name__)
+            version = translator_class.translator_version
+        mtime, size = (None, None) if stat is None else (stat.st_mtime, stat.st_size)
+        return (path, *(simple[name] for name in COLUMNS), mtime, size, digest, translator, version)
+
+    def add(self, path, obsinfo):
+        """Add, or replace, the entry for a single file.
+
+        Parameters
+        ----------
+        path : `str`
+            File the observation information was read from.
+        obsinfo : `ObservationInfo` or `dict`
+            Translated information, or its simple form.  The header digest
+            is not known so the file will be translated again by the next
+            `update`.
+        """
+        path = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+        with self._connection:
+            self._insert([self._row(path, obsinfo, stat=stat)])
+
+    def add_files(self, files, hdu=1, pedantic=False, max_workers=None):
+        """Translate files and add them to the index.
+
+        Every file is translated, even if it is already in the index and
+        has not changed.  See `update` for an incremental alternative.
+
+        Parameters
+        ----------
+        files : iterable of `str`
+            Files to translate.
+        hdu : `int`, optional
+            Header data unit to read from each file.
+        pedantic : `bool`, optional
+            Passed to `ObservationInfo`.
+        max_workers : `int`, optional
+            Number of threads to use to read the files.
+
+        Returns
+        -------
+        n_added : `int`
+            Number of files added to the index.
+        failed : `list` of `tuple`
+            The path and exception of each file that could not be
+            translated.
+        """
+        summary = self.update(files, hdu=hdu, pedantic=pedantic, max_workers=max_workers, force=True,
+                              prune=False)
+        return summary["added"] + summary["updated"], summary["failed"]
+
+    def _known_files(self):
+        """Read the bookkeeping columns of every row.
+
+        Returns
+        -------
+        known : `dict` of `sqlite3.Row`
+            The bookkeeping columns indexed by path.
+        """
+        sql = f"SELECT path, {', '.join(_BOOKKEEPING_COLUMNS)} FROM {_TABLE}"
+        return {row["path"]: row for row in self._connection.execute(sql)}
+
+    def update(self, files, hdu=1, pedantic=False, max_workers=None, force=False, prune=True):
+        """Bring the index up to date with a set of files.
+
+        A file is read again only if its modification time or size differ
+        from the stored values, or if the translator that produced its row
+        has a new version.  It is translated again only if the digest of
+        its header has also changed, or the translator version changed.
+
+        Parameters
+        ----------
+        files : iterable of `str`
+            The files that should be in the index, typically from
+            `~astro_metadata_translator.find_files`.
+        hdu : `int`, optional
+            Header data unit to read from each file.
+        pedantic : `bool`, optional
+            Passed to `ObservationInfo`.
+        max_workers : `int`, optional
+            Number of threads to use to read the files.
+        force : `bool`, optional
+            If `True` translate every file regardless of the stored state.
+        prune : `bool`, optional
+            If `True`, indexed files that were not in ``files`` and no
+            longer exist are marked as deleted.
+
+        Returns
+        -------
+        summary : `dict`
+            Numbers of files ``added``, ``updated`` (translated again),
+            ``touched`` (file changed but header identical), ``unchanged``
+            and ``deleted``, plus a list of ``(path, exception)`` for the
+            files that ``failed``.
+        """
+        known = self._known_files()
+        versions = {}
+
+        def is_current(row):
+            if row is None or row["deleted"]:
+                return False
+            translator = row["translator"]
+            if translator not in versions:
+                versions[translator] = _current_version(translator)
+            return row["translator_version"] is not None and row["translator_version"] == versions[translator]
+
+        def examine(path):
+            try:
+                row = known.get(path)
+                current = not force and is_current(row)
+                stat = os.stat(path)
+                if current and row["mtime"] == stat.st_mtime and row["size"] == stat.st_size:
+                    return "unchanged", None
+                header = read_basic_metadata_from_file(path, hdu=hdu)
+                digest = _header_digest(header)
+                if current and row["header_digest"] == digest:
+                    return "touched", (stat, digest)
+                obsinfo = ObservationInfo(header, pedantic=pedantic, filename=path)
+                return ("added" if row is None or row["deleted"] else "updated"), (stat, digest, obsinfo)
+            except Exception as e:
+                return "failed", e
+
+        summary = dict(added=0, updated=0, touched=0, unchanged=0, deleted=0, failed=[])
+        seen = set()
+        rows = []
+        touched = []
+        paths = (os.path.abspath(file) for file in files)
+        for path, (status, result) in _ordered_map(examine, paths, max_workers):
+            seen.add(path)
+            if status == "failed":
+                summary["failed"].append((path, result))
+                continue
+            summary[status] += 1
+            if status == "touched":
+                stat, digest = result
+                touched.append((stat.st_mtime, stat.st_size, path))
+            elif status != "unchanged":
+                stat, digest, obsinfo = result
+                rows.append(self._row(path, obsinfo, stat=stat, digest=digest))
+
+        tombstones = []
+        if prune:
+            for path, row in known.items():
+                if path not in seen and not row["deleted"] and not os.path.exists(path):
+                    tombstones.append((path, ))
+            summary["deleted"] = len(tombstones)
+
+        with self._connection:
+            self._insert(rows)
+            self._connection.executemany(f"UPDATE {_TABLE} SET mtime = ?, size = ? WHERE path = ?", touched)
+            self._connection.executemany(f"UPDATE {_TABLE} SET deleted = 1 WHERE path = ?", tombstones)
+        if tombstones:
+            self._spatial = None
+        return summary
+
+    def outdated_paths(self):
+        """Find the files translated by an older version of a translator.
+
+        Returns
+        -------
+        paths : `list` of `str`
+            Files whose translator has changed version since they were
+            indexed, or whose translator is not known.
+        """
+        rows = self._connection.execute(f"SELECT path, translator, translator_version FROM {_TABLE} "
+                                        "WHERE deleted = 0")
+        versions = {}
+        outdated = []
+        for path, translator, version in rows:
+            if translator not in versions:
+                versions[translator] = _current_version(translator)
+            if version is None or version != versions[translator]:
+                outdated.append(path)
+        return outdated
+
+    def update_outdated(self, hdu=1, pedantic=False, max_workers=None):
+        """Translate again all the files whose translator version changed.
+
+        Parameters
+        ----------
+        hdu : `int`, optional
+            Header data unit to read from each file.
+        pedantic : `bool`, optional
+            Passed to `ObservationInfo`.
+        max_workers : `int`, optional
+            Number of threads to use to read the files.
+
+        Returns
+        -------
+        summary : `dict`
+            Summary of the changes, as returned by `update`.
+        """
+        return self.update(self.outdated_paths(), hdu=hdu, pedantic=pedantic, max_workers=max_workers,
+                           prune=False)
+
+    def deleted_paths(self):
+        """Files that have been marked as deleted.
+
+        Returns
+        -------
+        paths : `list` of `str`
+            The tombstoned files.
+        """
+        rows = self._connection.execute(f"SELECT path FROM {_TABLE} WHERE deleted = 1 ORDER BY path")
+        return [row[0] for row in rows]
+
+    def remove(self, path):
+        """Remove a file from the index completely.
+
+        Parameters
+        ----------
+        path : `str`
+            File to remove.
+
+        Returns
+        -------
+        removed : `bool`
+            `True` if the file was in the index.
+        """
+        with self._connection:
+            cursor = self._connection.execute(f"DELETE FROM {_TABLE} WHERE path = ?",
+                                              (os.path.abspath(path), ))
+        self._spatial = None
+        return cursor.rowcount > 0
+
+    def query(self, instrument=None, physical_filter=None, observation_type=None, exposure_id=None,
+              begin=None, end=None, where=None, parameters=(), order_by="datetime_begin", limit=None):
+        """Find observations in the index.
+
+        All the constraints that are specified must be satisfied.
+
+        Parameters
+        ----------
+        instrument : `str`, optional
+            Name of the instrument.
+        physical_filter : `str`, optional
+            Name of the physical filter.
+        observation_type : `str`, optional
+            Type of observation, for example ``science``.
+        exposure_id : `int`, optional
+            Exposure identifier.
+        begin : `astropy.time.Time`, `float` or `str`, optional
+            Only return observations starting at or after this time.  A
+            `float` is a TAI MJD and a `str` an ISO-8601 UTC date.
+        end : `astropy.time.Time`, `float` or `str`, optional
+            Only return observations starting before this time.
+        where : `str`, optional
+            Additional SQL expression to apply to the columns.
+        parameters : `tuple`, optional
+            Values of any ``?`` placeholders in ``where``.
+        order_by : `str`, optional
+            Column used to order the results.
+        limit : `int`, optional
+            Maximum number of results.
+
+        Returns
+        -------
+        rows : `list` of `dict`
+            The simple form of each matching observation, with an
+            additional ``path`` item.
+        """
+        clauses = ["deleted = 0"]
+        values = []
+        for name, value in (("instrument", instrument), ("physical_filter", physical_filter),
+                            ("observation_type", observation_type), ("exposure_id", exposure_id)):
+            if value is not None:
+                clauses.append(f'"{name}" = ?')
+                values.append(value)
+        if begin is not None:
+            clauses.append("datetime_begin >= ?")
+            values.append(as_tai_mjd(begin))
+        if end is not None:
+            clauses.append("datetime_begin < ?")
+            values.append(as_tai_mjd(end))
+        if where is not None:
+            clauses.append(f"({where})")
+            values.extend(parameters)
+
+        names = ", ".join(f'"{name}"' for name in COLUMNS)
+        sql = f"SELECT path, {names} FROM {_TABLE} WHERE " + " AND ".join(clauses)
+        if order_by is not None:
+            if order_by != "path" and order_by not in COLUMNS:
+                raise ValueError(f"Can not order by unknown column {order_by!r}")
+            sql += f' ORDER BY "{order_by}", path'
+        if limit is not None:
+            sql += " LIMIT ?"
+            values.append(int(limit))
+        return [dict(row) for row in self._connection.execute(sql, values)]
+
+    def cone_search(self, ra, dec, radius):
+        """Find the observations tracking a position within a circle.
+
+        A `SpatialIndex` of the ``tracking_radec`` positions is built
+        on first use and kept until the index is next modified.
+
+        Parameters
+        ----------
+        ra : `float` or `astropy.units.Quantity`
+            ICRS right ascension of the center, in degrees if a `float`.
+        dec : `float` or `astropy.units.Quantity`
+            ICRS declination of the center, in degrees if a `float`.
+        radius : `float` or `astropy.units.Quantity`
+            Radius of the circle, in degrees if a `float`.
+
+        Returns
+        -------
+        rows : `list` of `dict`
+            The simple form of each matching observation with additional
+            ``path`` and ``separation`` (degrees) items, ordered by
+            increasing separation.
+        """
+        if self._spatial is None:
+            rows = self._connection.execute(f"SELECT rowid, tracking_ra, tracking_dec FROM {_TABLE} "
+                                            "WHERE deleted = 0 AND tracking_ra IS NOT NULL").fetchall()
+            rowids = np.array([row[0] for row in rows], dtype=np.int64)
+            spatial = SpatialIndex([row[1] for row in rows], [row[2] for row in rows])
+            self._spatial = (rowids, spatial)
+        rowids, spatial = self._spatial
+
+        indices, separations = spatial.cone_search(ra, dec, radius, return_separation=True)
+        names = ", ".join(f'"{name}"' for name in COLUMNS)
+        found = {}
+        matched = [int(rowid) for rowid in rowids[indices]]
+        for i in range(0, len(matched), _MAX_PARAMETERS):
+            chunk = matched[i:i + _MAX_PARAMETERS]
+            sql = f"SELECT rowid, path, {names} FROM {_TABLE} WHERE rowid IN ({', '.join('?' * len(chunk))})"
+            for row in self._connection.execute(sql, chunk):
+                found[row[0]] = row
+        results = []
+        for rowid, separation in zip(matched, separations):
+            row = dict(found[rowid])
+            del row["rowid"]
+            row["separation"] = float(separation)
+            results.append(row)
+        return results
+
+    def observation_info(self, path):
+        """Return the observation information for an indexed file.
+
+        Parameters
+        ----------
+        path : `str`
+            Name of the file.
+
+        Returns
+        -------
+        obsinfo : `ObservationInfo`
+            The information reconstructed from the index.
+
+        Raises
+        ------
+        KeyError
+            The file is not in the index.
+        """
+        names = ", ".join(f'"{name}"' for name in COLUMNS)
+        row = self._connection.execute(f"SELECT {names} FROM {_TABLE} WHERE path = ? AND deleted = 0",
+                                       (os.path.abspath(path), )).fetchone()
+        if row is None:
+            raise KeyError(f"File {path} is not in the index")
+        return ObservationInfo.from_simple(dict(row))
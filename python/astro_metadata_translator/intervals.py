@@ -0,0 +1,158 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Index of observation time intervals.
+
+Intervals are stored as arrays of MJD sorted by start time together with
+the running maximum of the end times.  Overlap queries use binary searches
+on these arrays so that matching many observations to each other, for
+example science exposures to calibrations, avoids pairwise comparison of
+`~astropy.time.Time` objects.
+"""
+
+__all__ = ("IntervalIndex", )
+
+import numpy as np
+
+from .dates import as_tai_mjd
+
+
+class IntervalIndex:
+    """Index of time intervals supporting overlap and nearest queries.
+
+    Parameters
+    ----------
+    begin : array-like of `float`
+        Start of each interval as a TAI MJD.  Intervals without a finite
+        start are not indexed.
+    end : array-like of `float`, optional
+        End of each interval as a TAI MJD.  A missing or non-finite end
+        is treated as being equal to the start.
+    """
+
+    def __init__(self, begin, end=None):
+        begin = np.atleast_1d(np.asarray(begin, dtype=float))
+        end = begin.copy() if end is None else np.atleast_1d(np.asarray(end, dtype=float))
+        if begin.shape != end.shape:
+            raise ValueError(f"Begin and end must have the same shape, not {begin.shape} and {end.shape}")
+        end = np.where(np.isfinite(end), end, begin)
+
+        ids = np.flatnonzero(np.isfinite(begin))
+        order = np.argsort(begin[ids], kind="stable")
+        self._ids = ids[order]
+        self._begin = begin[self._ids]
+        self._end = end[self._ids]
+        # Ends may be out of order even though begins are sorted.  The
+        # running maximum is monotonic and so can be searched.
+        self._max_end = np.maximum.accumulate(self._end) if len(self._end) else self._end
+
+        end_order = np.argsort(self._end, kind="stable")
+        self._end_ids = self._ids[end_order]
+        self._sorted_end = self._end[end_order]
+
+    @classmethod
+    def from_observations(cls, obsinfos, observation_types=None):
+        """Create an index from the times of observations.
+
+        Parameters
+        ----------
+        obsinfos : iterable of `ObservationInfo`
+            The observations.
+        observation_types : iterable of `str`, optional
+            If given, only index observations with one of these
+            ``observation_type`` values, for example
+            ``("bias", "dark", "flat")``.
+
+        Returns
+        -------
+        index : `IntervalIndex`
+            The index.  Query results refer to the position of each
+            observation in ``obsinfos``.
+        """
+        if observation_types is not None:
+            observation_types = set(observation_types)
+        begin = []
+        end = []
+        for obsinfo in obsinfos:
+            if observation_types is not None and obsinfo.observation_type not in observation_types:
+                begin.append(np.nan)
+                end.append(np.nan)
+                continue
+            begin.append(as_tai_mjd(obsinfo.datetime_begin))
+            end.append(as_tai_mjd(obsinfo.datetime_end))
+        return cls(begin, end)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def overlapping(self, begin, end=None):
+        """Find the intervals that overlap a time range.
+
+        Parameters
+        ----------
+        begin : `astropy.time.Time`, `float` or `str`
+            Start of the range.  A `float` is a TAI MJD and a `str` an
+            ISO-8601 UTC date.
+        end : `astropy.time.Time`, `float` or `str`, optional
+            End of the range.  If not given, find the intervals containing
+            ``begin``.
+
+        Returns
+        -------
+        indices : `numpy.ndarray` of `int`
+            Indices of the overlapping intervals, ordered by start time.
+            Intervals that only touch the range at an end point are
+            included.
+        """
+        begin = as_tai_mjd(begin)
+        end = begin if end is None else as_tai_mjd(end)
+        # Every interval before first ends before the range begins
+        first = np.searchsorted(self._max_end, begin, side="left")
+        # Every interval from stop onward begins after the range ends
+        stop = np.searchsorted(self._begin, end, side="right")
+        candidates = np.arange(first, max(first, stop))
+        return self._ids[candidates[self._end[candidates] >= begin]]
+
+    def nearest_before(self, times, use_end=True):
+        """Find the latest interval before each of some times.
+
+        Parameters
+        ----------
+        times : `astropy.time.Time`, `float`, `str` or array-like
+            The times.  Array-valued `~astropy.time.Time` and sequences of
+            TAI MJD are accepted.
+        use_end : `bool`, optional
+            If `True` an interval is before a time if it ends at or before
+            it.  Otherwise only the start must be at or before the time.
+
+        Returns
+        -------
+        indices : `int` or `numpy.ndarray` of `int`
+            Index of the nearest preceding interval for each time, ``-1``
+            where there is none.  A scalar is returned for a scalar time.
+        """
+        mjd = as_tai_mjd(times)
+        values, ids = (self._sorted_end, self._end_ids) if use_end else (self._begin, self._ids)
+        position = np.searchsorted(values, mjd, side="right") - 1
+        result = np.where(position >= 0, ids[np.clip(position, 0, None)] if len(ids) else -1, -1)
+        if np.ndim(result) == 0:
+            return int(result)
+        return result
@@ -0,0 +1,146 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Checkpoint journal for long-running batch translations.
+
+Each translated file is recorded as one JSON line appended to the journal,
+containing the simple form of the translation or the error that prevented
+it.  A run that is interrupted can be resumed by reading the journal and
+skipping the files it already records.
+"""
+
+__all__ = ("TranslationJournal", )
+
+import json
+import os
+
+from .output import _null_nan
+
+
+class TranslationJournal:
+    """Append-only record of translated files.
+
+    Parameters
+    ----------
+    path : `str`
+        Journal file.  Created if it does not exist; otherwise new records
+        are appended to it.
+
+    Notes
+    -----
+    Every record is written with a single ``write`` to a file opened in
+    append mode, so records from concurrent writers are never interleaved
+    and a record is durable as soon as the call returns, even if the
+    process is killed straight afterwards.  Records are not synced to disk
+    so the end of a journal can be lost if the machine itself fails.  A
+    record that was only partially written is ignored by `read`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+        # Terminate a partial record left by an earlier crash so that it
+        # can not corrupt the next record.
+        size = os.fstat(self._fd).st_size
+        if size:
+            with open(path, "rb") as fd:
+                fd.seek(size - 1)
+                if fd.read(1) != b"\n":
+                    os.write(self._fd, b"\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the journal."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _append(self, record):
+        """Append one record to the journal."""
+        data = (json.dumps(record, allow_nan=False) + "\n").encode()
+        written = os.write(self._fd, data)
+        while written < len(data):
+            # Only possible for very large records
+            written += os.write(self._fd, data[written:])
+
+    def record(self, path, obsinfo):
+        """Record a successful translation.
+
+        Parameters
+        ----------
+        path : `str`
+            The file that was translated.
+        obsinfo : `ObservationInfo`
+            The translation.  NaN values are recorded as undefined so that
+            the record is valid JSON.
+        """
+        simple = {name: _null_nan(value) for name, value in obsinfo.to_simple().items()}
+        self._append({"path": path, "observation": simple})
+
+    def record_failure(self, path, error):
+        """Record a failed translation.
+
+        Parameters
+        ----------
+        path : `str`
+            The file that could not be translated.
+        error : `Exception` or `str`
+            The reason for the failure.
+        """
+        if isinstance(error, Exception):
+            error = repr(error)
+        self._append({"path": path, "error": error})
+
+    @staticmethod
+    def read(path):
+        """Read the records of a journal.
+
+        Parameters
+        ----------
+        path : `str`
+            Journal file.  A missing file is treated as an empty journal.
+
+        Returns
+        -------
+        records : `dict` [`str`, `dict`]
+            The most recent record for each file, keyed by path.  Each
+            record has an ``observation`` item, holding the simple form of
+            the translation, or an ``error`` item.
+        """
+        records = {}
+        try:
+            fd = open(path, "rb")
+        except FileNotFoundError:
+            return records
+        with fd:
+            for line in fd:
+                try:
+                    record = json.loads(line)
+                    records[record["path"]] = record
+                except (ValueError, KeyError, TypeError):
+                    # Partially-written record
+                    continue
+        return records
@@ -0,0 +1,285 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Bounded memoization of the pure constructors used by translators.
+
+Headers in a batch frequently share derived values such as the observatory
+location.  The caches here are process-wide, thread safe and bounded by
+least-recently-used eviction.  Each caller is given its own copy of the
+cached value, which is much cheaper than constructing it, so the result
+can be modified freely.  The caches are only suitable for constant,
+low-cardinality values; values that differ between headers would fill
+the caches without being reused.
+"""
+
+__all__ = ("MemoCache", "memo_statistics", "set_memo_limits", "clear_memo_caches",
+           "cached_geodetic_location", "cached_geocentric_location", "cached_site_location")
+
+import functools
+import math
+import threading
+from collections import OrderedDict
+
+from astropy.coordinates import EarthLocation
+import astropy.units as u
+
+DEFAULT_MAXSIZE = 1024
+"""Default number of entries held by each cache."""
+
+_CACHES = {}
+"""All the memoization caches, indexed by name."""
+
+
+class MemoCache:
+    """Thread-safe least-recently-used cache with statistics.
+
+    Parameters
+    ----------
+    name : `str`
+        Name of the cache, used to report statistics.
+    maxsize : `int`, optional
+        Maximum number of entries.  A value of 0 disables caching.
+    """
+
+    def __init__(self, name, maxsize=DEFAULT_MAXSIZE):
+        self.name = name
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        """Maximum number of entries in the cache (`int`)."""
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize):
+        if maxsize < 0:
+            raise ValueError(f"Cache size can not be negative: {maxsize}")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _evict(self):
+        """Remove entries until the cache is within its size limit.
+
+        Must be called with the lock held.
+        """
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, factory):
+        """Return the cached value for a key, creating it if needed.
+
+        Parameters
+        ----------
+        key : hashable
+            Key identifying the value.
+        factory : callable
+            Called with no arguments to create the value if it is not
+            in the cache.
+
+        Returns
+        -------
+        value : `object`
+            The cached value.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return value
+
+        # Create outside the lock since construction can be slow.  Two
+        # threads may both create the value; the first one stored wins.
+        value = factory()
+        with self._lock:
+            value = self._data.setdefault(key, value)
+            self._evict()
+        return value
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def statistics(self):
+        """Report usage of the cache.
+
+        Returns
+        -------
+        stats : `dict`
+            Numbers of ``hits``, ``misses`` and ``evictions``, the
+            ``hit_rate``, and the current ``size`` and ``maxsize``.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return dict(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                        hit_rate=self.hits / lookups if lookups else 0.0,
+                        size=len(self._data), maxsize=self._maxsize)
+
+
+def _has_nan(values):
+    """Return `True` if any of the values is a floating point NaN."""
+    return any(isinstance(v, float) and math.isnan(v) for v in values)
+
+
+def _memoize(func):
+    """Memoize a pure function of hashable arguments in a named cache.
+
+    The cache is named after the function.  Calls with unhashable
+    arguments bypass the cache, as do calls with NaN arguments since NaN
+    keys never match an existing entry.  The cached value is made
+    read-only and a copy of it is returned.
+    """
+    cache = _CACHES[func.__name__] = MemoCache(func.__name__)
+
+    def create(args, kwargs):
+        value = func(*args, **kwargs)
+        value.flags.writeable = False
+        return value
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+        if _has_nan(args) or _has_nan(kwargs.values()):
+            return func(*args, **kwargs)
+        return cache.get(key, lambda: create(args, kwargs)).copy()
+
+    wrapper.cache = cache
+    return wrapper
+
+
+def memo_statistics():
+    """Report usage of all the memoization caches.
+
+    Returns
+    -------
+    stats : `dict` of `dict`
+        Statistics, as returned by `MemoCache.statistics`, indexed by
+        cache name.
+    """
+    return {name: cache.statistics() for name, cache in _CACHES.items()}
+
+
+def set_memo_limits(maxsize=None, **limits):
+    """Configure the maximum size of the memoization caches.
+
+    Parameters
+    ----------
+    maxsize : `int`, optional
+        If given, the new size limit for every cache.  A value of 0
+        disables memoization.
+    **limits
+        Size limits for individual caches, indexed by cache name.  These
+        override ``maxsize``.
+
+    Raises
+    ------
+    KeyError
+        An unknown cache name was given.
+    """
+    for name in limits:
+        if name not in _CACHES:
+            raise KeyError(f"Unknown memoization cache: {name}")
+    for name, cache in _CACHES.items():
+        size = limits.get(name, maxsize)
+        if size is not None:
+            cache.maxsize = size
+
+
+def clear_memo_caches():
+    """Empty all the memoization caches and reset their statistics."""
+    for cache in _CACHES.values():
+        cache.clear()
+
+
+@_memoize
+def cached_geodetic_location(lon, lat, height=0.0):
+    """Memoized `~astropy.coordinates.EarthLocation.from_geodetic`.
+
+    Parameters
+    ----------
+    lon : `float` or `str`
+        Longitude in degrees.
+    lat : `float` or `str`
+        Latitude in degrees.
+    height : `float` or `str`, optional
+        Height in meters.
+
+    Returns
+    -------
+    location : `astropy.coordinates.EarthLocation`
+        The location.
+    """
+    return EarthLocation.from_geodetic(lon, lat, height)
+
+
+@_memoize
+def cached_geocentric_location(x, y, z, unit=u.m):
+    """Memoized `~astropy.coordinates.EarthLocation.from_geocentric`.
+
+    Parameters
+    ----------
+    x, y, z : `float`
+        Geocentric coordinates.
+    unit : `astropy.units.UnitBase`, optional
+        Unit of the coordinates.
+
+    Returns
+    -------
+    location : `astropy.coordinates.EarthLocation`
+        The location.
+    """
+    return EarthLocation.from_geocentric(x, y, z, unit=unit)
+
+
+@_memoize
+def cached_site_location(site):
+    """Memoized `~astropy.coordinates.EarthLocation.of_site`.
+
+    Parameters
+    ----------
+    site : `str`
+        Name of the observatory.
+
+    Returns
+    -------
+    location : `astropy.coordinates.EarthLocation`
+        The location.
+    """
+    return EarthLocation.of_site(site)
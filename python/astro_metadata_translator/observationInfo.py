@@ -23,15 +23,21 @@
 
 __all__ = ("ObservationInfo", )
 
+import collections
 import itertools
 import logging
 import copy
 
-from .translator import MetadataTranslator
+from .translator import MetadataTranslator, _Missing
 from .properties import PROPERTIES
+from .columns import simple_from_properties, properties_from_simple
 
 log = logging.getLogger(__name__)
 
+_SharedTranslation = collections.namedtuple("_SharedTranslation",
+                                            ("state", "translator_class", "cards_used", "missing"))
+"""Translation of a header that can be reused for equivalent headers."""
+
 
 class ObservationInfo:
     """Standardized representation of an instrument header for a single
@@ -49,6 +55,24 @@ class ObservationInfo:
         If True the translation must succeed for all properties.  If False
         individual property translations must all be implemented but can fail
         and a warning will be issued.
+    card_tracking : `str` or `None`, optional
+        How the translator should record the header cards it uses.  See
+        `MetadataTranslator` for the options.  If `None`, `cards_used` will
+        be empty and `stripped_header` will not remove any cards.
+    deferred_coordinates : `bool`, optional
+        If `True` the ``tracking_radec`` and ``altaz_begin`` properties are
+        `~astro_metadata_translator.CoordinateRecord` objects holding the
+        raw angles, rather than astropy coordinate objects.  This is much
+        faster if the full coordinate objects are not needed.
+    raw_time : `bool`, optional
+        If `True` the ``datetime_begin`` and ``datetime_end`` properties are
+        `float` MJD values in the TAI scale rather than
+        `~astropy.time.Time` objects.
+    filename : `str`, optional
+        File the header was read from, used when reporting problems.
+    failures : `~astro_metadata_translator.TranslationFailures`, optional
+        If given, properties that can not be calculated when ``pedantic``
+        is `False` are recorded here rather than each being logged.
 
     Raises
     ------
@@ -63,7 +87,8 @@ class ObservationInfo:
     """All the properties supported by this class with associated
     documentation."""
 
-    def __init__(self, header, translator_class=None, pedantic=False):
+    def __init__(self, header, translator_class=None, pedantic=False, card_tracking="set",
+                 deferred_coordinates=False, raw_time=False, filename=None, failures=None):
 
         # Store the supplied header for later stripping
         self._header = header
@@ -79,28 +104,138 @@ class ObservationInfo:
             raise TypeError(f"Translator class must be a MetadataTranslator, not {translator_class}")
 
         # Create an instance for this header
-        translator = translator_class(header)
+        translator = translator_class(header, card_tracking=card_tracking,
+                                      deferred_coordinates=deferred_coordinates, raw_time=raw_time)
 
         # Store the translator
         self._translator = translator
 
-        # Loop over each property and request the translated form
-        for t in self._PROPERTIES:
-            # prototype code
-            method = f"to_{t}"
-            property = f"_{t}"
+        # Properties that could not be calculated
+        self._missing = {}
 
+        # Loop over each property and request the translated form.  Missing
+        # values are returned as sentinels and only turned into exceptions
+        # if they are to be raised.
+        for t in self._PROPERTIES:
             try:
-                setattr(self, property, getattr(translator, method)())
+                value = translator._translate(t)
             except NotImplementedError as e:
                 raise NotImplementedError(f"No translation exists for property '{t}'"
                                           f" using translator {translator.__class__}") from e
-            except KeyError as e:
-                err_msg = f"Error calculating property '{t}' using translator {translator.__class__}"
-                if pedantic:
-                    raise KeyError(err_msg) from e
-                else:
-                    log.warning(err_msg)
+
+            if value.__class__ is not _Missing:
+                setattr(self, f"_{t}", value)
+            else:
+                self._missing[t] = value
+                self._report_missing(translator, t, value, pedantic, filename, failures)
+
+    @staticmethod
+    def _report_missing(translator, property, missing, pedantic, filename, failures):
+        """Report a property that could not be calculated.
+
+        Parameters
+        ----------
+        translator : `MetadataTranslator`
+            Translator used for the header.
+        property : `str`
+            Name of the property.
+        missing : `~astro_metadata_translator.translator._Missing`
+            Sentinel explaining why the value is missing.
+        pedantic : `bool`
+            If `True` raise an exception.
+        filename : `str` or `None`
+            File the header was read from.
+        failures : `~astro_metadata_translator.TranslationFailures` or `None`
+            Collector for the failure.  The failure is logged if `None`.
+
+        Raises
+        ------
+        KeyError
+            Raised if ``pedantic`` is `True`.
+        """
+        if pedantic:
+            err_msg = f"Error calculating property '{property}' using translator {translator.__class__}"
+            if filename is not None:
+                err_msg += f" for {filename}"
+            raise KeyError(err_msg) from missing.exception()
+        elif failures is not None:
+            failures.add(type(translator).__name__, property, missing, filename=filename)
+        elif filename is not None:
+            log.warning("Error calculating property '%s' using translator %s for %s", property,
+                        translator.__class__, filename)
+        else:
+            log.warning("Error calculating property '%s' using translator %s", property,
+                        translator.__class__)
+
+    def _shared(self):
+        """Return the parts of this translation that can be shared with
+        equivalent headers.
+
+        Returns
+        -------
+        shared : `_SharedTranslation`
+            The translated properties, the translator class, the cards used
+            and the properties that could not be calculated.  Does not
+            refer to the header or translator, so is cheap to keep.
+        """
+        missing = {t: m.detached() for t, m in self._missing.items()}
+        return _SharedTranslation(self.__getstate__(), type(self._translator),
+                                  self._translator.cards_used(), missing)
+
+    @classmethod
+    def _from_shared(cls, shared, header, pedantic=False, card_tracking="set",
+                     deferred_coordinates=False, raw_time=False, filename=None, failures=None):
+        """Create an `ObservationInfo` for a header known to translate
+        identically to one that has already been translated.
+
+        The translated properties are copied from ``shared`` but the new
+        object is bound to ``header``, so `stripped_header` describes this
+        header, and any properties that could not be calculated are
+        reported again for this header.  Parameters are as for the
+        constructor.
+
+        Parameters
+        ----------
+        shared : `_SharedTranslation`
+            Translation of an equivalent header, as returned by `_shared`.
+        header : `dict`-like
+            Header to bind to the new object.
+
+        Returns
+        -------
+        obsinfo : `ObservationInfo`
+            The translation of ``header``.
+        """
+        obsinfo = cls.__new__(cls)
+        obsinfo.__setstate__(shared.state)
+        obsinfo._header = header
+        if hasattr(header, "toOrderedDict"):
+            header = header.toOrderedDict()
+
+        translator = shared.translator_class(header, card_tracking=card_tracking,
+                                             deferred_coordinates=deferred_coordinates,
+                                             raw_time=raw_time)
+        # The cards that were used are all present in this header
+        translator._used_these_cards(*shared.cards_used)
+        obsinfo._translator = translator
+
+        obsinfo._missing = dict(shared.missing)
+        for t, missing in obsinfo._missing.items():
+            cls._report_missing(translator, t, missing, pedantic, filename, failures)
+        return obsinfo
+
+    @property
+    def translator_class(self):
+        """Translator class used to create this object.
+
+        Returns
+        -------
+        translator_class : `MetadataTranslator`-class or `None`
+            The class, or `None` if this object was not created from a
+            header.
+        """
+        translator = getattr(self, "_translator", None)
+        return None if translator is None else type(translator)
 
     @property
     def cards_used(self):
@@ -128,6 +263,39 @@ class ObservationInfo:
             del hdr[c]
         return hdr
 
+    def to_simple(self):
+        """Convert the translated properties to a flat dict of simple
+        values.
+
+        Returns
+        -------
+        simple : `dict`
+            Dict mapping each column defined in
+            `~astro_metadata_translator.columns.COLUMNS` to a `str`, `int`,
+            `float` or `None`.  Suitable for JSON serialization.
+        """
+        return simple_from_properties(lambda p: getattr(self, p))
+
+    @classmethod
+    def from_simple(cls, simple):
+        """Create an `ObservationInfo` from the simple form.
+
+        Parameters
+        ----------
+        simple : `dict`
+            Simple form as returned by `to_simple`.
+
+        Returns
+        -------
+        obsinfo : `ObservationInfo`
+            Observation information reconstructed from the simple form.
+            There is no associated header or translator, so
+            `stripped_header` and `cards_used` can not be used.
+        """
+        obsinfo = cls.__new__(cls)
+        obsinfo.__setstate__(properties_from_simple(simple))
+        return obsinfo
+
     def __str__(self):
         # Put more interesting answers at front of list
         # and then do remainder
@@ -0,0 +1,248 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Streaming writers for tables of translated headers.
+
+Each row is the simple form of an `ObservationInfo` (see
+`~astro_metadata_translator.columns`) preceded by the name of the file it
+came from.  The row-oriented formats write and flush each row as it
+arrives, so finished rows are not lost if a run is interrupted and can be
+read immediately from a pipe.  Columnar formats buffer rows and write them
+in chunks.  Either way arbitrarily many files can be written without
+holding the whole table in memory.
+"""
+
+__all__ = ("OUTPUT_FORMATS", "OUTPUT_COLUMNS", "TableWriter", "JsonLinesWriter", "CsvWriter", "EcsvWriter",
+           "ParquetWriter", "make_writer")
+
+import csv
+import json
+import math
+
+from .columns import COLUMNS
+
+# Parquet support is optional
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+OUTPUT_COLUMNS = ("path", ) + tuple(COLUMNS)
+
+_ECSV_TYPES = {"str": "string", "int": "int64", "float": "float64"}
+
+
+def _null_nan(value):
+    """Replace a NaN with `None`, which every format can represent."""
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class TableWriter:
+    """Base class for writers of tables of translated headers.
+
+    Parameters
+    ----------
+    stream : file-like
+        Stream to write to.  Must be opened in text mode for the text
+        formats and in binary mode for binary formats.
+    chunk_size : `int`, optional
+        Number of rows to buffer before writing them.  Only used by
+        columnar formats.
+    """
+
+    binary = False
+    """Whether the output stream must be opened in binary mode."""
+
+    columnar = False
+    """Whether rows are buffered and written in chunks.  Otherwise each row
+    is written and flushed as soon as it is given to `write`."""
+
+    def __init__(self, stream, chunk_size=1000):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+    def write(self, path, obsinfo):
+        """Write the translation of a file.
+
+        Parameters
+        ----------
+        path : `str`
+            File that was translated.
+        obsinfo : `ObservationInfo` or `dict`
+            The translation, or its simple form.
+        """
+        simple = obsinfo if isinstance(obsinfo, dict) else obsinfo.to_simple()
+        row = {"path": path}
+        row.update((name, _null_nan(simple[name])) for name in COLUMNS)
+        self._rows.append(row)
+        if not self.columnar or len(self._rows) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write all the buffered rows."""
+        if self._rows:
+            self._write_chunk(self._rows)
+            self._rows = []
+        self.stream.flush()
+
+    def close(self):
+        """Write any buffered rows and finish the table.
+
+        The stream itself is not closed.
+        """
+        self.flush()
+
+    def _write_chunk(self, rows):
+        """Write a chunk of rows.
+
+        Parameters
+        ----------
+        rows : `list` of `dict`
+            Rows to write, with `None` for undefined values.
+        """
+        raise NotImplementedError()
+
+
+class JsonLinesWriter(TableWriter):
+    """Write one JSON object per line."""
+
+    def _write_chunk(self, rows):
+        self.stream.write("".join(json.dumps(row) + "\n" for row in rows))
+
+
+class CsvWriter(TableWriter):
+    """Write comma-separated values with a header line.
+
+    Undefined values are written as empty fields.
+    """
+
+    def __init__(self, stream, chunk_size=1000):
+        super().__init__(stream, chunk_size=chunk_size)
+        self._writer = csv.DictWriter(stream, fieldnames=OUTPUT_COLUMNS, lineterminator="\n")
+        self._write_header()
+
+    def _write_header(self):
+        self._writer.writeheader()
+
+    def _write_chunk(self, rows):
+        self._writer.writerows(rows)
+
+
+class EcsvWriter(CsvWriter):
+    """Write an astropy Enhanced CSV table.
+
+    The column types are declared in the header so the table can be read
+    with ``astropy.table.Table.read(format="ascii.ecsv")``.
+    """
+
+    def _write_header(self):
+        lines = ["# %ECSV 1.0", "# ---", "# delimiter: ','", "# datatype:"]
+        lines.append("# - {name: path, datatype: string}")
+        for name, (typ, _) in COLUMNS.items():
+            lines.append(f"# - {{name: {name}, datatype: {_ECSV_TYPES[typ]}}}")
+        lines.append("# schema: astropy-2.0")
+        self.stream.write("\n".join(lines) + "\n")
+        super()._write_header()
+
+
+class ParquetWriter(TableWriter):
+    """Write an Apache Parquet table with one row group per chunk.
+
+    Requires ``pyarrow``.
+
+    Raises
+    ------
+    ImportError
+        Raised if ``pyarrow`` is not installed.
+    """
+
+    binary = True
+    columnar = True
+
+    def __init__(self, stream, chunk_size=1000):
+        if pyarrow is None:
+            raise ImportError("Parquet output requires pyarrow to be installed")
+        super().__init__(stream, chunk_size=chunk_size)
+        types = {"str": pyarrow.string(), "int": pyarrow.int64(), "float": pyarrow.float64()}
+        fields = [("path", pyarrow.string())]
+        fields.extend((name, types[typ]) for name, (typ, _) in COLUMNS.items())
+        self._schema = pyarrow.schema(fields)
+        self._writer = pyarrow.parquet.ParquetWriter(stream, self._schema)
+
+    def _write_chunk(self, rows):
+        self._writer.write_table(pyarrow.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        super().close()
+        self._writer.close()
+
+
+OUTPUT_FORMATS = {"jsonl": JsonLinesWriter,
+                  "csv": CsvWriter,
+                  "ecsv": EcsvWriter,
+                  "parquet": ParquetWriter}
+"""Writer class for each supported output format."""
+
+
+def make_writer(format, stream, chunk_size=1000):
+    """Create a table writer for the named format.
+
+    Parameters
+    ----------
+    format : `str`
+        One of the keys of `OUTPUT_FORMATS`.
+    stream : file-like
+        Stream to write to.  If the writer needs a binary stream and a
+        text stream is given, the underlying binary buffer is used.
+    chunk_size : `int`, optional
+        Number of rows to buffer before writing them.  Only used by
+        columnar formats.
+
+    Returns
+    -------
+    writer : `TableWriter`
+        The writer.
+
+    Raises
+    ------
+    ValueError
+        The format is not supported.
+    ImportError
+        The optional dependency needed for the format is not installed.
+    """
+    try:
+        writer_class = OUTPUT_FORMATS[format]
+    except KeyError:
+        raise ValueError(f"Unsupported output format: {format}") from None
+    if writer_class.binary and hasattr(stream, "buffer"):
+        stream = stream.buffer
+    return writer_class(stream, chunk_size=chunk_size)
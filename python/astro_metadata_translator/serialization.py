@@ -0,0 +1,349 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Compact serialization of headers and translation results for sending
+to and from worker processes.
+
+Pickling astropy `~astropy.io.fits.Header` objects, PropertyLists or
+`ObservationInfo` objects is far more expensive than the translation
+itself.  The formats defined here only contain simple Python types and
+are serialized with `marshal`.
+"""
+
+__all__ = ("pack_headers", "unpack_headers", "pack_columns", "unpack_columns",
+           "translate_headers_multiprocess")
+
+import marshal
+import multiprocessing
+from array import array
+
+import numpy as np
+
+from .columns import COLUMNS, NULL_VALUES, column_dtype
+from .observationInfo import ObservationInfo
+
+_WIRE_TYPES = (str, int, float, bool, type(None))
+
+_NUMERIC_COLUMNS = [c for c, (t, _) in COLUMNS.items() if t != "str"]
+_STRING_COLUMNS = [c for c, (t, _) in COLUMNS.items() if t == "str"]
+
+
+def _header_items(header):
+    """Iterate over the cards of a header.
+
+    Parameters
+    ----------
+    header : `dict`-like
+        Header to iterate over.  Can be a ``PropertyList``.
+
+    Yields
+    ------
+    key : `str`
+        Header keyword.
+    value : `object`
+        Header value.
+    """
+    if hasattr(header, "toOrderedDict"):
+        header = header.toOrderedDict()
+    yield from header.items()
+
+
+def _to_wire(value):
+    """Convert a header value to a type supported by the wire format."""
+    if isinstance(value, _WIRE_TYPES):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_to_wire(v) for v in value]
+    # Anything else (for example an undefined astropy card value) is
+    # represented by its string form.
+    return str(value)
+
+
+def pack_headers(headers):
+    """Serialize a sequence of headers into a compact byte string.
+
+    All the headers share a single table of keywords and each header is
+    stored as an array of indices into that table and a tuple of values.
+    Values are restricted to `str`, `int`, `float`, `bool`, `None` and lists
+    of these types; any other value is converted to a `str`.
+
+    Parameters
+    ----------
+    headers : iterable of `dict`-like
+        Headers to serialize.
+
+    Returns
+    -------
+    packed : `bytes`
+        Serialized form of the headers.
+    """
+    keys = {}
+    packed = []
+    for header in headers:
+        indices = array("I")
+        values = []
+        for key, value in _header_items(header):
+            index = keys.get(key)
+            if index is None:
+                index = keys[key] = len(keys)
+            indices.append(index)
+            values.append(_to_wire(value))
+        packed.append((indices.tobytes(), tuple(values)))
+    return marshal.dumps((tuple(keys), packed))
+
+
+def unpack_headers(packed):
+    """Deserialize headers packed by `pack_headers`.
+
+    Parameters
+    ----------
+    packed : `bytes`
+        Serialized headers.
+
+    Returns
+    -------
+    headers : `list` of `dict`
+        The headers.  A keyword that appeared more than once in a header,
+        such as ``COMMENT`` in an `astropy.io.fits.Header`, is given a
+        `list` of the values.
+    """
+    keys, packed_headers = marshal.loads(packed)
+    headers = []
+    for indices, values in packed_headers:
+        header = {}
+        index_array = array("I")
+        index_array.frombytes(indices)
+        for index, value in zip(index_array, values):
+            key = keys[index]
+            if key in header:
+                previous = header[key]
+                if not isinstance(previous, list):
+                    header[key] = previous = [previous]
+                previous.append(value)
+            else:
+                header[key] = value
+        headers.append(header)
+    return headers
+
+
+def pack_columns(rows):
+    """Serialize simple-form translation results in columnar form.
+
+    Parameters
+    ----------
+    rows : iterable of `dict` or `None`
+        Results from `ObservationInfo.to_simple`.  `None` indicates a
+        failed translation.
+
+    Returns
+    -------
+    packed : `bytes`
+        Serialized columns.
+    """
+    rows = list(rows)
+    columns = {c: [None if r is None else r[c] for r in rows] for c in COLUMNS}
+    return marshal.dumps(columns)
+
+
+def unpack_columns(packed):
+    """Deserialize columns packed by `pack_columns`.
+
+    Parameters
+    ----------
+    packed : `bytes`
+        Serialized columns.
+
+    Returns
+    -------
+    columns : `dict` of `list`
+        Dict mapping column name to a list of values.
+    """
+    return marshal.loads(packed)
+
+
+def _numeric_dtype():
+    """Structured dtype holding all the numeric columns."""
+    return np.dtype([(c, column_dtype(c)) for c in _NUMERIC_COLUMNS])
+
+
+_worker_state = {}
+
+
+def _init_worker(pedantic, shm_name, n_rows):
+    """Initialize a translation worker process.
+
+    Parameters
+    ----------
+    pedantic : `bool`
+        Passed to `ObservationInfo`.
+    shm_name : `str` or `None`
+        Name of the shared memory block holding the numeric result array.
+    n_rows : `int`
+        Number of rows in the numeric result array.
+    """
+    _worker_state["pedantic"] = pedantic
+    if shm_name is not None:
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _worker_state["shm"] = shm
+        _worker_state["numeric"] = np.ndarray((n_rows, ), dtype=_numeric_dtype(), buffer=shm.buf)
+
+
+def _translate_chunk(task):
+    """Translate a chunk of packed headers in a worker process.
+
+    Parameters
+    ----------
+    task : `tuple`
+        Offset of the chunk in the full list of headers and the headers
+        packed by `pack_headers`.
+
+    Returns
+    -------
+    offset : `int`
+        Offset of the chunk.
+    packed : `bytes`
+        Packed result columns.  Only contains string columns if numeric
+        columns were written to shared memory.
+    errors : `list` of `tuple`
+        Row index and error message of each failed translation.
+    """
+    offset, packed = task
+    pedantic = _worker_state["pedantic"]
+    numeric = _worker_state.get("numeric")
+    rows = []
+    errors = []
+    for i, header in enumerate(unpack_headers(packed)):
+        try:
+            row = ObservationInfo(header, pedantic=pedantic, deferred_coordinates=True,
+                                  raw_time=True).to_simple()
+        except Exception as e:
+            errors.append((offset + i, f"{type(e).__name__}: {e}"))
+            row = None
+        rows.append(row)
+
+    if numeric is None:
+        return offset, pack_columns(rows), errors
+
+    for i, row in enumerate(rows):
+        if row is None:
+            continue
+        numeric[offset + i] = tuple(NULL_VALUES[COLUMNS[c][0]] if row[c] is None else row[c]
+                                    for c in _NUMERIC_COLUMNS)
+    strings = {c: [None if r is None else r[c] for r in rows] for c in _STRING_COLUMNS}
+    return offset, marshal.dumps(strings), errors
+
+
+def _chunks(headers, chunksize):
+    """Yield packed chunks of headers with their offsets."""
+    chunk = []
+    offset = 0
+    for header in headers:
+        chunk.append(header)
+        if len(chunk) == chunksize:
+            yield offset, pack_headers(chunk)
+            offset += len(chunk)
+            chunk = []
+    if chunk:
+        yield offset, pack_headers(chunk)
+
+
+def translate_headers_multiprocess(headers, processes=None, chunksize=64, pedantic=False,
+                                   shared_memory=True):
+    """Translate headers in a pool of worker processes.
+
+    Headers are sent to the workers in chunks using `pack_headers` and
+    results are returned in columnar form.
+
+    Parameters
+    ----------
+    headers : sequence of `dict`-like
+        Headers to translate.
+    processes : `int`, optional
+        Number of worker processes.  Defaults to the number of CPUs.
+    chunksize : `int`, optional
+        Number of headers to send to a worker in each task.
+    pedantic : `bool`, optional
+        Passed to `ObservationInfo`.
+    shared_memory : `bool`, optional
+        If `True` workers write the numeric columns directly into a
+        shared memory array rather than sending them back to the parent
+        process.
+
+    Returns
+    -------
+    columns : `dict`
+        Dict mapping each column of `~astro_metadata_translator.COLUMNS`
+        to a `numpy.ndarray` (numeric columns) or a `list` (string columns).
+        Undefined numeric values use the values from
+        `~astro_metadata_translator.NULL_VALUES` and undefined strings are
+        `None`.
+    errors : `dict`
+        Dict mapping the index of each header that could not be translated
+        to the error message.  The corresponding rows of ``columns`` are
+        undefined.
+    """
+    headers = list(headers)
+    n_rows = len(headers)
+    dtype = _numeric_dtype()
+
+    shm = None
+    if shared_memory and n_rows:
+        from multiprocessing import shared_memory as shm_module
+        shm = shm_module.SharedMemory(create=True, size=n_rows * dtype.itemsize)
+
+    columns = {c: [None] * n_rows for c in _STRING_COLUMNS}
+    errors = {}
+    numeric = None
+    try:
+        if shm is not None:
+            numeric = np.ndarray((n_rows, ), dtype=dtype, buffer=shm.buf)
+            numeric[...] = tuple(NULL_VALUES[COLUMNS[c][0]] for c in _NUMERIC_COLUMNS)
+            initargs = (pedantic, shm.name, n_rows)
+        else:
+            numeric = np.empty((n_rows, ), dtype=dtype)
+            numeric[...] = tuple(NULL_VALUES[COLUMNS[c][0]] for c in _NUMERIC_COLUMNS)
+            initargs = (pedantic, None, 0)
+
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=initargs) as pool:
+            for offset, packed, chunk_errors in pool.imap_unordered(_translate_chunk,
+                                                                    _chunks(headers, chunksize)):
+                chunk = marshal.loads(packed)
+                n = len(chunk[_STRING_COLUMNS[0]])
+                for c in _STRING_COLUMNS:
+                    columns[c][offset:offset + n] = chunk[c]
+                if shm is None:
+                    for c in _NUMERIC_COLUMNS:
+                        null = NULL_VALUES[COLUMNS[c][0]]
+                        numeric[c][offset:offset + n] = [null if v is None else v for v in chunk[c]]
+                errors.update(chunk_errors)
+
+        for c in _NUMERIC_COLUMNS:
+            # Copy out of shared memory before it is released
+            columns[c] = numeric[c].copy()
+    finally:
+        if shm is not None:
+            # The array must not reference the buffer when it is closed
+            numeric = None
+            shm.close()
+            shm.unlink()
+
+    return {c: columns[c] for c in COLUMNS}, errors
@@ -0,0 +1,289 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Long-lived translation service accessed through a Unix domain socket.
+
+Importing astropy and building the translator tables takes far longer
+than translating a single header.  A `TranslationServer` pays that cost
+once and then translates files or headers on request, keeping all the
+translator caches warm between requests.
+
+The protocol is line-oriented JSON.  Each request is a JSON object on a
+single line containing either a ``file`` (with optional ``hdu``) or a
+``header`` mapping.  Each response is a single line containing either
+``{"observation": simple}``, where ``simple`` is the result of
+`ObservationInfo.to_simple`, or ``{"error": message}``.  Any number of
+requests can be sent over one connection.
+"""
+
+__all__ = ("TranslationServer", "TranslationClient")
+
+import json
+import os
+import socket
+import socketserver
+import stat
+
+from .batch import _translate_file
+from .observationInfo import ObservationInfo
+
+
+def _remove_stale_socket(path):
+    """Remove a socket left behind by a server that is no longer running.
+
+    Parameters
+    ----------
+    path : `str`
+        Path of the socket.
+
+    Raises
+    ------
+    FileExistsError
+        Raised if ``path`` exists and is not a socket.
+    OSError
+        Raised if a server is still accepting connections on ``path``.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"Can not create a socket at {path}: file exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except ConnectionRefusedError:
+            pass
+        else:
+            raise OSError(f"A server is already listening on {path}")
+    os.unlink(path)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Translate each request read from a connection."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.respond(line)
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class TranslationServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Server translating files and headers sent over a Unix socket.
+
+    Parameters
+    ----------
+    path : `str`
+        Path of the socket to create.  A stale socket left by a previous
+        server is replaced.
+    hdu : `int`, optional
+        Header data unit to read from files when the request does not
+        specify one.
+    pedantic : `bool`, optional
+        Passed to `ObservationInfo`.
+    translation_cards_only : `bool`, optional
+        If `True` only the cards listed by
+        `MetadataTranslator.translation_cards` are read from files.  This
+        is faster but translators that read other cards will fail.
+
+    Raises
+    ------
+    FileExistsError
+        Raised if ``path`` exists and is not a socket.
+    OSError
+        Raised if another server is listening on ``path``.
+
+    Notes
+    -----
+    Each connection is handled in its own thread.  Use `serve_forever` to
+    run the server and `shutdown` from another thread to stop it.  The
+    socket file is removed by `server_close`.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, hdu=1, pedantic=False, translation_cards_only=False):
+        _remove_stale_socket(path)
+        self.path = path
+        self.hdu = hdu
+        self.pedantic = pedantic
+        self.translation_cards_only = translation_cards_only
+        # Only a socket created by this server is removed on close
+        self._bound = False
+        super().__init__(path, _RequestHandler)
+
+    def server_bind(self):
+        super().server_bind()
+        self._bound = True
+
+    def server_close(self):
+        super().server_close()
+        if self._bound and os.path.exists(self.path):
+            os.unlink(self.path)
+        self._bound = False
+
+    def translate(self, request):
+        """Translate a single request.
+
+        Parameters
+        ----------
+        request : `dict`
+            Request containing either a ``file`` and optional ``hdu``, or
+            a ``header``.
+
+        Returns
+        -------
+        obsinfo : `ObservationInfo`
+            The translation.
+
+        Raises
+        ------
+        ValueError
+            The request did not contain a file or a header.
+        """
+        if "header" in request:
+            return ObservationInfo(request["header"], pedantic=self.pedantic)
+        if "file" in request:
+            result = _translate_file(request["file"], request.get("hdu", self.hdu), None, self.pedantic,
+                                     translation_cards_only=self.translation_cards_only)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        raise ValueError("Request must contain a 'file' or a 'header'")
+
+    def respond(self, line):
+        """Create the response to one line of a request.
+
+        Parameters
+        ----------
+        line : `bytes`
+            JSON-encoded request.
+
+        Returns
+        -------
+        response : `dict`
+            The simple form of the translation or the error.
+        """
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            return {"observation": self.translate(request).to_simple()}
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+
+class TranslationClient:
+    """Client for a `TranslationServer`.
+
+    Parameters
+    ----------
+    path : `str`
+        Path of the server socket.
+
+    Notes
+    -----
+    A single connection is used for all requests.  The client can be used
+    as a context manager to close it.
+    """
+
+    def __init__(self, path):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._rfile = self._socket.makefile("rb")
+
+    def close(self):
+        """Close the connection to the server."""
+        self._rfile.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _request(self, request):
+        """Send a request and return the simple form of the result.
+
+        Raises
+        ------
+        RuntimeError
+            The server could not translate the request.
+        """
+        self._socket.sendall(json.dumps(request).encode() + b"\n")
+        line = self._rfile.readline()
+        if not line:
+            raise RuntimeError("Connection closed by translation server")
+        response = json.loads(line)
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["observation"]
+
+    def translate_file(self, file, hdu=None):
+        """Translate the header of a file.
+
+        Parameters
+        ----------
+        file : `str`
+            Name of the file.  Relative paths are interpreted by the server
+            so are converted to absolute paths first.
+        hdu : `int`, optional
+            Header data unit to read.  The server default is used if not
+            given.
+
+        Returns
+        -------
+        obsinfo : `ObservationInfo`
+            The translation.
+
+        Raises
+        ------
+        RuntimeError
+            The server could not translate the file.
+        """
+        request = {"file": os.path.abspath(file)}
+        if hdu is not None:
+            request["hdu"] = hdu
+        return ObservationInfo.from_simple(self._request(request))
+
+    def translate_header(self, header):
+        """Translate a header.
+
+        Parameters
+        ----------
+        header : `dict`
+            Header to translate.  Values must be serializable as JSON.
+
+        Returns
+        -------
+        obsinfo : `ObservationInfo`
+            The translation.
+
+        Raises
+        ------
+        RuntimeError
+            The server could not translate the header.
+        """
+        return ObservationInfo.from_simple(self._request({"header": dict(header)}))
@@ -0,0 +1,192 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Deterministic partitioning of file lists for translation on many nodes.
+
+Every node selects its own shard of the full file list using a hash of
+each path, so no coordination is needed beyond agreeing on the number of
+shards.  The JSON Lines outputs of the shards are then combined with
+`merge_shards`, which also reports observations that were translated more
+than once.
+"""
+
+__all__ = ("SHARD_KEYS", "parse_shard", "shard_index", "select_shard", "read_shard_rows", "merge_shards")
+
+import hashlib
+import json
+import os
+
+from .columns import COLUMNS
+
+SHARD_KEYS = ("path", "directory")
+"""Supported ways of assigning files to shards."""
+
+
+def parse_shard(spec):
+    """Parse a shard specification.
+
+    Parameters
+    ----------
+    spec : `str`
+        Specification of the form ``i/N`` selecting shard ``i`` of ``N``,
+        counting from zero.
+
+    Returns
+    -------
+    shard : `int`
+        Index of the shard.
+    n_shards : `int`
+        Total number of shards.
+
+    Raises
+    ------
+    ValueError
+        The specification could not be interpreted.
+    """
+    try:
+        shard, n_shards = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must be of the form i/N, not {spec!r}") from None
+    if n_shards < 1 or not 0 <= shard < n_shards:
+        raise ValueError(f"Shard {shard} is not in the range 0 to {n_shards - 1}")
+    return shard, n_shards
+
+
+def shard_index(path, n_shards, by="path"):
+    """Calculate the shard a file belongs to.
+
+    Parameters
+    ----------
+    path : `str`
+        Path of the file.  Normalized with `os.path.normpath` but not made
+        absolute, so all nodes must use the same form of the paths.
+    n_shards : `int`
+        Total number of shards.
+    by : `str`, optional
+        ``path`` to spread files evenly over the shards or ``directory``
+        to keep all the files in a directory in the same shard.
+
+    Returns
+    -------
+    shard : `int`
+        Index of the shard.
+    """
+    if by not in SHARD_KEYS:
+        raise ValueError(f"Unrecognized shard key {by!r}, expected one of {SHARD_KEYS}")
+    key = os.path.normpath(path)
+    if by == "directory":
+        key = os.path.dirname(key)
+    # A cryptographic hash is used for its stability across processes and
+    # platforms, unlike the built-in hash().
+    digest = hashlib.sha1(key.encode("utf-8", errors="surrogateescape")).digest()
+    return int.from_bytes(digest[:8], "big") % n_shards
+
+
+def select_shard(files, shard, n_shards, by="path"):
+    """Select the files belonging to one shard.
+
+    Parameters
+    ----------
+    files : iterable of `str`
+        Full list of files.  Consumed lazily.
+    shard : `int`
+        Index of the shard to select.
+    n_shards : `int`
+        Total number of shards.
+    by : `str`, optional
+        How files are assigned to shards.  See `shard_index`.
+
+    Yields
+    ------
+    file : `str`
+        Files belonging to the shard, in their original order.
+    """
+    for file in files:
+        if shard_index(file, n_shards, by=by) == shard:
+            yield file
+
+
+def read_shard_rows(path):
+    """Read the translations written by one shard.
+
+    Parameters
+    ----------
+    path : `str`
+        JSON Lines table written with ``--format jsonl``, or a
+        `~astro_metadata_translator.TranslationJournal`.
+
+    Yields
+    ------
+    row : `dict`
+        The path of a translated file and the simple form of its
+        translation.  Failed translations in a journal are skipped.
+    """
+    with open(path) as fd:
+        for line in fd:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if "error" in row:
+                continue
+            if "observation" in row:
+                row = dict(path=row["path"], **row["observation"])
+            yield row
+
+
+def merge_shards(paths, writer=None):
+    """Combine the translations from many shards.
+
+    Parameters
+    ----------
+    paths : iterable of `str`
+        Outputs of the shards.  See `read_shard_rows`.
+    writer : `~astro_metadata_translator.TableWriter`, optional
+        If given, every row is written to it.
+
+    Returns
+    -------
+    rows : `list` of `dict`
+        The combined rows, in the order read.  A file present in more than
+        one shard is only included once.
+    duplicates : `dict` [`tuple`, `list` of `str`]
+        Files from different rows describing the same observation, keyed
+        by ``(instrument, exposure_id, detector_exposure_id)``.  Only
+        observations with a defined ``exposure_id`` or
+        ``detector_exposure_id`` are considered.
+    """
+    rows = []
+    seen = set()
+    observations = {}
+    for path in paths:
+        for row in read_shard_rows(path):
+            if row["path"] in seen:
+                continue
+            seen.add(row["path"])
+            row = {name: row.get(name) for name in ("path", ) + tuple(COLUMNS)}
+            rows.append(row)
+            if writer is not None:
+                writer.write(row["path"], row)
+            if row["exposure_id"] is None and row["detector_exposure_id"] is None:
+                continue
+            key = (row["instrument"], row["exposure_id"], row["detector_exposure_id"])
+            observations.setdefault(key, []).append(row["path"])
+    duplicates = {key: files for key, files in observations.items() if len(files) > 1}
+    return rows, duplicates
@@ -0,0 +1,216 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Spatial index over the tracking coordinates of many observations.
+
+Positions are grouped into bands of declination and sorted by right
+ascension within each band.  A cone search only examines the bands that
+overlap the cone and, within each band, the range of right ascension that
+can contain matches, before calculating exact separations with NumPy.
+"""
+
+__all__ = ("SpatialIndex", )
+
+import math
+
+import numpy as np
+import astropy.units as u
+
+from .columns import icrs_degrees
+
+
+def _degrees(value):
+    """Convert an angle to degrees.
+
+    Parameters
+    ----------
+    value : `float` or `astropy.units.Quantity`
+        The angle.  A `float` is assumed to be in degrees.
+
+    Returns
+    -------
+    degrees : `float`
+        The angle in degrees.
+    """
+    if isinstance(value, u.Quantity):
+        return float(value.to_value(u.deg))
+    return float(value)
+
+
+def _separation(ra1, dec1, ra2, dec2):
+    """Angular separation using the haversine formula.
+
+    All angles are in radians.
+    """
+    sin_ddec = np.sin((dec2 - dec1) / 2.0)
+    sin_dra = np.sin((ra2 - ra1) / 2.0)
+    a = sin_ddec**2 + np.cos(dec1) * np.cos(dec2) * sin_dra**2
+    return 2.0 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """Index of sky positions supporting fast cone searches.
+
+    Parameters
+    ----------
+    ra : array-like of `float`
+        ICRS right ascension of each position in degrees.  Positions with
+        a non-finite coordinate are not indexed.
+    dec : array-like of `float`
+        ICRS declination of each position in degrees.
+    band_height : `float`, optional
+        Height of each declination band in degrees.  Smaller bands are
+        faster for small search radii on large collections.
+    """
+
+    def __init__(self, ra, dec, band_height=1.0):
+        ra = np.asarray(ra, dtype=float)
+        dec = np.asarray(dec, dtype=float)
+        if ra.shape != dec.shape:
+            raise ValueError(f"RA and Dec must have the same shape, not {ra.shape} and {dec.shape}")
+        self.band_height = float(band_height)
+        self._n_bands = int(math.ceil(180.0 / self.band_height))
+
+        ids = np.flatnonzero(np.isfinite(ra) & np.isfinite(dec))
+        ra = np.mod(ra[ids], 360.0)
+        dec = dec[ids]
+        bands = self._band(dec)
+        order = np.lexsort((ra, bands))
+        self._ids = ids[order]
+        self._ra = ra[order]
+        self._dec = dec[order]
+        self._ra_rad = np.radians(self._ra)
+        self._dec_rad = np.radians(self._dec)
+        self._band_starts = np.searchsorted(bands[order], np.arange(self._n_bands + 1))
+
+    @classmethod
+    def from_observations(cls, obsinfos, band_height=1.0):
+        """Create an index from the ``tracking_radec`` of observations.
+
+        Parameters
+        ----------
+        obsinfos : iterable of `ObservationInfo`
+            The observations.  Observations without a tracking position
+            are not indexed.
+        band_height : `float`, optional
+            Height of each declination band in degrees.
+
+        Returns
+        -------
+        index : `SpatialIndex`
+            The index.  Results of `cone_search` refer to the position of
+            each observation in ``obsinfos``.
+        """
+        ra = []
+        dec = []
+        for obsinfo in obsinfos:
+            r, d = icrs_degrees(obsinfo.tracking_radec)
+            ra.append(math.nan if r is None else r)
+            dec.append(math.nan if d is None else d)
+        return cls(ra, dec, band_height=band_height)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _band(self, dec):
+        """Calculate the band containing each declination."""
+        return np.clip(np.floor((np.asarray(dec) + 90.0) / self.band_height).astype(int),
+                       0, self._n_bands - 1)
+
+    def _candidates(self, ra, dec, radius):
+        """Find the slices of the sorted arrays that may match a cone.
+
+        Returns
+        -------
+        slices : `list` of `slice`
+            Slices of the sorted arrays.
+        """
+        first, last = self._band([max(dec - radius, -90.0), min(dec + radius, 90.0)])
+        if abs(dec) + radius >= 90.0:
+            # Cone includes a pole so every RA is possible
+            half_width = 180.0
+        else:
+            ratio = math.sin(math.radians(radius)) / math.cos(math.radians(dec))
+            half_width = math.degrees(math.asin(min(1.0, ratio)))
+        if half_width >= 180.0:
+            ranges = [(0.0, 360.0)]
+        else:
+            low, high = ra - half_width, ra + half_width
+            if low < 0.0:
+                ranges = [(low + 360.0, 360.0), (0.0, high)]
+            elif high > 360.0:
+                ranges = [(low, 360.0), (0.0, high - 360.0)]
+            else:
+                ranges = [(low, high)]
+
+        slices = []
+        for band in range(first, last + 1):
+            start, stop = self._band_starts[band], self._band_starts[band + 1]
+            band_ra = self._ra[start:stop]
+            for low, high in ranges:
+                i = np.searchsorted(band_ra, low, side="left")
+                j = np.searchsorted(band_ra, high, side="right")
+                if j > i:
+                    slices.append(slice(start + i, start + j))
+        return slices
+
+    def cone_search(self, ra, dec, radius, return_separation=False):
+        """Find the positions within a circle on the sky.
+
+        Parameters
+        ----------
+        ra : `float` or `astropy.units.Quantity`
+            ICRS right ascension of the center, in degrees if a `float`.
+        dec : `float` or `astropy.units.Quantity`
+            ICRS declination of the center, in degrees if a `float`.
+        radius : `float` or `astropy.units.Quantity`
+            Radius of the circle, in degrees if a `float`.
+        return_separation : `bool`, optional
+            If `True` also return the separation of each match.
+
+        Returns
+        -------
+        indices : `numpy.ndarray` of `int`
+            Indices of the matching positions in the arrays used to create
+            the index, ordered by increasing separation.
+        separations : `numpy.ndarray` of `float`
+            Separation of each match in degrees.  Only returned if
+            ``return_separation`` is `True`.
+        """
+        ra = _degrees(ra) % 360.0
+        dec = _degrees(dec)
+        radius = _degrees(radius)
+
+        slices = self._candidates(ra, dec, radius)
+        if slices:
+            candidates = np.concatenate([np.arange(s.start, s.stop) for s in slices])
+        else:
+            candidates = np.array([], dtype=int)
+        separation = np.degrees(_separation(math.radians(ra), math.radians(dec),
+                                            self._ra_rad[candidates], self._dec_rad[candidates]))
+        matched = separation <= radius
+        candidates = candidates[matched]
+        separation = separation[matched]
+        order = np.argsort(separation, kind="stable")
+        indices = self._ids[candidates[order]]
+        if return_separation:
+            return indices, separation[order]
+        return indices
@@ -0,0 +1,358 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Memory-mapped storage for large collections of translated observations.
+
+The simple form of each observation is stored as one record of a NumPy
+structured array in a ``.npy`` file.  Numeric columns are stored as
+fixed-width fields.  String columns with few distinct values, such as the
+instrument or filter, are stored as `int32` codes into per-column
+dictionaries held in a small JSON sidecar file.  String columns with a
+different value for almost every observation, such as the observation
+ID, are stored as UTF-8 text in a blob file per column, indexed by an
+array of offsets.  Opening a store maps the arrays into memory so that
+loading and scanning millions of observations does not require reading
+or unpickling them.
+"""
+
+__all__ = ("ObservationStore", "write_observation_store")
+
+import json
+import os
+
+import numpy as np
+
+from .columns import COLUMNS, NULL_VALUES, column_dtype
+from .observationInfo import ObservationInfo
+
+_ARRAY_FILE = "observations.npy"
+_STRINGS_FILE = "strings.json"
+_STORE_VERSION = 2
+
+_STRING_COLUMNS = tuple(c for c, (t, _) in COLUMNS.items() if t == "str")
+_TEXT_COLUMNS = ("object", "observation_id")
+"""String columns whose values are mostly unique, so are stored as text
+rather than as dictionary codes."""
+_CODED_COLUMNS = tuple(c for c in _STRING_COLUMNS if c not in _TEXT_COLUMNS)
+_NULL_CODE = -1
+
+
+def _store_dtype():
+    """Structured dtype of a store record."""
+    return np.dtype([(c, "i4" if c in _CODED_COLUMNS else column_dtype(c))
+                     for c in COLUMNS if c not in _TEXT_COLUMNS])
+
+
+def _text_paths(path, name):
+    """Return the offsets and blob files of a text column."""
+    return os.path.join(path, f"{name}.offsets.npy"), os.path.join(path, f"{name}.txt")
+
+
+def _map_bytes(path):
+    """Map a file into memory as an array of bytes."""
+    if os.path.getsize(path) == 0:
+        # Empty files can not be mapped
+        return np.zeros(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode="r")
+
+
+def _as_simple(observation):
+    """Return the simple form of an `ObservationInfo` or simple `dict`."""
+    if isinstance(observation, ObservationInfo):
+        return observation.to_simple()
+    return observation
+
+
+def write_observation_store(path, observations, overwrite=False):
+    """Write observations to a memory-mappable store.
+
+    Parameters
+    ----------
+    path : `str`
+        Directory to write the store to.  Created if it does not exist.
+    observations : sequence of `ObservationInfo` or `dict`, or `dict`
+        Observations to store, either as `ObservationInfo` objects or in
+        the simple form returned by `ObservationInfo.to_simple`.  A `dict`
+        mapping column name to a sequence of values, as returned by
+        `~astro_metadata_translator.translate_headers_multiprocess`, is
+        also accepted.
+    overwrite : `bool`, optional
+        If `False` an existing store at ``path`` is not replaced.
+
+    Returns
+    -------
+    store : `ObservationStore`
+        The store, opened for reading.
+
+    Raises
+    ------
+    FileExistsError
+        Raised if a store already exists at ``path`` and ``overwrite``
+        is `False`.
+    """
+    array_path = os.path.join(path, _ARRAY_FILE)
+    strings_path = os.path.join(path, _STRINGS_FILE)
+    if not overwrite and os.path.exists(array_path):
+        raise FileExistsError(f"Observation store already exists at {path}")
+    os.makedirs(path, exist_ok=True)
+
+    if isinstance(observations, dict):
+        columns = observations
+        n_rows = len(columns[next(iter(COLUMNS))])
+        rows = ({c: columns[c][i] for c in COLUMNS} for i in range(n_rows))
+    else:
+        if not hasattr(observations, "__len__"):
+            observations = list(observations)
+        n_rows = len(observations)
+        rows = (_as_simple(o) for o in observations)
+
+    codes = {c: {} for c in _CODED_COLUMNS}
+    array = np.lib.format.open_memmap(array_path, mode="w+", dtype=_store_dtype(), shape=(n_rows, ))
+    # Undefined text values are stored as empty strings
+    offsets = {}
+    blobs = {}
+    try:
+        for name in _TEXT_COLUMNS:
+            offsets_path, blob_path = _text_paths(path, name)
+            offsets[name] = np.lib.format.open_memmap(offsets_path, mode="w+", dtype=np.int64,
+                                                      shape=(n_rows + 1, ))
+            offsets[name][0] = 0
+            blobs[name] = open(blob_path, "wb")
+        for i, simple in enumerate(rows):
+            record = []
+            for name in COLUMNS:
+                value = simple.get(name)
+                if name in _TEXT_COLUMNS:
+                    if value:
+                        text = value.encode("utf-8")
+                        blobs[name].write(text)
+                        offsets[name][i + 1] = offsets[name][i] + len(text)
+                    else:
+                        offsets[name][i + 1] = offsets[name][i]
+                    continue
+                if name in _CODED_COLUMNS:
+                    if value is None or value == NULL_VALUES["str"]:
+                        value = _NULL_CODE
+                    else:
+                        value = codes[name].setdefault(value, len(codes[name]))
+                elif value is None:
+                    value = NULL_VALUES[COLUMNS[name][0]]
+                record.append(value)
+            array[i] = tuple(record)
+        array.flush()
+        for name in _TEXT_COLUMNS:
+            offsets[name].flush()
+    finally:
+        del array
+        offsets.clear()
+        for blob in blobs.values():
+            blob.close()
+
+    with open(strings_path, "w") as fd:
+        json.dump({"version": _STORE_VERSION, "columns": {c: list(codes[c]) for c in _CODED_COLUMNS},
+                   "text_columns": list(_TEXT_COLUMNS)}, fd)
+    return ObservationStore(path)
+
+
+class ObservationStore:
+    """Read-only, memory-mapped collection of translated observations.
+
+    Parameters
+    ----------
+    path : `str`
+        Directory containing a store written by `write_observation_store`.
+
+    Notes
+    -----
+    Numeric columns are returned as views of the memory-mapped array so
+    only the pages that are accessed are read from disk.  Undefined values
+    use `~astro_metadata_translator.NULL_VALUES`.  String columns are
+    decoded on request.  Selecting rows by the value of a dictionary-coded
+    column with `where` compares the codes and never decodes the column;
+    the mostly unique ``object`` and ``observation_id`` columns are
+    compared as raw bytes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, _STRINGS_FILE)) as fd:
+            strings = json.load(fd)
+        if strings.get("version") != _STORE_VERSION:
+            raise ValueError(f"Unsupported observation store version {strings.get('version')!r} in {path}")
+        self._dictionaries = strings["columns"]
+        self._array = np.load(os.path.join(path, _ARRAY_FILE), mmap_mode="r")
+        self._text = {}
+        for name in _TEXT_COLUMNS:
+            offsets_path, blob_path = _text_paths(path, name)
+            self._text[name] = (np.load(offsets_path, mmap_mode="r"), _map_bytes(blob_path))
+
+    def _text_value(self, name, index):
+        """Return one value of a text column, or `None` if undefined."""
+        offsets, blob = self._text[name]
+        # Normalize negative indices
+        index = range(len(self))[index]
+        start, end = offsets[index], offsets[index + 1]
+        return blob[start:end].tobytes().decode("utf-8") if end > start else None
+
+    def __len__(self):
+        return len(self._array)
+
+    def __getitem__(self, index):
+        return ObservationInfo.from_simple(self.simple(index))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def array(self):
+        """The memory-mapped structured array of records
+        (`numpy.memmap`).
+
+        Dictionary-coded string columns hold codes into `dictionary`,
+        with ``-1`` for undefined values.  The ``object`` and
+        ``observation_id`` columns are not included; use `column`.
+        """
+        return self._array
+
+    def dictionary(self, name):
+        """Return the distinct values of a string column.
+
+        Parameters
+        ----------
+        name : `str`
+            Name of a dictionary-coded string column.
+
+        Returns
+        -------
+        values : `list` of `str`
+            The values, indexed by code.
+
+        Raises
+        ------
+        ValueError
+            Raised if the column is not dictionary-coded.
+        """
+        if name not in self._dictionaries:
+            raise ValueError(f"Column {name!r} is not stored as a dictionary")
+        return self._dictionaries[name]
+
+    def column(self, name):
+        """Return the values of a column.
+
+        Parameters
+        ----------
+        name : `str`
+            Name of a column in `~astro_metadata_translator.COLUMNS`.
+
+        Returns
+        -------
+        values : `numpy.ndarray`
+            A read-only view of the memory-mapped numeric values, or for
+            string columns a newly-allocated object array of the decoded
+            values, with `None` for undefined values.
+        """
+        if name in _TEXT_COLUMNS:
+            values = np.empty(len(self), dtype=object)
+            values[:] = [self._text_value(name, i) for i in range(len(self))]
+            return values
+        if name not in _STRING_COLUMNS:
+            return self._array[name]
+        # The extra entry decodes the null code
+        lookup = np.array(self._dictionaries[name] + [None], dtype=object)
+        return lookup[self._array[name]]
+
+    def where(self, **values):
+        """Find the observations with the given string column values.
+
+        Parameters
+        ----------
+        **values
+            String column names and the value each must have, for example
+            ``instrument="HSC", observation_type="science"``.  A `None`
+            value matches undefined values.
+
+        Returns
+        -------
+        indices : `numpy.ndarray` of `int`
+            Indices of the matching observations.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for name, value in values.items():
+            if name not in _STRING_COLUMNS:
+                raise ValueError(f"Can only select on string columns, not {name!r}")
+            if name in _TEXT_COLUMNS:
+                mask &= self._text_mask(name, value)
+                continue
+            if value is None:
+                code = _NULL_CODE
+            else:
+                try:
+                    code = self._dictionaries[name].index(value)
+                except ValueError:
+                    return np.array([], dtype=np.int64)
+            mask &= self._array[name] == code
+        return np.flatnonzero(mask)
+
+    def _text_mask(self, name, value):
+        """Return a mask of the rows where a text column has a value."""
+        offsets, blob = self._text[name]
+        lengths = np.diff(offsets)
+        if value is None:
+            return lengths == 0
+        text = value.encode("utf-8")
+        mask = lengths == len(text)
+        if not text:
+            # Empty strings are not distinguished from undefined values
+            return mask
+        # Only compare the bytes of values with the right length
+        for i in np.flatnonzero(mask):
+            mask[i] = blob[offsets[i]:offsets[i + 1]].tobytes() == text
+        return mask
+
+    def simple(self, index):
+        """Return the simple form of one observation.
+
+        Parameters
+        ----------
+        index : `int`
+            Index of the observation.
+
+        Returns
+        -------
+        simple : `dict`
+            The simple form, as returned by `ObservationInfo.to_simple`.
+        """
+        record = self._array[index]
+        simple = {}
+        for name in COLUMNS:
+            if name in _TEXT_COLUMNS:
+                simple[name] = self._text_value(name, index)
+                continue
+            value = record[name].item()
+            if name in _STRING_COLUMNS:
+                value = None if value == _NULL_CODE else self._dictionaries[name][value]
+            elif COLUMNS[name][0] == "int":
+                value = None if value == NULL_VALUES["int"] else value
+            elif value != value:
+                value = None
+            simple[name] = value
+        return simple
@@ -21,10 +21,12 @@
 
 """Classes and support code for metadata translation"""
 
-__all__ = ("MetadataTranslator", "StubTranslator", "cache_translation")
+__all__ = ("MetadataTranslator", "StubTranslator", "cache_translation", "CARD_TRACKING_MODES")
 
 from abc import abstractmethod, ABCMeta
+import copy
 import logging
+import threading
 import warnings
 import math
 
@@ -35,6 +37,163 @@ from .properties import PROPERTIES
 
 log = logging.getLogger(__name__)
 
+_NO_DEFAULT = object()
+"""Marker indicating that no default value was supplied."""
+
+_NOT_FOUND = object()
+"""Marker returned by a header lookup when no keyword matched."""
+
+
+class _Missing:
+    """Result of a translation whose value could not be determined.
+
+    Translation methods return an instance of this class, rather than
+    raising `KeyError`, when the header does not contain the information
+    they need.  Missing values are common in calibration headers and
+    raising and catching an exception for each of them is expensive.  The
+    public ``to_x()`` methods convert the value to a `KeyError` so the
+    sentinel is never seen outside of the translation machinery.
+
+    Parameters
+    ----------
+    message : `str`
+        Explanation of why the value is missing, as a ``%``-style format
+        string.
+    *args
+        Arguments for ``message``.  Only formatted if the explanation is
+        needed.
+    """
+
+    __slots__ = ("_message", "_args", "_error", "_traceback")
+
+    def __init__(self, message, *args):
+        self._message = message
+        self._args = args
+        self._error = None
+        self._traceback = None
+
+    @classmethod
+    def from_exception(cls, error):
+        """Wrap a `KeyError` raised by a translation method.
+
+        Parameters
+        ----------
+        error : `KeyError`
+            The exception.
+
+        Returns
+        -------
+        missing : `_Missing`
+            Sentinel that will raise ``error`` again when needed.
+        """
+        missing = cls(None)
+        missing._error = error
+        missing._traceback = error.__traceback__
+        return missing
+
+    def detached(self):
+        """Return an equivalent sentinel that does not refer to the
+        translation that created it.
+
+        The traceback of a wrapped exception refers to the frames, and so
+        to the translator and header, of the translation that raised it.
+
+        Returns
+        -------
+        missing : `_Missing`
+            Sentinel that can be kept after the translator is discarded.
+        """
+        if self._error is None or self._traceback is None:
+            return self
+        # Copying an exception drops its traceback and context
+        return self.from_exception(copy.copy(self._error))
+
+    @property
+    def exception_type(self):
+        """Type of the exception representing this missing value
+        (`type`)."""
+        return KeyError if self._error is None else type(self._error)
+
+    @property
+    def reason(self):
+        """Explanation of why the value is missing (`str`)."""
+        if self._error is not None:
+            return str(self._error)
+        return self._message % self._args if self._args else self._message
+
+    def exception(self):
+        """Return the exception representing this missing value.
+
+        Returns
+        -------
+        error : `KeyError`
+            A new `KeyError`, or the original exception with its original
+            traceback if the sentinel wraps an exception.
+        """
+        if self._error is not None:
+            return self._error.with_traceback(self._traceback)
+        return KeyError(self.reason)
+
+    def __repr__(self):
+        return f"_Missing({self.reason!r})"
+
+
+def _to_str(value):
+    """Normalize a header value to a stripped string."""
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+def _to_float(value):
+    """Convert a string header value to a `float`.
+
+    Other values, including undefined values, are returned unchanged so
+    that a default can be applied by `MetadataTranslator.validate_value`.
+    """
+    return float(value) if isinstance(value, str) else value
+
+
+_CARD_NORMALIZERS = {"raw": None,
+                     "str": _to_str,
+                     "lower": lambda v: _to_str(v).lower(),
+                     "upper": lambda v: _to_str(v).upper(),
+                     "float": _to_float,
+                     "int": int}
+"""Conversions supported by `MetadataTranslator._get_card`."""
+
+CARD_TRACKING_MODES = ("set", "bitmask", None)
+"""Supported modes for recording which header cards were used."""
+
+_REGISTRY_LOCK = threading.RLock()
+"""Lock protecting `MetadataTranslator.translators` against concurrent
+class creation and translator lookup."""
+
+_CARD_TABLE_LOCK = threading.Lock()
+"""Lock protecting the per-class keyword bit tables."""
+
+
+def _trivial_map_keywords(trivial_map):
+    """Return the header keywords referenced by a trivial mapping.
+
+    Parameters
+    ----------
+    trivial_map : `dict`
+        Trivial mapping as used for ``_trivial_map``.
+
+    Returns
+    -------
+    keywords : `list` of `str`
+        The keywords in the order they are defined.
+    """
+    keywords = []
+    for header_key in trivial_map.values():
+        if isinstance(header_key, tuple):
+            header_key = header_key[0]
+        if isinstance(header_key, str):
+            keywords.append(header_key)
+        else:
+            keywords.extend(header_key)
+    return keywords
+
 
 def cache_translation(func, method=None):
     """Decorator to cache the result of a translation method.
@@ -42,6 +201,11 @@ def cache_translation(func, method=None):
     Especially useful when a translation uses many other translation
     methods.  Should be used only on ``to_x()`` methods.
 
+    The cache is safe to use from multiple threads sharing a translator
+    instance.  The translation may be calculated more than once if two
+    threads request it simultaneously but all callers will be given the
+    same object.
+
     Parameters
     ----------
     func : `function`
@@ -56,11 +220,15 @@ def cache_translation(func, method=None):
     wrapped : `function`
         Method wrapped by the caching function.
     """
+    name = func.__name__ if method is None else method
+
     def func_wrapper(self):
-        name = func.__name__ if method is None else method
-        if name not in self._translation_cache:
-            self._translation_cache[name] = func(self)
-        return self._translation_cache[name]
+        value = self._translation_value(name, func)
+        if value.__class__ is _Missing:
+            raise value.exception()
+        return value
+    # Allows the translation machinery to bypass the exception
+    func_wrapper._translation = (name, func)
     return func_wrapper
 
 
@@ -86,6 +254,11 @@ class MetadataMeta(ABCMeta):
     to either a header keyword, or a tuple consisting of the header keyword
     and a dict containing key value pairs suitable for the
     `MetadataTranslator.quantity_from_card()` method.
+
+    Finally, each class is given a table assigning a bit to every header
+    keyword the class is known to read, from the trivial mappings and the
+    ``_extra_cards`` of the class and its parents.  The table is used for
+    compact recording of the cards used in a translation.
     """
 
     @staticmethod
@@ -157,7 +330,8 @@ class MetadataMeta(ABCMeta):
             Callback function to be used by the translator method in case the
             keyword is not present.  Function will be executed as if it is
             a method of the translator class.  Running without raising an
-            exception will allow the default to be used.
+            exception, or returning a missing value sentinel, will allow the
+            default to be used.
 
         Returns
         -------
@@ -173,21 +347,20 @@ class MetadataMeta(ABCMeta):
 
         def trivial_translator(self):
             if unit is not None:
-                return self.quantity_from_card(header_key, unit,
-                                               default=default, minimum=minimum, maximum=maximum)
+                return self._quantity_from_card(header_key, unit,
+                                                default=default, minimum=minimum, maximum=maximum)
 
             keywords = header_key if isinstance(header_key, list) else [header_key]
-            for key in keywords:
-                if key in self._header:
-                    value = self._header[key]
-                    if default is not None and not isinstance(value, str):
-                        value = self.validate_value(value, default, minimum=minimum, maximum=maximum)
-                    self._used_these_cards(key)
-                    break
+            value = self._get_card(keywords, default=_NOT_FOUND)
+            if value is not _NOT_FOUND:
+                if default is not None and not isinstance(value, str):
+                    value = self.validate_value(value, default, minimum=minimum, maximum=maximum)
             else:
                 # No keywords found, use default, checking first, or raise
                 if checker is not None:
-                    checker(self)
+                    missing = checker(self)
+                    if missing.__class__ is _Missing:
+                        return missing
                     if default is None:
                         # Checker has passed but no default, implies None
                         # is okay.
@@ -196,7 +369,7 @@ class MetadataMeta(ABCMeta):
                 elif default is not None:
                     value = default
                 else:
-                    raise KeyError(f"Could not find {keywords} in header")
+                    return _Missing("Could not find %s in header", keywords)
 
             # If we know this is meant to be a string, force to a string.
             # Sometimes headers represent items as integers which generically
@@ -224,7 +397,19 @@ class MetadataMeta(ABCMeta):
 
         # Only register classes with declared names
         if hasattr(cls, "name") and cls.name is not None:
-            MetadataTranslator.translators[cls.name] = cls
+            with _REGISTRY_LOCK:
+                MetadataTranslator.translators[cls.name] = cls
+
+        # Assign a bit to each keyword the class is known to read.
+        # Keywords are taken from the bases first so that parent and child
+        # classes agree on the most commonly used bits.
+        cls._card_bits = {}
+        cls._card_names = []
+        for base in reversed(cls.__mro__):
+            keywords = _trivial_map_keywords(base.__dict__.get("_trivial_map", {}))
+            keywords.extend(base.__dict__.get("_extra_cards", ()))
+            for keyword in keywords:
+                cls._add_card_bit(keyword)
 
         # Go through the trival mappings for this class and create
         # corresponding translator methods
@@ -256,6 +441,20 @@ class MetadataTranslator(metaclass=MetadataMeta):
     header : `dict`-like
         Representation of an instrument header that can be manipulated
         as if it was a `dict`.
+    card_tracking : `str` or `None`, optional
+        How to record the header cards used by the translation.  ``set``
+        records the keywords in a `set`.  ``bitmask`` records them as bits in
+        an integer using a keyword table attached to the translator class,
+        which avoids per-lookup allocations.  `None` disables tracking
+        completely, in which case `cards_used` always returns an empty set.
+    deferred_coordinates : `bool`, optional
+        If `True` translators return
+        `~astro_metadata_translator.CoordinateRecord` objects rather than
+        constructing `~astropy.coordinates.SkyCoord` and
+        `~astropy.coordinates.AltAz` objects.
+    raw_time : `bool`, optional
+        If `True` translators return dates as `float` MJD values in the TAI
+        scale rather than `~astropy.time.Time` objects.
     """
 
     _trivial_map = {}
@@ -271,12 +470,40 @@ class MetadataTranslator(metaclass=MetadataMeta):
     supported_instrument = None
     """Name of instrument understood by this translation class."""
 
-    def __init__(self, header):
+    translator_version = "1"
+    """Version of the translations made by this class.  Should be changed
+    whenever a translated value changes so that stored translations can be
+    refreshed."""
+
+    _extra_cards = ()
+    """Header keywords read by explicit translation methods of this class
+    in addition to those listed in ``_trivial_map``."""
+
+    _dispatch_cards = ()
+    """Header keywords read by `can_translate`.  Only these cards are
+    parsed when choosing a translator directly from the raw bytes of a
+    file."""
+
+    def __init__(self, header, card_tracking="set", deferred_coordinates=False, raw_time=False):
         self._header = header
+        self._deferred_coordinates = deferred_coordinates
+        self._raw_time = raw_time
         self._used_cards = set()
+        self._used_mask = 0
+        self._cards_used_cache = None
+        self._card_tracking = card_tracking
+        if card_tracking == "set":
+            self._record_card = self._used_cards.add
+        elif card_tracking == "bitmask":
+            self._record_card = self._record_card_bit
+        elif card_tracking is None:
+            self._record_card = _ignore_card
+        else:
+            raise ValueError(f"Unrecognized card tracking mode: {card_tracking!r}")
 
         # Cache assumes header is read-only once stored in object
         self._translation_cache = {}
+        self._card_cache = {}
 
     @classmethod
     @abstractmethod
@@ -318,13 +545,248 @@ class MetadataTranslator(metaclass=MetadataMeta):
             None of the registered translation classes understood the supplied
             header.
         """
-        for name, trans in cls.translators.items():
+        # Take a snapshot so that translators registered by another thread
+        # can not change the dict whilst we iterate over it.
+        with _REGISTRY_LOCK:
+            translators = list(cls.translators.items())
+        for name, trans in translators:
             if trans.can_translate(header):
                 log.debug(f"Using translation class {name}")
                 return trans
         else:
             raise ValueError("None of the registered translation classes understood this header")
 
+    @classmethod
+    def dispatch_cards(cls):
+        """Header keywords needed to choose between the registered
+        translators.
+
+        Returns
+        -------
+        keywords : `frozenset` of `str`
+            Union of the keywords read by `can_translate` for every
+            registered translation class.  A header containing only these
+            cards is sufficient for `determine_translator`.
+        """
+        with _REGISTRY_LOCK:
+            translators = list(cls.translators.values())
+        return frozenset(keyword for trans in translators for keyword in trans._dispatch_cards)
+
+    @classmethod
+    def translation_cards(cls):
+        """Header keywords this class may read when translating a header.
+
+        Returns
+        -------
+        keywords : `frozenset` of `str`
+            Keywords from the trivial mappings and ``_extra_cards`` of this
+            class and its parents, the keywords read by `can_translate`,
+            and any other keyword recorded as used by a translation so far.
+            A header containing only these cards translates identically to
+            the full header.
+        """
+        with _CARD_TABLE_LOCK:
+            names = frozenset(cls._card_names)
+        return names | frozenset(cls._dispatch_cards)
+
+    def _translation_value(self, name, func):
+        """Return the cached result of a translation method, calculating it
+        if necessary.
+
+        The cache is safe to use from multiple threads sharing a translator
+        instance.  The translation may be calculated more than once if two
+        threads request it simultaneously but all callers will be given the
+        same object.
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the translation method.
+        func : `function`
+            Uncached translation method.
+
+        Returns
+        -------
+        value : `object`
+            The translated value, or a `_Missing` sentinel if it could not
+            be determined.
+        """
+        cache = self._translation_cache
+        value = cache.get(name, _NOT_FOUND)
+        if value is _NOT_FOUND:
+            try:
+                value = func(self)
+            except KeyError as e:
+                # Methods may still signal a missing value by raising,
+                # including indirectly by calling a public to_x() method.
+                value = _Missing.from_exception(e)
+            # setdefault is atomic so the first result stored wins
+            value = cache.setdefault(name, value)
+        return value
+
+    def _translate(self, property):
+        """Translate a property without raising if it is missing.
+
+        Parameters
+        ----------
+        property : `str`
+            Name of the property.
+
+        Returns
+        -------
+        value : `object`
+            The translated value, or a `_Missing` sentinel if it could not
+            be determined.
+
+        Raises
+        ------
+        NotImplementedError
+            No translation is defined for this property.
+        """
+        method = getattr(self, f"to_{property}")
+        translation = getattr(method, "_translation", None)
+        if translation is not None:
+            return self._translation_value(*translation)
+        try:
+            return method()
+        except KeyError as e:
+            return _Missing.from_exception(e)
+
+    def _has_card(self, keyword):
+        """Indicate whether the keyword is present in the header.
+
+        Parameters
+        ----------
+        keyword : `str`
+            Keyword to look for.
+
+        Returns
+        -------
+        present : `bool`
+            `True` if the keyword is in the header.
+        """
+        return keyword in self._header
+
+    def _get_card(self, keywords, kind="raw", default=_NO_DEFAULT):
+        """Retrieve a normalized value from the header.
+
+        The first of the supplied keywords present in the header is used and
+        recorded as having been used for the translation.  Results are
+        memoized so repeated lookups of the same keyword are cheap.
+
+        Parameters
+        ----------
+        keywords : `str` or sequence of `str`
+            Keyword to read.  If a sequence each keyword will be tried
+            in turn until one matches.
+        kind : `str`, optional
+            Normalization to apply.  ``raw`` returns the value unchanged,
+            ``str`` returns a stripped string, ``lower`` and ``upper``
+            additionally change the case, and ``float`` and ``int`` convert
+            to the corresponding numeric type.
+        default : `object`, optional
+            Value to return if none of the keywords are present.  No card
+            is recorded as used in this case.
+
+        Returns
+        -------
+        value : `object`
+            The normalized value.
+
+        Raises
+        ------
+        KeyError
+            None of the keywords are present and no default was given.
+        """
+        if not isinstance(keywords, str):
+            keywords = tuple(keywords)
+        cache_key = (keywords, kind)
+        cached = self._card_cache.get(cache_key, _NO_DEFAULT)
+        if cached is not _NO_DEFAULT:
+            return cached
+
+        header = self._header
+        for keyword in ((keywords,) if isinstance(keywords, str) else keywords):
+            if keyword in header:
+                break
+        else:
+            if default is not _NO_DEFAULT:
+                return default
+            raise KeyError(f"Could not find {keywords} in header")
+
+        value = header[keyword]
+        normalizer = _CARD_NORMALIZERS[kind]
+        if normalizer is not None:
+            value = normalizer(value)
+        self._record_card(keyword)
+        self._card_cache[cache_key] = value
+        return value
+
+    def _get_card_str(self, keywords, default=_NO_DEFAULT):
+        """Retrieve a header value as a stripped string.
+
+        See `_get_card` for details.
+        """
+        return self._get_card(keywords, "str", default)
+
+    def _get_card_lower(self, keywords, default=_NO_DEFAULT):
+        """Retrieve a header value as a stripped lower case string.
+
+        See `_get_card` for details.
+        """
+        return self._get_card(keywords, "lower", default)
+
+    def _get_card_upper(self, keywords, default=_NO_DEFAULT):
+        """Retrieve a header value as a stripped upper case string.
+
+        See `_get_card` for details.
+        """
+        return self._get_card(keywords, "upper", default)
+
+    def _get_card_float(self, keywords, default=_NO_DEFAULT):
+        """Retrieve a header value as a `float`.
+
+        String values are converted.  Numeric and undefined values are
+        returned unchanged.  See `_get_card` for details.
+        """
+        return self._get_card(keywords, "float", default)
+
+    @classmethod
+    def _add_card_bit(cls, keyword):
+        """Return the bit assigned to a keyword for this class, assigning
+        a new one if needed.
+
+        Parameters
+        ----------
+        keyword : `str`
+            Header keyword.
+
+        Returns
+        -------
+        bit : `int`
+            Integer with the single bit representing this keyword set.
+        """
+        with _CARD_TABLE_LOCK:
+            bit = cls._card_bits.get(keyword)
+            if bit is None:
+                bit = 1 << len(cls._card_names)
+                cls._card_names.append(keyword)
+                cls._card_bits[keyword] = bit
+        return bit
+
+    def _record_card_bit(self, keyword):
+        """Record a card as used in the bitmask.
+
+        Parameters
+        ----------
+        keyword : `str`
+            Keyword that was used.
+        """
+        bit = self._card_bits.get(keyword)
+        if bit is None:
+            bit = self._add_card_bit(keyword)
+        self._used_mask |= bit
+
     def _used_these_cards(self, *args):
         """Indicate that the supplied cards have been used for translation.
 
@@ -333,7 +795,11 @@ class MetadataTranslator(metaclass=MetadataMeta):
         args : sequence of `str`
             Keywords used to process a translation.
         """
-        self._used_cards.update(set(args))
+        if self._card_tracking == "set":
+            self._used_cards.update(args)
+        else:
+            for keyword in args:
+                self._record_card(keyword)
 
     def cards_used(self):
         """Cards used during metadata extraction.
@@ -341,9 +807,26 @@ class MetadataTranslator(metaclass=MetadataMeta):
         Returns
         -------
         used : `frozenset` of `str`
-            Cards used when extracting metadata.
+            Cards used when extracting metadata.  Always empty if card
+            tracking is disabled.
         """
-        return frozenset(self._used_cards)
+        # The recorded state only ever grows so its size identifies it
+        if self._card_tracking == "bitmask":
+            state = self._used_mask
+        else:
+            state = len(self._used_cards)
+        cached = self._cards_used_cache
+        if cached is not None and cached[0] == state:
+            return cached[1]
+
+        if self._card_tracking == "bitmask":
+            names = self._card_names
+            mask = self._used_mask
+            used = frozenset(names[i] for i in range(mask.bit_length()) if (mask >> i) & 1)
+        else:
+            used = frozenset(self._used_cards)
+        self._cards_used_cache = (state, used)
+        return used
 
     @staticmethod
     def validate_value(value, default, minimum=None, maximum=None):
@@ -409,24 +892,36 @@ class MetadataTranslator(metaclass=MetadataMeta):
         KeyError
             The supplied header key is not present.
         """
-        keywords = keywords if isinstance(keywords, list) else [keywords]
-        for k in keywords:
-            if k in self._header:
-                value = self._header[k]
-                keyword = k
-                break
-        else:
-            raise KeyError(f"Could not find {keywords} in header")
-        if isinstance(value, str):
-            # Sometimes the header has the wrong type in it but this must
-            # be a number if we are creating a quantity.
-            value = float(value)
-        self._used_these_cards(keyword)
+        value = self._quantity_from_card(keywords, unit, default=default, minimum=minimum, maximum=maximum)
+        if value.__class__ is _Missing:
+            raise value.exception()
+        return value
+
+    def _quantity_from_card(self, keywords, unit, default=None, minimum=None, maximum=None):
+        """Calculate a Quantity from a header card, returning a `_Missing`
+        sentinel rather than raising if no keyword is present.
+
+        See `quantity_from_card` for details.
+        """
+        # Sometimes the header has the wrong type in it but this must
+        # be a number if we are creating a quantity.
+        value = self._get_card_float(keywords, default=_NOT_FOUND)
+        if value is _NOT_FOUND:
+            if not isinstance(keywords, str):
+                keywords = tuple(keywords)
+            return _Missing("Could not find %s in header", keywords)
         if default is not None:
             value = self.validate_value(value, default, maximum=maximum, minimum=minimum)
+        # Not memoized since the value is specific to this header and the
+        # caller may modify it
         return u.Quantity(value, unit=unit)
 
 
+def _ignore_card(keyword):
+    """Card recorder used when card tracking is disabled."""
+    pass
+
+
 def _make_abstract_translator_method(property, doc, return_type):
     """Create a an abstract translation method for this property.
 
@@ -23,15 +23,14 @@
 
 __all__ = ("DecamTranslator", )
 
-import re
-
-from astropy.coordinates import EarthLocation, AltAz, Angle
+from astropy.coordinates import Angle
 import astropy.units as u
 
+from ..memo import cached_geodetic_location, cached_site_location
 from ..translator import cache_translation
 from .fits import FitsTranslator
-from .helpers import altitude_from_zenith_distance, is_non_science, \
-    tracking_from_degree_headers
+from .helpers import _missing_if_science, _tracking_from_degree_headers, make_altaz_begin
+from .identifiers import calib_id_field, detector_exposure_ids
 
 
 class DecamTranslator(FitsTranslator):
@@ -49,7 +48,7 @@ class DecamTranslator(FitsTranslator):
 
     _trivial_map = {"exposure_time": ("EXPTIME", dict(unit=u.s)),
                     "dark_time": ("DARKTIME", dict(unit=u.s)),
-                    "boresight_airmass": ("AIRMASS", dict(checker=is_non_science)),
+                    "boresight_airmass": ("AIRMASS", dict(checker=_missing_if_science)),
                     "observation_id": "OBSID",
                     "object": "OBJECT",
                     "science_program": "PROPID",
@@ -66,6 +65,17 @@ class DecamTranslator(FitsTranslator):
                                  default=771.611, minimum=700., maximum=850.)),
                     }
 
+    _extra_cards = ("EXPNUM", "DTUTC", "CALIB_ID", "FILTER", "OBS-LONG", "OBS-LAT", "OBS-ELEV",
+                    "OBSTYPE", "RADESYS", "TELRA", "TELDEC", "AZ", "ZD")
+    """Keywords read by the explicit translation methods."""
+
+    _dispatch_cards = ("INSTRUME", "FILTER")
+    """Keywords read by `can_translate`."""
+
+    _DETECTOR_EXPOSURE_MULTIPLIER = 100
+    """Multiplier applied to the exposure ID to form the detector exposure
+    ID.  Equivalent to appending the two digit detector number."""
+
     @classmethod
     def can_translate(cls, header):
         """Indicate whether this translation class can translate the
@@ -105,9 +115,7 @@ class DecamTranslator(FitsTranslator):
         """
         if self.to_observation_type() != "science":
             return None
-        value = self._header["EXPNUM"]
-        self._used_these_cards("EXPNUM")
-        return value
+        return self._get_card("EXPNUM")
 
     @cache_translation
     def to_visit_id(self):
@@ -125,10 +133,7 @@ class DecamTranslator(FitsTranslator):
         Calibration products made with constructCalibs have some metadata
         saved in its FITS header CALIB_ID.
         """
-        data = self._header["CALIB_ID"]
-        match = re.search(r".*%s=(\S+)" % field, data)
-        self._used_these_cards("CALIB_ID")
-        return match.groups()[0]
+        return calib_id_field(self._get_card("CALIB_ID"), field)
 
     @cache_translation
     def to_physical_filter(self):
@@ -142,11 +147,9 @@ class DecamTranslator(FitsTranslator):
         filter : `str`
             The full filter name.
         """
-        if "FILTER" in self._header:
-            value = self._header["FILTER"].strip()
-            self._used_these_cards("FILTER")
-            return value
-        elif "CALIB_ID" in self._header:
+        if self._has_card("FILTER"):
+            return self._get_card_str("FILTER")
+        elif self._has_card("CALIB_ID"):
             return self._translate_from_calib_id("filter")
         else:
             return None
@@ -161,14 +164,13 @@ class DecamTranslator(FitsTranslator):
             An object representing the location of the telescope.
         """
 
-        if "OBS-LONG" in self._header:
+        if self._has_card("OBS-LONG"):
             # OBS-LONG has west-positive sign so must be flipped
-            lon = self._header["OBS-LONG"] * -1.0
-            value = EarthLocation.from_geodetic(lon, self._header["OBS-LAT"], self._header["OBS-ELEV"])
-            self._used_these_cards("OBS-LONG", "OBS-LAT", "OBS-ELEV")
+            lon = self._get_card_float("OBS-LONG") * -1.0
+            value = cached_geodetic_location(lon, self._get_card("OBS-LAT"), self._get_card("OBS-ELEV"))
         else:
             # Look up the value since some files do not have location
-            value = EarthLocation.of_site("ctio")
+            value = cached_site_location("ctio")
 
         return value
 
@@ -181,10 +183,7 @@ class DecamTranslator(FitsTranslator):
         typ : `str`
             Observation type. Normalized to standard set.
         """
-        if "OBSTYPE" not in self._header:
-            return "none"
-        obstype = self._header["OBSTYPE"].strip().lower()
-        self._used_these_cards("OBSTYPE")
+        obstype = self._get_card_lower("OBSTYPE", default="none")
         if obstype == "object":
             return "science"
         return obstype
@@ -194,7 +193,7 @@ class DecamTranslator(FitsTranslator):
         # Docstring will be inherited. Property defined in properties.py
         radecsys = ("RADESYS",)
         radecpairs = (("TELRA", "TELDEC"),)
-        return tracking_from_degree_headers(self, radecsys, radecpairs, unit=(u.hourangle, u.deg))
+        return _tracking_from_degree_headers(self, radecsys, radecpairs, unit=(u.hourangle, u.deg))
 
     @cache_translation
     def to_altaz_begin(self):
@@ -208,13 +207,10 @@ class DecamTranslator(FitsTranslator):
         altaz : `astropy.coordinates.AltAz`
             The telescope coordinates.
         """
-        if "AZ" not in self._header or "ZD" not in self._header:
+        if not self._has_card("AZ") or not self._has_card("ZD"):
             return None
-        altaz = AltAz(self._header["AZ"] * u.deg,
-                      altitude_from_zenith_distance(self._header["ZD"] * u.deg),
-                      obstime=self.to_datetime_begin(), location=self.to_location())
-        self._used_these_cards("AZ", "ZD")
-        return altaz
+        # Altitude from zenith distance
+        return make_altaz_begin(self, self._get_card_float("AZ"), 90.0 - self._get_card_float("ZD"))
 
     @cache_translation
     def to_detector_exposure_id(self):
@@ -222,4 +218,22 @@ class DecamTranslator(FitsTranslator):
         exposure_id = self.to_exposure_id()
         if exposure_id is None:
             return None
-        return int("{:07d}{:02d}".format(exposure_id, self.to_detector_num()))
+        return exposure_id * self._DETECTOR_EXPOSURE_MULTIPLIER + self.to_detector_num()
+
+    @classmethod
+    def detector_exposure_ids(cls, exposure_ids, detector_nums):
+        """Calculate many detector exposure IDs at once.
+
+        Parameters
+        ----------
+        exposure_ids : array-like of `int`
+            Exposure IDs, ``-1`` for non-science observations.
+        detector_nums : array-like of `int`
+            Detector numbers, ``-1`` if unknown.
+
+        Returns
+        -------
+        ids : `numpy.ndarray` of `int`
+            Detector exposure IDs, ``-1`` where either input was unknown.
+        """
+        return detector_exposure_ids(exposure_ids, detector_nums, cls._DETECTOR_EXPOSURE_MULTIPLIER)
@@ -24,10 +24,11 @@
 __all__ = ("FitsTranslator", )
 
 from astropy.time import Time
-from astropy.coordinates import EarthLocation
 import astropy.units as u
 
-from ..translator import MetadataTranslator, cache_translation
+from ..dates import isot_to_mjd
+from ..memo import cached_geocentric_location
+from ..translator import MetadataTranslator, cache_translation, _Missing
 
 
 class FitsTranslator(MetadataTranslator):
@@ -46,6 +47,12 @@ class FitsTranslator(MetadataTranslator):
     _trivial_map = dict(instrument="INSTRUME",
                         telescope="TELESCOP")
 
+    _extra_cards = ("DATE-OBS", "DATE-END", "TIMESYS", "OBSGEO-X", "OBSGEO-Y", "OBSGEO-Z")
+    """Keywords read by the explicit translation methods."""
+
+    _dispatch_cards = ("INSTRUME", )
+    """Keywords read by `can_translate`."""
+
     @classmethod
     def can_translate(cls, header):
         """Indicate whether this translation class can translate the
@@ -70,16 +77,15 @@ class FitsTranslator(MetadataTranslator):
 
         # Protect against being able to always find a standard
         # header for instrument
-        try:
-            translator = cls(header)
-            instrument = translator.to_instrument()
-        except KeyError:
+        translator = cls(header, card_tracking=None)
+        instrument = translator._translate("instrument")
+        if instrument.__class__ is _Missing:
             return False
 
         return instrument == cls.supported_instrument
 
     @classmethod
-    def _from_fits_date_string(cls, date_str, scale='utc', time_str=None):
+    def _from_fits_date_string(cls, date_str, scale='utc', time_str=None, raw=False):
         """Parse standard FITS ISO-style date string and return time object
 
         Parameters
@@ -94,15 +100,21 @@ class FitsTranslator(MetadataTranslator):
             If provided, overrides any time component in the ``dateStr``,
             retaining the YYYY-MM-DD component and appending this time
             string, assumed to be of format HH:MM::SS.ss.
+        raw : `bool`, optional
+            If `True` return the date as an MJD in the TAI scale without
+            creating a `~astropy.time.Time`.
 
         Returns
         -------
-        date : `astropy.time.Time`
-            `~astropy.time.Time` representation of the date.
+        date : `astropy.time.Time` or `float`
+            `~astropy.time.Time` representation of the date, or the TAI MJD
+            if ``raw`` is `True`.
         """
         if time_str is not None:
             date_str = "{}T{}".format(date_str[:10], time_str)
 
+        if raw:
+            return isot_to_mjd(date_str, scale=scale)
         return Time(date_str, format="isot", scale=scale)
 
     def _from_fits_date(self, date_key):
@@ -119,22 +131,15 @@ class FitsTranslator(MetadataTranslator):
 
         Returns
         -------
-        date : `astropy.time.Time`
-            `~astropy.time.Time` representation of the date.
+        date : `astropy.time.Time` or `float`
+            `~astropy.time.Time` representation of the date, or the TAI MJD
+            if the translator was created with ``raw_time``.
         """
-        used = [date_key, ]
-        if "TIMESYS" in self._header:
-            scale = self._header["TIMESYS"].lower()
-            used.append("TIMESYS")
-        else:
-            scale = "utc"
-        if date_key in self._header:
-            date_str = self._header[date_key]
-            value = self._from_fits_date_string(date_str, scale=scale)
-            self._used_these_cards(*used)
-        else:
-            value = None
-        return value
+        date_str = self._get_card(date_key, default=None)
+        if date_str is None:
+            return None
+        scale = self._get_card_lower("TIMESYS", default="utc")
+        return self._from_fits_date_string(date_str, scale=scale, raw=self._raw_time)
 
     @cache_translation
     def to_datetime_begin(self):
@@ -173,8 +178,5 @@ class FitsTranslator(MetadataTranslator):
         location : `astropy.coordinates.EarthLocation`
             An object representing the location of the telescope.
         """
-        cards = [f"OBSGEO-{c}" for c in ("X", "Y", "Z")]
-        coords = [self._header[c] for c in cards]
-        value = EarthLocation.from_geocentric(*coords, unit=u.m)
-        self._used_these_cards(*cards)
-        return value
+        coords = [self._get_card(f"OBSGEO-{c}") for c in ("X", "Y", "Z")]
+        return cached_geocentric_location(*coords, unit=u.m)
@@ -35,11 +35,17 @@ translation classes without using `MetadataTranslator` properties.
 __all__ = ("to_location_via_telescope_name",
            "is_non_science",
            "tracking_from_degree_headers",
-           "altitude_from_zenith_distance")
+           "altitude_from_zenith_distance",
+           "make_tracking_radec",
+           "make_altaz_begin")
 
-from astropy.coordinates import EarthLocation, SkyCoord
+from astropy.coordinates import SkyCoord, AltAz
 import astropy.units as u
 
+from ..coordinates import CoordinateRecord, _as_time
+from ..memo import cached_site_location
+from ..translator import _Missing
+
 
 def to_location_via_telescope_name(self):
     """Calculate the observatory location via the telescope name.
@@ -49,7 +55,7 @@ def to_location_via_telescope_name(self):
     loc : `astropy.coordinates.EarthLocation`
         Location of the observatory.
     """
-    return EarthLocation.of_site(self.to_telescope())
+    return cached_site_location(self.to_telescope())
 
 
 def is_non_science(self):
@@ -60,11 +66,28 @@ def is_non_science(self):
     KeyError
         Is a science observation.
     """
-    if self.to_observation_type() == "science":
-        raise KeyError("Header represents science observation and can not default")
+    missing = _missing_if_science(self)
+    if missing is not None:
+        raise missing.exception()
     return
 
 
+def _missing_if_science(self):
+    """Return a missing value sentinel if this is a science observation.
+
+    Equivalent to `is_non_science` but suitable for use as a
+    ``checker`` without raising an exception.
+
+    Returns
+    -------
+    missing : `~astro_metadata_translator.translator._Missing` or `None`
+        Sentinel if this is a science observation, else `None`.
+    """
+    if self.to_observation_type() == "science":
+        return _Missing("Header represents science observation and can not default")
+    return None
+
+
 def altitude_from_zenith_distance(zd):
     """Convert zenith distance to altitude
 
@@ -81,6 +104,59 @@ def altitude_from_zenith_distance(zd):
     return 90.*u.deg - zd
 
 
+def make_tracking_radec(self, ra, dec, frame="icrs", unit=u.deg):
+    """Create the tracking coordinates for this observation.
+
+    Parameters
+    ----------
+    ra : `float` or `str`
+        Right ascension as read from the header.
+    dec : `float` or `str`
+        Declination as read from the header.
+    frame : `str`, optional
+        Coordinate frame.
+    unit : `astropy.unit.BaseUnit` or `tuple`, optional
+        Unit definition suitable for the `~astropy.coordinates.SkyCoord`
+        constructor.
+
+    Returns
+    -------
+    radec : `astropy.coordinates.SkyCoord` or `CoordinateRecord`
+        The coordinates, using the observation start time and the location
+        of the observatory.  A `CoordinateRecord` is returned if the
+        translator was created with deferred coordinates.
+    """
+    if self._deferred_coordinates:
+        return CoordinateRecord(ra, dec, frame, unit=unit, obstime=self.to_datetime_begin(),
+                                location=self.to_location())
+    return SkyCoord(ra, dec, frame=frame, unit=unit, obstime=_as_time(self.to_datetime_begin()),
+                    location=self.to_location())
+
+
+def make_altaz_begin(self, az, alt):
+    """Create the horizontal coordinates for the start of the observation.
+
+    Parameters
+    ----------
+    az : `float`
+        Azimuth in degrees.
+    alt : `float`
+        Altitude in degrees.
+
+    Returns
+    -------
+    altaz : `astropy.coordinates.AltAz` or `CoordinateRecord`
+        The coordinates, using the observation start time and the location
+        of the observatory.  A `CoordinateRecord` is returned if the
+        translator was created with deferred coordinates.
+    """
+    if self._deferred_coordinates:
+        return CoordinateRecord(az, alt, "altaz", obstime=self.to_datetime_begin(),
+                                location=self.to_location())
+    return AltAz(az * u.deg, alt * u.deg, obstime=_as_time(self.to_datetime_begin()),
+                 location=self.to_location())
+
+
 def tracking_from_degree_headers(self, radecsys, radecpairs, unit=u.deg):
     """Calculate the tracking coordinates from lists of headers.
 
@@ -97,9 +173,10 @@ def tracking_from_degree_headers(self, radecsys, radecpairs, unit=u.deg):
 
     Returns
     -------
-    radec = `astropy.coordinates.SkyCoord`
+    radec = `astropy.coordinates.SkyCoord` or `CoordinateRecord`
         The RA/Dec coordinates. None if this is a moving target or a
-        non-science observation without any RA/Dec definition.
+        non-science observation without any RA/Dec definition.  See
+        `make_tracking_radec`.
 
     Raises
     ------
@@ -107,25 +184,26 @@ def tracking_from_degree_headers(self, radecsys, radecpairs, unit=u.deg):
         No RA/Dec keywords were found and this observation is a science
         observation.
     """
-    used = []
-    for k in radecsys:
-        if k in self._header:
-            frame = self._header[k].strip().lower()
-            used.append(k)
-            if frame == "gappt":
-                self._used_these_cards(*used)
-                # Moving target
-                return None
-            break
-    else:
-        frame = "icrs"
+    radec = _tracking_from_degree_headers(self, radecsys, radecpairs, unit=unit)
+    if radec.__class__ is _Missing:
+        raise radec.exception()
+    return radec
+
+
+def _tracking_from_degree_headers(self, radecsys, radecpairs, unit=u.deg):
+    """Calculate the tracking coordinates, returning a missing value
+    sentinel rather than raising if they can not be determined.
+
+    See `tracking_from_degree_headers` for details.
+    """
+    frame = self._get_card_lower(radecsys, default="icrs")
+    if frame == "gappt":
+        # Moving target
+        return None
     for ra_key, dec_key in radecpairs:
-        if ra_key in self._header and dec_key in self._header:
-            radec = SkyCoord(self._header[ra_key], self._header[dec_key],
-                             frame=frame, unit=unit, obstime=self.to_datetime_begin(),
-                             location=self.to_location())
-            self._used_these_cards(ra_key, dec_key, *used)
-            return radec
+        if self._has_card(ra_key) and self._has_card(dec_key):
+            return make_tracking_radec(self, self._get_card(ra_key), self._get_card(dec_key),
+                                       frame=frame, unit=unit)
     if self.to_observation_type() == "science":
-        raise KeyError("Unable to determine tracking RA/Dec of science observation")
+        return _Missing("Unable to determine tracking RA/Dec of science observation")
     return None
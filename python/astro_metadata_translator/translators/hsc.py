@@ -23,13 +23,14 @@
 
 __all__ = ("HscTranslator", )
 
-import re
 import logging
 
+import numpy as np
 import astropy.units as u
 from astropy.coordinates import Angle
 
 from ..translator import cache_translation
+from .identifiers import decode_hsc_exposure_id
 from .suprimecam import SuprimeCamTranslator
 
 log = logging.getLogger(__name__)
@@ -53,6 +54,9 @@ class HscTranslator(SuprimeCamTranslator):
                     }
     """One-to-one mappings"""
 
+    _extra_cards = ("INST-PA", )
+    """Keywords read by the explicit translation methods."""
+
     # Zero point for HSC dates: 2012-01-01  51544 -> 2000-01-01
     _DAY0 = 55927
 
@@ -65,6 +69,16 @@ class HscTranslator(SuprimeCamTranslator):
                                 114: 108,
                                 }
 
+    _CCD_LUT_COMMISSIONING_2 = np.arange(max(_CCD_MAP_COMMISSIONING_2) + 1)
+    _CCD_LUT_COMMISSIONING_2[list(_CCD_MAP_COMMISSIONING_2)] = list(_CCD_MAP_COMMISSIONING_2.values())
+    _CCD_LUT_COMMISSIONING_2.flags.writeable = False
+    """Lookup table form of ``_CCD_MAP_COMMISSIONING_2``, indexed by raw
+    CCD number."""
+
+    _DETECTOR_EXPOSURE_MULTIPLIER = 200
+    """Multiplier applied to the exposure ID to form the detector exposure
+    ID."""
+
     @classmethod
     def can_translate(cls, header):
         """Indicate whether this translation class can translate the
@@ -103,30 +117,10 @@ class HscTranslator(SuprimeCamTranslator):
         visit : `int`
             Integer uniquely identifying this exposure.
         """
-        exp_id = self._header["EXP-ID"].strip()
-        m = re.search(r"^HSCE(\d{8})$", exp_id)  # 2016-06-14 and new scheme
-        if m:
-            self._used_these_cards("EXP-ID")
-            return int(m.group(1))
-
-        # Fallback to old scheme
-        m = re.search(r"^HSC([A-Z])(\d{6})00$", exp_id)
-        if not m:
-            raise RuntimeError(f"Unable to interpret EXP-ID: {exp_id}")
-        letter, visit = m.groups()
-        visit = int(visit)
-        if visit == 0:
-            # Don't believe it
-            frame_id = self._header["FRAMEID"].strip()
-            m = re.search(r"^HSC([A-Z])(\d{6})\d{2}$", frame_id)
-            if not m:
-                raise RuntimeError(f"Unable to interpret FRAMEID: {frame_id}")
-            letter, visit = m.groups()
-            visit = int(visit)
-            if visit % 2:  # Odd?
-                visit -= 1
-        self._used_these_cards("EXP-ID", "FRAMEID")
-        return visit + 1000000*(ord(letter) - ord("A"))
+        exposure = decode_hsc_exposure_id(self._get_card_str("EXP-ID"))
+        if exposure is None:
+            exposure = decode_hsc_exposure_id(self._get_card_str("EXP-ID"), self._get_card_str("FRAMEID"))
+        return exposure
 
     @cache_translation
     def to_boresight_rotation_angle(self):
@@ -156,12 +150,33 @@ class HscTranslator(SuprimeCamTranslator):
         except Exception:
             return ccd
 
-        if tjd > 390 and tjd < 405:
-            ccd = self._CCD_MAP_COMMISSIONING_2.get(ccd, ccd)
+        if tjd > 390 and tjd < 405 and 0 <= ccd < len(self._CCD_LUT_COMMISSIONING_2):
+            ccd = int(self._CCD_LUT_COMMISSIONING_2[ccd])
 
         return ccd
 
-    @cache_translation
-    def to_detector_exposure_id(self):
-        # Docstring will be inherited. Property defined in properties.py
-        return self.to_exposure_id() * 200 + self.to_detector_num()
+    @classmethod
+    def detector_nums_from_raw(cls, ccds, adjusted_mjds=None):
+        """Correct many raw CCD numbers at once.
+
+        Parameters
+        ----------
+        ccds : array-like of `int`
+            Raw CCD numbers from the ``DET-ID`` header.
+        adjusted_mjds : array-like of `int`, optional
+            Day offsets from ``_DAY0``, as returned by ``_get_adjusted_mjd``.
+            If `None` no correction is applied.
+
+        Returns
+        -------
+        nums : `numpy.ndarray` of `int`
+            Detector numbers.
+        """
+        ccds = np.array(ccds, dtype=np.int64)
+        if adjusted_mjds is None:
+            return ccds
+        tjd = np.asarray(adjusted_mjds)
+        lut = cls._CCD_LUT_COMMISSIONING_2
+        remap = (tjd > 390) & (tjd < 405) & (ccds >= 0) & (ccds < len(lut))
+        ccds[remap] = lut[ccds[remap]]
+        return ccds
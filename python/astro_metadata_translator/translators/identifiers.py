@@ -0,0 +1,342 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""Decoding of instrument-specific identifier strings.
+
+The patterns are compiled once at import.  Each scalar decoder has a batch
+equivalent that decodes a sequence of identifiers at once using NumPy
+operations on the character codes, returning ``-1`` for any identifier
+that can not be decoded.
+"""
+
+__all__ = ("decode_hsc_exposure_id",
+           "decode_hsc_exposure_ids",
+           "decode_suprimecam_exposure_id",
+           "decode_suprimecam_exposure_ids",
+           "calib_id_field",
+           "calib_id_fields",
+           "detector_exposure_ids")
+
+import functools
+import re
+
+import numpy as np
+
+_HSC_EXP_ID_RE = re.compile(r"^HSCE(\d{8})$")
+"""HSC EXP-ID scheme in use since 2016-06-14."""
+
+_HSC_OLD_EXP_ID_RE = re.compile(r"^HSC([A-Z])(\d{6})00$")
+"""Original HSC EXP-ID scheme."""
+
+_HSC_FRAME_ID_RE = re.compile(r"^HSC([A-Z])(\d{6})\d{2}$")
+"""HSC FRAMEID, used if the EXP-ID visit is zero."""
+
+_SUPRIMECAM_EXP_ID_RE = re.compile(r"^SUP[A-Z](\d{7})0$")
+"""SuprimeCam EXP-ID."""
+
+_SUPRIMECAM_FRAME_ID_RE = re.compile(r"^SUP[A-Z](\d{7})\d{1}$")
+"""SuprimeCam FRAMEID, used if the EXP-ID exposure is zero."""
+
+_ID_WIDTH = 12
+"""Number of characters in all the Subaru identifiers."""
+
+
+def decode_hsc_exposure_id(exp_id, frame_id=None):
+    """Calculate the HSC exposure ID from the ``EXP-ID`` header.
+
+    Parameters
+    ----------
+    exp_id : `str`
+        Value of the ``EXP-ID`` header.
+    frame_id : `str`, optional
+        Value of the ``FRAMEID`` header.  Only needed if the old ``EXP-ID``
+        scheme reports a visit of zero.
+
+    Returns
+    -------
+    exposure : `int` or `None`
+        The exposure ID.  `None` if ``frame_id`` is required but was not
+        given.
+
+    Raises
+    ------
+    RuntimeError
+        An identifier could not be interpreted.
+    """
+    m = _HSC_EXP_ID_RE.match(exp_id)  # 2016-06-14 and new scheme
+    if m:
+        return int(m.group(1))
+
+    # Fallback to old scheme
+    m = _HSC_OLD_EXP_ID_RE.match(exp_id)
+    if not m:
+        raise RuntimeError(f"Unable to interpret EXP-ID: {exp_id}")
+    letter, visit = m.groups()
+    visit = int(visit)
+    if visit == 0:
+        # Don't believe it
+        if frame_id is None:
+            return None
+        m = _HSC_FRAME_ID_RE.match(frame_id)
+        if not m:
+            raise RuntimeError(f"Unable to interpret FRAMEID: {frame_id}")
+        letter, visit = m.groups()
+        visit = int(visit)
+        if visit % 2:  # Odd?
+            visit -= 1
+    return visit + 1000000*(ord(letter) - ord("A"))
+
+
+def decode_suprimecam_exposure_id(exp_id, frame_id=None):
+    """Calculate the SuprimeCam exposure ID from the ``EXP-ID`` header.
+
+    Parameters
+    ----------
+    exp_id : `str`
+        Value of the ``EXP-ID`` header.
+    frame_id : `str`, optional
+        Value of the ``FRAMEID`` header.  Only needed if ``EXP-ID``
+        reports an exposure of zero.
+
+    Returns
+    -------
+    exposure : `int` or `None`
+        The exposure ID.  `None` if ``frame_id`` is required but was not
+        given.
+
+    Raises
+    ------
+    RuntimeError
+        An identifier could not be interpreted.
+    """
+    m = _SUPRIMECAM_EXP_ID_RE.match(exp_id)
+    if not m:
+        raise RuntimeError("Unable to interpret EXP-ID: %s" % exp_id)
+    exposure = int(m.group(1))
+    if exposure == 0:
+        # Don't believe it
+        if frame_id is None:
+            return None
+        m = _SUPRIMECAM_FRAME_ID_RE.match(frame_id)
+        if not m:
+            raise RuntimeError("Unable to interpret FRAMEID: %s" % frame_id)
+        exposure = int(m.group(1))
+    return exposure
+
+
+def _char_codes(ids):
+    """Convert identifiers to an array of character codes.
+
+    Parameters
+    ----------
+    ids : sequence of `str`
+        Identifiers, all expected to be ``_ID_WIDTH`` characters long.
+
+    Returns
+    -------
+    codes : `numpy.ndarray`
+        Array of shape ``(len(ids), _ID_WIDTH)`` holding the character
+        codes.  Rows of identifiers of the wrong length are zero.
+    """
+    strings = np.asarray(ids, dtype=str).reshape(-1)
+    valid = np.char.str_len(strings) == _ID_WIDTH
+    strings = np.where(valid, strings, "").astype(f"U{_ID_WIDTH}")
+    return strings.view(np.uint32).reshape(len(strings), _ID_WIDTH).astype(np.int64)
+
+
+def _matches(codes, prefix):
+    """Find the rows of character codes that start with a prefix."""
+    expected = np.array([ord(c) for c in prefix])
+    return np.all(codes[:, :len(prefix)] == expected, axis=1)
+
+
+def _digits(codes, start, stop):
+    """Interpret columns of character codes as decimal digits.
+
+    Returns
+    -------
+    values : `numpy.ndarray`
+        The integer value of the digits in each row.
+    valid : `numpy.ndarray`
+        `True` for rows where every character was a digit.
+    """
+    digits = codes[:, start:stop] - ord("0")
+    valid = np.all((digits >= 0) & (digits <= 9), axis=1)
+    powers = 10 ** np.arange(stop - start - 1, -1, -1, dtype=np.int64)
+    return digits @ powers, valid
+
+
+def _is_letter(codes):
+    return (codes >= ord("A")) & (codes <= ord("Z"))
+
+
+def decode_hsc_exposure_ids(exp_ids, frame_ids=None):
+    """Calculate HSC exposure IDs for many headers at once.
+
+    Parameters
+    ----------
+    exp_ids : sequence of `str`
+        Values of the ``EXP-ID`` headers.
+    frame_ids : sequence of `str`, optional
+        Values of the ``FRAMEID`` headers, in the same order.  Needed to
+        decode old ``EXP-ID`` values that report a visit of zero.
+
+    Returns
+    -------
+    exposures : `numpy.ndarray` of `int`
+        The exposure IDs, with ``-1`` for identifiers that can not be
+        decoded.  These are also the visit IDs of science observations.
+    """
+    codes = _char_codes(exp_ids)
+    result = np.full(len(codes), -1, dtype=np.int64)
+
+    # 2016-06-14 and new scheme
+    number, digits_ok = _digits(codes, 4, 12)
+    new = _matches(codes, "HSCE") & digits_ok
+    result[new] = number[new]
+
+    # Fallback to old scheme
+    visit, digits_ok = _digits(codes, 4, 10)
+    old = ~new & _matches(codes, "HSC") & _is_letter(codes[:, 3]) & digits_ok \
+        & np.all(codes[:, 10:] == ord("0"), axis=1)
+    result[old] = visit[old] + 1000000*(codes[old, 3] - ord("A"))
+
+    # Don't believe a visit of zero
+    redo = old & (visit == 0)
+    result[redo] = -1
+    if frame_ids is not None and redo.any():
+        frame_codes = _char_codes(frame_ids)
+        visit, digits_ok = _digits(frame_codes, 4, 12)
+        visit //= 100
+        visit -= visit % 2
+        good = redo & _matches(frame_codes, "HSC") & _is_letter(frame_codes[:, 3]) & digits_ok
+        result[good] = visit[good] + 1000000*(frame_codes[good, 3] - ord("A"))
+    return result
+
+
+def decode_suprimecam_exposure_ids(exp_ids, frame_ids=None):
+    """Calculate SuprimeCam exposure IDs for many headers at once.
+
+    Parameters
+    ----------
+    exp_ids : sequence of `str`
+        Values of the ``EXP-ID`` headers.
+    frame_ids : sequence of `str`, optional
+        Values of the ``FRAMEID`` headers, in the same order.  Needed to
+        decode ``EXP-ID`` values that report an exposure of zero.
+
+    Returns
+    -------
+    exposures : `numpy.ndarray` of `int`
+        The exposure IDs, with ``-1`` for identifiers that can not be
+        decoded.  These are also the visit IDs of science observations.
+    """
+    codes = _char_codes(exp_ids)
+    exposure, digits_ok = _digits(codes, 4, 11)
+    good = _matches(codes, "SUP") & _is_letter(codes[:, 3]) & digits_ok & (codes[:, 11] == ord("0"))
+    result = np.where(good, exposure, -1)
+
+    # Don't believe an exposure of zero
+    redo = good & (exposure == 0)
+    result[redo] = -1
+    if frame_ids is not None and redo.any():
+        frame_codes = _char_codes(frame_ids)
+        exposure, digits_ok = _digits(frame_codes, 4, 12)
+        exposure //= 10
+        good = redo & _matches(frame_codes, "SUP") & _is_letter(frame_codes[:, 3]) & digits_ok
+        result[good] = exposure[good]
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def _calib_id_pattern(field):
+    """Compiled pattern extracting a field from a ``CALIB_ID`` header."""
+    return re.compile(r".*%s=(\S+)" % field)
+
+
+def calib_id_field(calib_id, field):
+    """Extract a field from a ``CALIB_ID`` header.
+
+    Calibration products made with constructCalibs have some metadata
+    saved in the ``CALIB_ID`` header as ``key=value`` pairs.
+
+    Parameters
+    ----------
+    calib_id : `str`
+        Value of the ``CALIB_ID`` header.
+    field : `str`
+        Name of the field to extract.
+
+    Returns
+    -------
+    value : `str` or `None`
+        Value of the field, or `None` if the field is not present.
+    """
+    match = _calib_id_pattern(field).search(calib_id)
+    if match is None:
+        return None
+    return match.group(1)
+
+
+def calib_id_fields(calib_ids, field):
+    """Extract a field from many ``CALIB_ID`` headers.
+
+    Parameters
+    ----------
+    calib_ids : sequence of `str`
+        Values of the ``CALIB_ID`` headers.
+    field : `str`
+        Name of the field to extract.
+
+    Returns
+    -------
+    values : `list` of `str` or `None`
+        Value of the field for each header, `None` where it is missing.
+    """
+    search = _calib_id_pattern(field).search
+    values = []
+    for calib_id in calib_ids:
+        match = search(calib_id)
+        values.append(None if match is None else match.group(1))
+    return values
+
+
+def detector_exposure_ids(exposure_ids, detector_nums, multiplier):
+    """Combine exposure and detector numbers into detector exposure IDs.
+
+    Parameters
+    ----------
+    exposure_ids : array-like of `int`
+        Exposure IDs, with ``-1`` for unknown values.
+    detector_nums : array-like of `int`
+        Detector numbers, with ``-1`` for unknown values.
+    multiplier : `int`
+        Multiplier applied to the exposure ID before adding the detector
+        number.  Must be larger than the largest detector number.
+
+    Returns
+    -------
+    ids : `numpy.ndarray` of `int`
+        Detector exposure IDs, ``-1`` where either input was unknown.
+    """
+    exposure_ids = np.asarray(exposure_ids, dtype=np.int64)
+    detector_nums = np.asarray(detector_nums, dtype=np.int64)
+    return np.where((exposure_ids < 0) | (detector_nums < 0), -1, exposure_ids * multiplier + detector_nums)
@@ -23,12 +23,15 @@
 
 __all__ = ("MegaPrimeTranslator", )
 
-from astropy.coordinates import EarthLocation, AltAz, Angle
+import numpy as np
+from astropy.coordinates import Angle
 import astropy.units as u
 
-from ..translator import cache_translation
+from ..memo import cached_geodetic_location, cached_site_location
+from ..translator import cache_translation, _Missing
 from .fits import FitsTranslator
-from .helpers import tracking_from_degree_headers
+from .helpers import _tracking_from_degree_headers, make_altaz_begin
+from .identifiers import detector_exposure_ids
 
 filters = {'u.MP9301': 'u',
            'u.MP9302': 'u2',
@@ -70,24 +73,40 @@ class MegaPrimeTranslator(FitsTranslator):
                     "temperature": (["TEMPERAT", "AIRTEMP"], dict(unit=u.deg_C)),
                     "boresight_airmass": ["AIRMASS", "BORE-AIRMASS"]}
 
+    _extra_cards = ("DATE-OBS", "UTC-OBS", "UTCEND", "LONGITUD", "LATITUDE", "OBS-LONG", "OBS-LAT",
+                    "EXTNAME", "OBSTYPE", "RADECSYS", "OBJRADEC", "RADESYS", "RA_DEG", "DEC_DEG",
+                    "BORE-RA", "BORE-DEC", "TELAZ", "TELALT", "BORE-AZ", "BORE-ALT", "PRESSURE", "AIRPRESS")
+    """Keywords read by the explicit translation methods."""
+
+    _EXTNAME_DETECTORS = {f"ccd{n:02d}": n for n in range(40)}
+    """Detector numbers of the standard ``EXTNAME`` values."""
+
+    _DUMMY_DETECTOR_NUM = 99
+    """Detector number used for the primary HDU."""
+
+    _DETECTOR_EXPOSURE_MULTIPLIER = 36
+    """Multiplier applied to the exposure ID to form the detector exposure
+    ID."""
+
     @cache_translation
     def to_datetime_begin(self):
         # Docstring will be inherited. Property defined in properties.py
         # We know it is UTC
-        value = self._from_fits_date_string(self._header["DATE-OBS"],
-                                            time_str=self._header["UTC-OBS"], scale="utc")
-        self._used_these_cards("DATE-OBS", "UTC-OBS")
-        return value
+        return self._from_fits_date_string(self._get_card("DATE-OBS"),
+                                           time_str=self._get_card("UTC-OBS"), scale="utc",
+                                           raw=self._raw_time)
 
     @cache_translation
     def to_datetime_end(self):
         # Docstring will be inherited. Property defined in properties.py
         # Older files are missing UTCEND
-        if "UTCEND" in self._header:
+        if self._has_card("UTCEND"):
             # We know it is UTC
-            value = self._from_fits_date_string(self._header["DATE-OBS"],
-                                                time_str=self._header["UTCEND"], scale="utc")
-            self._used_these_cards("DATE-OBS", "UTCEND")
+            value = self._from_fits_date_string(self._get_card("DATE-OBS"),
+                                                time_str=self._get_card("UTCEND"), scale="utc",
+                                                raw=self._raw_time)
+        elif self._raw_time:
+            value = self.to_datetime_begin() + float(self.to_exposure_time().to_value(u.d))
         else:
             # Take a guess by adding on the exposure time
             value = self.to_datetime_begin() + self.to_exposure_time()
@@ -105,25 +124,86 @@ class MegaPrimeTranslator(FitsTranslator):
         # Height is not in some MegaPrime files. Use the value from EarthLocation.of_site("CFHT")
         # Some data uses OBS-LONG, OBS-LAT, other data uses LONGITUD and LATITUDE
         for long_key, lat_key in (("LONGITUD", "LATITUDE"), ("OBS-LONG", "OBS-LAT")):
-            if long_key in self._header and lat_key in self._header:
-                value = EarthLocation.from_geodetic(self._header[long_key], self._header[lat_key], 4215.0)
-                self._used_these_cards(long_key, lat_key)
+            if self._has_card(long_key) and self._has_card(lat_key):
+                value = cached_geodetic_location(self._get_card(long_key), self._get_card(lat_key),
+                                                 4215.0)
                 break
         else:
-            value = EarthLocation.of_site("CFHT")
+            value = cached_site_location("CFHT")
         return value
 
     @cache_translation
     def to_detector_num(self):
         # Docstring will be inherited. Property defined in properties.py
-        try:
-            extname = self._header["EXTNAME"]
-            num = int(extname[3:])  # chop off "ccd"
-            self._used_these_cards("EXTNAME")
-            return num
-        except (KeyError, ValueError):
+        num = self._detector_num_from_extname(self._header.get("EXTNAME"))
+        if num is None:
             # Dummy value, intended for PHU (need something to get filename)
-            return 99
+            return self._DUMMY_DETECTOR_NUM
+        # Only counts as used if it could be interpreted
+        self._used_these_cards("EXTNAME")
+        return num
+
+    @classmethod
+    def _detector_num_from_extname(cls, extname):
+        """Interpret an ``EXTNAME`` header as a detector number.
+
+        Parameters
+        ----------
+        extname : `str` or `None`
+            Value of the ``EXTNAME`` header.
+
+        Returns
+        -------
+        num : `int` or `None`
+            Detector number, or `None` if ``extname`` could not be
+            interpreted.
+        """
+        num = cls._EXTNAME_DETECTORS.get(extname)
+        if num is None and isinstance(extname, str):
+            try:
+                num = int(extname[3:])  # chop off "ccd"
+            except ValueError:
+                pass
+        return num
+
+    @classmethod
+    def detector_nums_from_extnames(cls, extnames):
+        """Calculate many detector numbers at once.
+
+        Parameters
+        ----------
+        extnames : iterable of `str` or `None`
+            Values of the ``EXTNAME`` header, `None` where it is missing.
+
+        Returns
+        -------
+        nums : `numpy.ndarray` of `int`
+            Detector numbers, using the dummy value for the primary HDU
+            where ``EXTNAME`` could not be interpreted.
+        """
+        nums = []
+        for extname in extnames:
+            num = cls._detector_num_from_extname(extname)
+            nums.append(cls._DUMMY_DETECTOR_NUM if num is None else num)
+        return np.array(nums, dtype=np.int64)
+
+    @classmethod
+    def detector_exposure_ids(cls, exposure_ids, detector_nums):
+        """Calculate many detector exposure IDs at once.
+
+        Parameters
+        ----------
+        exposure_ids : array-like of `int`
+            Exposure IDs, ``-1`` if unknown.
+        detector_nums : array-like of `int`
+            Detector numbers, ``-1`` if unknown.
+
+        Returns
+        -------
+        ids : `numpy.ndarray` of `int`
+            Detector exposure IDs, ``-1`` where either input was unknown.
+        """
+        return detector_exposure_ids(exposure_ids, detector_nums, cls._DETECTOR_EXPOSURE_MULTIPLIER)
 
     @cache_translation
     def to_observation_type(self):
@@ -134,8 +214,7 @@ class MegaPrimeTranslator(FitsTranslator):
         typ : `str`
             Observation type. Normalized to standard set.
         """
-        obstype = self._header["OBSTYPE"].strip().lower()
-        self._used_these_cards("OBSTYPE")
+        obstype = self._get_card_lower("OBSTYPE")
         if obstype == "object":
             return "science"
         return obstype
@@ -157,7 +236,7 @@ class MegaPrimeTranslator(FitsTranslator):
         """
         radecsys = ("RADECSYS", "OBJRADEC", "RADESYS")
         radecpairs = (("RA_DEG", "DEC_DEG"), ("BORE-RA", "BORE-DEC"))
-        return tracking_from_degree_headers(self, radecsys, radecpairs)
+        return _tracking_from_degree_headers(self, radecsys, radecpairs)
 
     @cache_translation
     def to_altaz_begin(self):
@@ -175,32 +254,29 @@ class MegaPrimeTranslator(FitsTranslator):
             The telescope coordinates.
         """
         for az_key, alt_key in (("TELAZ", "TELALT"), ("BORE-AZ", "BORE-ALT")):
-            if az_key in self._header and alt_key in self._header:
-                az = self._header[az_key]
-                alt = self._header[alt_key]
+            if self._has_card(az_key) and self._has_card(alt_key):
+                az = self._get_card_float(az_key)
+                alt = self._get_card_float(alt_key)
                 if az < 1.0 or alt < 1.0:
                     # Calibrations have magic values of -9999 when telescope not
                     # involved in observation.
                     return None
-                altaz = AltAz(az * u.deg, alt * u.deg,
-                              obstime=self.to_datetime_begin(), location=self.to_location())
-                self._used_these_cards(az_key, alt_key)
-                return altaz
+                return make_altaz_begin(self, az, alt)
         if self.to_observation_type() == "science":
-            raise KeyError("Unable to determine alt/az of science observation")
+            return _Missing("Unable to determine alt/az of science observation")
         return None
 
     @cache_translation
     def to_detector_exposure_id(self):
         # Docstring will be inherited. Property defined in properties.py
-        return self.to_exposure_id() * 36 + self.to_detector_num()
+        return self.to_exposure_id() * self._DETECTOR_EXPOSURE_MULTIPLIER + self.to_detector_num()
 
     @cache_translation
     def to_pressure(self):
         # Docstring will be inherited. Property defined in properties.py
         # Can be either AIRPRESS in Pa or PRESSURE in mbar
         for key, unit in (("PRESSURE", u.hPa), ("AIRPRESS", u.Pa)):
-            if key in self._header:
-                return self.quantity_from_card(key, unit)
+            if self._has_card(key):
+                return self._quantity_from_card(key, unit)
         else:
-            raise KeyError("Could not find pressure keywords in header")
+            return _Missing("Could not find pressure keywords in header")
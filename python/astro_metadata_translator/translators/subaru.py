@@ -23,8 +23,7 @@
 
 __all__ = ("SubaruTranslator", )
 
-from astropy.coordinates import EarthLocation
-
+from ..memo import cached_geodetic_location
 from ..translator import cache_translation
 from .fits import FitsTranslator
 
@@ -44,4 +43,4 @@ class SubaruTranslator(FitsTranslator):
         location : `astropy.coordinates.EarthLocation`
             An object representing the location of the telescope.
         """
-        return EarthLocation.from_geodetic(-155.476667, 19.825556, 4139.0)
+        return cached_geodetic_location(-155.476667, 19.825556, 4139.0)
@@ -23,14 +23,15 @@
 
 __all__ = ("SuprimeCamTranslator", )
 
-import re
 import logging
 
 import astropy.units as u
-from astropy.coordinates import SkyCoord, AltAz, Angle
+from astropy.coordinates import Angle
 
 from ..translator import cache_translation
 from .subaru import SubaruTranslator
+from .helpers import make_tracking_radec, make_altaz_begin
+from .identifiers import decode_suprimecam_exposure_id, detector_exposure_ids
 
 log = logging.getLogger(__name__)
 
@@ -62,6 +63,17 @@ class SuprimeCamTranslator(SubaruTranslator):
                     }
     """One-to-one mappings"""
 
+    _extra_cards = ("MJD", "FILTER01", "DATE-OBS", "UT", "UT-END", "EXP-ID", "FRAMEID", "DATA-TYP",
+                    "RA2000", "DEC2000", "ALTITUDE", "AZIMUTH", "INR-STR")
+    """Keywords read by the explicit translation methods."""
+
+    _dispatch_cards = ("INSTRUME", "EXP-ID", "FRAMEID")
+    """Keywords read by `can_translate`."""
+
+    _DETECTOR_EXPOSURE_MULTIPLIER = 10
+    """Multiplier applied to the exposure ID to form the detector exposure
+    ID."""
+
     # Zero point for SuprimeCam dates: 2004-01-01
     _DAY0 = 53005
 
@@ -98,34 +110,28 @@ class SuprimeCamTranslator(SubaruTranslator):
         offset : `int`
             Offset day count from reference day.
         """
-        mjd = self._header["MJD"]
-        self._used_these_cards("MJD")
-        return int(mjd) - self._DAY0
+        return int(self._get_card_float("MJD")) - self._DAY0
 
     @cache_translation
     def to_physical_filter(self):
         # Docstring will be inherited. Property defined in properties.py
-        value = self._header["FILTER01"].strip().upper()
-        self._used_these_cards("FILTER01")
-        return value
+        return self._get_card_upper("FILTER01")
 
     @cache_translation
     def to_datetime_begin(self):
         # Docstring will be inherited. Property defined in properties.py
         # We know it is UTC
-        value = self._from_fits_date_string(self._header["DATE-OBS"],
-                                            time_str=self._header["UT"], scale="utc")
-        self._used_these_cards("DATE-OBS", "UT")
-        return value
+        return self._from_fits_date_string(self._get_card("DATE-OBS"),
+                                           time_str=self._get_card("UT"), scale="utc",
+                                           raw=self._raw_time)
 
     @cache_translation
     def to_datetime_end(self):
         # Docstring will be inherited. Property defined in properties.py
         # We know it is UTC
-        value = self._from_fits_date_string(self._header["DATE-OBS"],
-                                            time_str=self._header["UT-END"], scale="utc")
-        self._used_these_cards("DATE-OBS", "UT-END")
-        return value
+        return self._from_fits_date_string(self._get_card("DATE-OBS"),
+                                           time_str=self._get_card("UT-END"), scale="utc",
+                                           raw=self._raw_time)
 
     @cache_translation
     def to_exposure_id(self):
@@ -136,19 +142,10 @@ class SuprimeCamTranslator(SubaruTranslator):
         visit : `int`
             Integer uniquely identifying this exposure.
         """
-        exp_id = self._header["EXP-ID"].strip()
-        m = re.search(r"^SUP[A-Z](\d{7})0$", exp_id)
-        if not m:
-            raise RuntimeError("Unable to interpret EXP-ID: %s" % exp_id)
-        exposure = int(m.group(1))
-        if int(exposure) == 0:
-            # Don't believe it
-            frame_id = self._header["FRAMEID"].strip()
-            m = re.search(r"^SUP[A-Z](\d{7})\d{1}$", frame_id)
-            if not m:
-                raise RuntimeError("Unable to interpret FRAMEID: %s" % frame_id)
-            exposure = int(m.group(1))
-        self._used_these_cards("EXP-ID", "FRAMEID")
+        exposure = decode_suprimecam_exposure_id(self._get_card_str("EXP-ID"))
+        if exposure is None:
+            exposure = decode_suprimecam_exposure_id(self._get_card_str("EXP-ID"),
+                                                     self._get_card_str("FRAMEID"))
         return exposure
 
     @cache_translation
@@ -175,8 +172,7 @@ class SuprimeCamTranslator(SubaruTranslator):
         typ : `str`
             Observation type. Normalized to standard set.
         """
-        obstype = self._header["DATA-TYP"].strip().lower()
-        self._used_these_cards("DATA-TYP")
+        obstype = self._get_card_lower("DATA-TYP")
         if obstype == "object":
             return "science"
         return obstype
@@ -184,24 +180,18 @@ class SuprimeCamTranslator(SubaruTranslator):
     @cache_translation
     def to_tracking_radec(self):
         # Docstring will be inherited. Property defined in properties.py
-        radec = SkyCoord(self._header["RA2000"], self._header["DEC2000"],
-                         frame="icrs", unit=(u.hourangle, u.deg),
-                         obstime=self.to_datetime_begin(), location=self.to_location())
-        self._used_these_cards("RA2000", "DEC2000")
-        return radec
+        return make_tracking_radec(self, self._get_card("RA2000"), self._get_card("DEC2000"),
+                                   frame="icrs", unit=(u.hourangle, u.deg))
 
     @cache_translation
     def to_altaz_begin(self):
         # Docstring will be inherited. Property defined in properties.py
-        altitude = self._header["ALTITUDE"]
+        altitude = self._get_card_float("ALTITUDE")
         if altitude > 90.0:
             log.warning("Clipping altitude (%f) at 90 degrees", altitude)
             altitude = 90.0
 
-        altaz = AltAz(self._header["AZIMUTH"] * u.deg, altitude * u.deg,
-                      obstime=self.to_datetime_begin(), location=self.to_location())
-        self._used_these_cards("AZIMUTH", "ALTITUDE")
-        return altaz
+        return make_altaz_begin(self, self._get_card_float("AZIMUTH"), altitude)
 
     @cache_translation
     def to_boresight_rotation_angle(self):
@@ -213,4 +203,22 @@ class SuprimeCamTranslator(SubaruTranslator):
     @cache_translation
     def to_detector_exposure_id(self):
         # Docstring will be inherited. Property defined in properties.py
-        return self.to_exposure_id() * 10 + self.to_detector_num()
+        return self.to_exposure_id() * self._DETECTOR_EXPOSURE_MULTIPLIER + self.to_detector_num()
+
+    @classmethod
+    def detector_exposure_ids(cls, exposure_ids, detector_nums):
+        """Calculate many detector exposure IDs at once.
+
+        Parameters
+        ----------
+        exposure_ids : array-like of `int`
+            Exposure IDs, ``-1`` if unknown.
+        detector_nums : array-like of `int`
+            Detector numbers, ``-1`` if unknown.
+
+        Returns
+        -------
+        ids : `numpy.ndarray` of `int`
+            Detector exposure IDs, ``-1`` where either input was unknown.
+        """
+        return detector_exposure_ids(exposure_ids, detector_nums, cls._DETECTOR_EXPOSURE_MULTIPLIER)
@@ -19,14 +19,19 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-__all__ = ("read_test_file", "MetadataAssertHelper")
+__all__ = ("read_test_file", "write_test_fits", "MetadataAssertHelper")
 
 import astropy.units as u
+import numpy as np
 import os
 import pickle
+import warnings
 import yaml
 from collections import OrderedDict
 
+from astropy.io import fits
+from astropy.io.fits.verify import VerifyWarning
+
 from astro_metadata_translator import ObservationInfo
 
 # PropertyList is optional
@@ -79,6 +84,54 @@ def read_test_file(filename):
     return header
 
 
+def write_test_fits(filename, path, hdu=0, header=None):
+    """Write the named test header to a FITS file.
+
+    Parameters
+    ----------
+    filename : `str`
+        Name of header file in the data directory.
+    path : `str`
+        Name of the FITS file to create.
+    hdu : `int`, optional
+        HDU that should contain the header.  If ``1`` the header is
+        written to an image extension following a primary HDU that contains
+        a small data array.
+    header : `dict`-like, optional
+        Header to write instead of the content of ``filename``.
+
+    Returns
+    -------
+    header : `dict`-like
+        Header that was written to the file.
+    """
+    if header is None:
+        header = read_test_file(filename)
+    fits_header = fits.Header()
+    with warnings.catch_warnings():
+        # Long keywords are converted to HIERARCH cards
+        warnings.simplefilter("ignore", category=VerifyWarning)
+        for key, value in header.items():
+            if key in ("SIMPLE", "XTENSION", "BITPIX", "EXTEND") or key.startswith("NAXIS"):
+                continue
+            if isinstance(value, list):
+                # COMMENT and HISTORY are stored as lists
+                for v in value:
+                    if key == "COMMENT":
+                        fits_header.add_comment(v)
+                    else:
+                        fits_header.add_history(v)
+            else:
+                fits_header[key] = value
+        if hdu == 0:
+            hdul = fits.HDUList([fits.PrimaryHDU(header=fits_header)])
+        else:
+            hdul = fits.HDUList([fits.PrimaryHDU(data=np.zeros((3, 5), dtype=np.int16)),
+                                 fits.ImageHDU(header=fits_header)])
+        hdul.writeto(path, overwrite=True)
+    return header
+
+
 class MetadataAssertHelper:
     """Class with helpful asserts that can be used for testing metadata
     translations.
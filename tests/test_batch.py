@@ -0,0 +1,254 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import gc
+import os.path
+import shutil
+import tempfile
+import threading
+import unittest
+import weakref
+
+from astropy.coordinates import SkyCoord, AltAz
+
+from astro_metadata_translator import ObservationInfo, MetadataTranslator, translate_files, \
+    atranslate_files, FitsTranslator, StubTranslator, DecamTranslator, translate_headers, \
+    gather_coordinates, CoordinateRecord, HeaderFingerprints, TranslationFailures
+
+from helper import write_test_fits, read_test_file, TESTDIR
+
+TEST_FILES = ("fitsheader-decam.yaml", "fitsheader-hsc.yaml", "fitsheader-megaprime.yaml")
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.files = []
+        self.headers = {}
+        for name in TEST_FILES:
+            path = os.path.join(self.tmpdir, name.replace(".yaml", ".fits"))
+            self.headers[path] = write_test_fits(name, path)
+            self.files.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_translate_files(self):
+        bad = os.path.join(self.tmpdir, "missing.fits")
+        files = self.files + [bad]
+        results = list(translate_files(files, hdu=0, max_workers=2))
+
+        # Order is preserved
+        self.assertEqual([f for f, _ in results], files)
+
+        for file, result in results[:-1]:
+            self.assertIsInstance(result, ObservationInfo)
+            self.assertEqual(result, ObservationInfo(self.headers[file]))
+
+        # Failures are returned, not raised
+        self.assertIsInstance(results[-1][1], Exception)
+
+    def test_translation_cards_only(self):
+        results = list(translate_files(self.files, hdu=0, max_workers=2, translation_cards_only=True))
+        for file, result in results:
+            self.assertEqual(result, ObservationInfo(self.headers[file]))
+
+    def test_early_close(self):
+        gen = translate_files(self.files * 5, hdu=0, max_workers=1)
+        file, result = next(gen)
+        self.assertEqual(file, self.files[0])
+        gen.close()
+
+    def test_atranslate_files(self):
+        bad = os.path.join(self.tmpdir, "missing.fits")
+        files = self.files + [bad]
+
+        async def collect():
+            return [(f, r) async for f, r in atranslate_files(files, hdu=0, concurrency=2)]
+
+        results = asyncio.run(collect())
+        self.assertEqual([f for f, _ in results], files)
+        for file, result in results[:-1]:
+            self.assertEqual(result, ObservationInfo(self.headers[file]))
+        self.assertIsInstance(results[-1][1], Exception)
+
+    def test_atranslate_backpressure(self):
+        requested = []
+
+        async def source():
+            for file in self.files * 3:
+                requested.append(file)
+                yield file
+
+        async def first():
+            agen = atranslate_files(source(), hdu=0, concurrency=2)
+            try:
+                return await agen.__anext__()
+            finally:
+                await agen.aclose()
+
+        file, result = asyncio.run(first())
+        self.assertEqual(file, self.files[0])
+        self.assertIsInstance(result, ObservationInfo)
+        # Only enough files to fill the window should have been requested
+        self.assertEqual(len(requested), 2)
+
+    def test_atranslate_cancel(self):
+        async def consume():
+            async for _ in atranslate_files(self.files * 10, hdu=0, concurrency=2):
+                await asyncio.sleep(10)
+
+        async def run():
+            task = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+
+    def test_translate_headers(self):
+        files = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+        headers = [read_test_file(f) for f in files] * 2
+        reference = [ObservationInfo(h) for h in headers]
+
+        obsinfos = translate_headers(headers)
+        self.assertEqual(obsinfos, reference)
+        for obsinfo in obsinfos:
+            if obsinfo.tracking_radec is not None:
+                self.assertIsInstance(obsinfo.tracking_radec, SkyCoord)
+            if obsinfo.altaz_begin is not None:
+                self.assertIsInstance(obsinfo.altaz_begin, AltAz)
+
+        records = translate_headers(headers, coordinates="records")
+        self.assertIsInstance(records[1].altaz_begin, CoordinateRecord)
+
+        groups = gather_coordinates(records, "altaz_begin")
+        # One group per observatory location and time scale
+        self.assertLess(len(groups), len(headers))
+        n_altaz = len([r for r in reference if r.altaz_begin is not None])
+        self.assertEqual(sum(len(indices) for indices, _ in groups), n_altaz)
+        for indices, altaz in groups:
+            self.assertEqual(altaz.shape, indices.shape)
+            for j, i in enumerate(indices):
+                self.assertAlmostEqual(altaz[j].az.degree, reference[i].altaz_begin.az.degree)
+
+        with self.assertRaises(ValueError):
+            translate_headers(headers, coordinates="arrays")
+
+    def test_fingerprints(self):
+        headers = [read_test_file(f) for f in TEST_FILES]
+        n = len(headers)
+        # An irrelevant card does not change the fingerprint but a used one
+        # does.
+        modified = dict(headers[0], XXUNUSED="value")
+        changed = dict(headers[0], OBSID="changed")
+        headers = headers + headers + [modified, changed]
+        reference = [ObservationInfo(h) for h in headers]
+
+        fingerprints = HeaderFingerprints()
+        obsinfos = translate_headers(headers, fingerprints=fingerprints)
+        self.assertEqual(obsinfos, reference)
+        self.assertEqual(sorted(sorted(g) for g in fingerprints.duplicates()),
+                         [[0, n, 2 * n]] + [[i, n + i] for i in range(1, n)])
+
+        # Each header sharing a translation keeps its own unused cards
+        self.assertIsNot(obsinfos[0], obsinfos[-2])
+        self.assertEqual(obsinfos[-2].cards_used, obsinfos[0].cards_used)
+        self.assertNotIn("XXUNUSED", obsinfos[0].stripped_header())
+        self.assertEqual(obsinfos[-2].stripped_header()["XXUNUSED"], "value")
+        self.assertEqual(obsinfos[-2].stripped_header(), reference[-2].stripped_header())
+
+        # Headers are not kept alive by the stored translations
+        class Header(dict):
+            pass
+
+        header = Header(headers[0], OBSID="weak")
+        del header["OBJECT"]
+        header_ref = weakref.ref(header)
+        n_results = len(fingerprints._results)
+        with self.assertLogs(level="WARNING"):
+            obsinfo = fingerprints.translate("weak", header)
+        self.assertEqual(len(fingerprints._results), n_results + 1)
+        del header, obsinfo
+        gc.collect()
+        self.assertIsNone(header_ref())
+
+        # Failures are recorded for every header
+        incomplete = dict(headers[0])
+        del incomplete["OBJECT"]
+        failures = TranslationFailures()
+        fingerprints = HeaderFingerprints()
+        for i, header in enumerate((incomplete, dict(incomplete, XXUNUSED="value"))):
+            fingerprints.translate(i, header, failures=failures)
+        self.assertEqual(len(fingerprints.duplicates()), 1)
+        self.assertEqual(failures.counts(), {("DecamTranslator", "object", "KeyError"): 2})
+
+        # Learned cards can be used in a later run
+        cards = fingerprints.card_sets()
+        self.assertIn("DECam", cards)
+        later = HeaderFingerprints(cards)
+        self.assertEqual(later.fingerprint(headers[0], DecamTranslator),
+                         fingerprints.fingerprint(headers[0], DecamTranslator))
+
+        fingerprints = HeaderFingerprints()
+        results = list(translate_files(self.files * 2, hdu=0, max_workers=2, fingerprints=fingerprints))
+        for file, result in results:
+            self.assertEqual(result, ObservationInfo(self.headers[file]))
+        self.assertEqual(sorted(fingerprints.duplicates()), sorted([f, f] for f in self.files))
+
+    def test_concurrent_registration(self):
+        # Register translators whilst other threads are looking up
+        # translators for headers.
+        header = {"INSTRUME": "CONCURRENT_0"}
+        errors = []
+
+        def lookup():
+            try:
+                for _ in range(50):
+                    try:
+                        MetadataTranslator.determine_translator(header)
+                    except ValueError:
+                        pass
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for i in range(20):
+            type(f"ConcurrentTranslator{i}", (FitsTranslator, StubTranslator),
+                 {"name": f"ConcurrentTest{i}", "supported_instrument": f"CONCURRENT_{i}"})
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(MetadataTranslator.determine_translator(header).name, "ConcurrentTest0")
+
+        # Remove the test translators from the registry
+        for i in range(20):
+            del MetadataTranslator.translators[f"ConcurrentTest{i}"]
+
+
+if __name__ == "__main__":
+    unittest.main()
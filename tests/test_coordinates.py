@@ -0,0 +1,91 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import os
+import pickle
+import unittest
+
+import astropy.units as u
+from astropy.time import Time
+
+from astro_metadata_translator import ObservationInfo, CoordinateRecord
+
+from helper import read_test_file, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+
+class CoordinateRecordTestCase(unittest.TestCase):
+
+    def test_record(self):
+        record = CoordinateRecord("05:00:00", "-10:30:00", "icrs", unit=(u.hourangle, u.deg),
+                                  obstime=Time("2018-01-01T00:00:00", format="isot", scale="utc"))
+        self.assertAlmostEqual(record.ra, 75.0)
+        self.assertAlmostEqual(record.dec, -10.5)
+        coord = record.to_skycoord()
+        self.assertAlmostEqual(coord.ra.degree, 75.0)
+        self.assertEqual(coord.obstime, record.obstime)
+
+        altaz = CoordinateRecord(120.0, 45.0, "altaz", obstime=56000.0)
+        self.assertTrue(altaz.is_altaz)
+        self.assertEqual(altaz.az, 120.0)
+        frame = altaz.to_altaz()
+        self.assertAlmostEqual(frame.alt.degree, 45.0)
+        self.assertAlmostEqual(frame.obstime.tai.mjd, 56000.0)
+
+        newrecord = pickle.loads(pickle.dumps(record))
+        self.assertEqual(str(newrecord), str(record))
+
+    def test_deferred_translation(self):
+        for file in TEST_FILES:
+            with self.subTest(file=file):
+                header = read_test_file(file)
+                reference = ObservationInfo(header, pedantic=True)
+                deferred = ObservationInfo(header, pedantic=True, deferred_coordinates=True)
+
+                radec = deferred.tracking_radec
+                if reference.tracking_radec is None:
+                    self.assertIsNone(radec)
+                else:
+                    self.assertIsInstance(radec, CoordinateRecord)
+                    self.assertEqual(str(radec.to_skycoord()), str(reference.tracking_radec))
+                    self.assertAlmostEqual(radec.ra, reference.tracking_radec.ra.degree)
+                    self.assertAlmostEqual(radec.dec, reference.tracking_radec.dec.degree)
+
+                altaz = deferred.altaz_begin
+                if reference.altaz_begin is None:
+                    self.assertIsNone(altaz)
+                else:
+                    self.assertIsInstance(altaz, CoordinateRecord)
+                    self.assertEqual(str(altaz.to_altaz()), str(reference.altaz_begin))
+                    self.assertAlmostEqual(altaz.alt, reference.altaz_begin.alt.degree)
+
+                simple = deferred.to_simple()
+                for column, value in reference.to_simple().items():
+                    if isinstance(value, float) and not math.isnan(value):
+                        self.assertAlmostEqual(simple[column], value, places=9, msg=column)
+
+                self.assertEqual(pickle.loads(pickle.dumps(deferred)), deferred)
+
+
+if __name__ == "__main__":
+    unittest.main()
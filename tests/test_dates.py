@@ -0,0 +1,81 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+import warnings
+
+import numpy as np
+from astropy.time import Time
+
+from astro_metadata_translator import ObservationInfo, isot_to_mjd, isot_to_mjd_array
+
+from helper import read_test_file, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+# One microsecond in days
+MICROSECOND = 1e-6 / 86400.0
+
+
+class DatesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(42)
+        with warnings.catch_warnings():
+            # Future dates beyond the leap second table are dubious
+            warnings.simplefilter("ignore")
+            self.dates = list(Time(rng.uniform(41000.0, 60000.0, 500), format="mjd", scale="utc").isot)
+        self.dates.extend(["2016-12-31T23:59:60.5", "2017-01-01", "1965-06-01T12:00:00",
+                           "2013-09-01T06:02:55.754"])
+
+    def test_isot_to_mjd(self):
+        for scale in ("utc", "tai", "tt", "tdb"):
+            for date in self.dates:
+                with self.subTest(date=date, scale=scale):
+                    expected = Time(date, format="isot", scale=scale).tai.mjd
+                    self.assertAlmostEqual(isot_to_mjd(date, scale=scale), expected,
+                                           delta=MICROSECOND)
+
+    def test_isot_to_mjd_array(self):
+        for scale in ("utc", "tai", "tt"):
+            with self.subTest(scale=scale):
+                expected = Time(self.dates, format="isot", scale=scale).tai.mjd
+                np.testing.assert_allclose(isot_to_mjd_array(self.dates, scale=scale), expected,
+                                           rtol=0.0, atol=MICROSECOND)
+
+    def test_raw_time(self):
+        for file in TEST_FILES:
+            with self.subTest(file=file):
+                header = read_test_file(file)
+                obsinfo = ObservationInfo(header)
+                raw = ObservationInfo(header, raw_time=True)
+                for name in ("datetime_begin", "datetime_end"):
+                    self.assertIsInstance(getattr(raw, name), float)
+                    self.assertAlmostEqual(getattr(raw, name), getattr(obsinfo, name).tai.mjd,
+                                           delta=MICROSECOND)
+                if obsinfo.altaz_begin is not None:
+                    self.assertAlmostEqual(raw.altaz_begin.obstime.tai.mjd,
+                                           obsinfo.altaz_begin.obstime.tai.mjd, delta=MICROSECOND)
+
+
+if __name__ == "__main__":
+    unittest.main()
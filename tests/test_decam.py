@@ -22,7 +22,7 @@
 import unittest
 import astropy.units as u
 
-from helper import MetadataAssertHelper
+from helper import MetadataAssertHelper, read_test_file
 
 
 class DecamTestCase(unittest.TestCase, MetadataAssertHelper):
@@ -93,6 +93,12 @@ class DecamTestCase(unittest.TestCase, MetadataAssertHelper):
             with self.subTest(f"Testing {file}"):
                 self.assertObservationInfoFromYaml(file, **expected)
 
+    def test_undefined_card(self):
+        # An undefined value is replaced by the default
+        header = read_test_file("fitsheader-decam.yaml")
+        header["OUTTEMP"] = None
+        self.assertObservationInfo(header, temperature=10.0*u.deg_C, wcs_params=dict(max_sep=1.5))
+
 
 if __name__ == "__main__":
     unittest.main()
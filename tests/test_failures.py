@@ -0,0 +1,87 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import unittest
+
+from astro_metadata_translator import ObservationInfo, TranslationFailures, translate_headers
+from astro_metadata_translator.translator import _Missing
+
+from helper import read_test_file
+
+
+class FailuresTestCase(unittest.TestCase):
+
+    def setUp(self):
+        header = read_test_file("fitsheader-hsc.yaml")
+        # Exposure and dark time both come from EXPTIME
+        del header["EXPTIME"]
+        self.header = header
+
+    def test_collect(self):
+        failures = TranslationFailures(max_samples=2)
+        with self.assertRaises(AssertionError):
+            # Nothing is logged for each header
+            with self.assertLogs(level=logging.WARNING):
+                for i in range(3):
+                    ObservationInfo(self.header, filename=f"file{i}.fits", failures=failures)
+        self.assertEqual(len(failures), 6)
+        self.assertEqual(failures.counts(), {("HscTranslator", "exposure_time", "KeyError"): 3,
+                                             ("HscTranslator", "dark_time", "KeyError"): 3})
+        self.assertEqual(failures.samples("HscTranslator", "dark_time", "KeyError"),
+                         ["file0.fits", "file1.fits"])
+        summary = failures.summary()
+        self.assertEqual(len(summary), 2)
+        self.assertIn("3 failures calculating property 'exposure_time'", summary[0])
+        self.assertIn("file1.fits", summary[0])
+        self.assertIn("(KeyError: Could not find ", summary[0])
+        failures.clear()
+        self.assertEqual(len(failures), 0)
+
+    def test_sentinel(self):
+        # Missing value sentinels are recorded without creating exceptions
+        failures = TranslationFailures()
+        for i in range(3):
+            failures.add("Translator", "object", _Missing("Could not find %s in header", ("OBJECT", )))
+        self.assertEqual(failures.counts(), {("Translator", "object", "KeyError"): 3})
+        self.assertIn("(KeyError: Could not find ('OBJECT',) in header)", failures.summary()[0])
+
+    def test_logging(self):
+        with self.assertLogs(level=logging.WARNING) as cm:
+            ObservationInfo(self.header, filename="file.fits")
+        self.assertEqual(len(cm.output), 2)
+        self.assertIn("'exposure_time'", cm.output[0])
+        self.assertIn("file.fits", cm.output[0])
+
+        with self.assertRaises(KeyError) as cm:
+            ObservationInfo(self.header, pedantic=True, filename="file.fits")
+        self.assertIn("file.fits", str(cm.exception))
+
+    def test_batch_summary(self):
+        failures = TranslationFailures()
+        with self.assertLogs(level=logging.WARNING) as cm:
+            translate_headers([self.header] * 5, failures=failures)
+        self.assertEqual(len(cm.output), 2)
+        self.assertIn("5 failures", cm.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from astropy.io import fits
+
+from astro_metadata_translator import MetadataTranslator, read_raw_cards, determine_translator_from_file, \
+    read_basic_metadata_from_file, ObservationInfo
+
+from helper import write_test_fits, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+
+class RawCardsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_dispatch(self):
+        keywords = MetadataTranslator.dispatch_cards()
+        self.assertTrue({"INSTRUME", "EXP-ID", "FRAMEID", "FILTER"} <= keywords)
+        for name in TEST_FILES:
+            for hdu in (0, 1):
+                with self.subTest(file=name, hdu=hdu):
+                    path = os.path.join(self.tmpdir, name.replace(".yaml", ".fits"))
+                    write_test_fits(name, path, hdu=hdu)
+                    header = read_basic_metadata_from_file(path, hdu=hdu)
+                    expected = {k: header[k] for k in keywords if k in header}
+                    self.assertEqual(read_raw_cards(path, keywords, hdu=hdu), expected)
+                    self.assertIs(determine_translator_from_file(path, hdu=hdu),
+                                  MetadataTranslator.determine_translator(header))
+
+    def test_translation_cards(self):
+        for name in TEST_FILES:
+            for hdu in (0, 1):
+                with self.subTest(file=name, hdu=hdu):
+                    path = os.path.join(self.tmpdir, name.replace(".yaml", ".fits"))
+                    write_test_fits(name, path, hdu=hdu)
+                    translator_class = determine_translator_from_file(path, hdu=hdu)
+                    keywords = translator_class.translation_cards()
+                    header = read_basic_metadata_from_file(path, hdu=hdu, keywords=keywords)
+                    self.assertIsInstance(header, dict)
+                    self.assertLessEqual(set(header), keywords)
+                    full = read_basic_metadata_from_file(path, hdu=hdu)
+                    self.assertLess(len(header), len(full))
+                    self.assertEqual(ObservationInfo(header, translator_class=translator_class),
+                                     ObservationInfo(full))
+
+    def test_values(self):
+        path = os.path.join(self.tmpdir, "values.fits")
+        header = fits.Header()
+        header["STR"] = "it's  "
+        header["INT"] = (42, "comment")
+        header["FLT"] = -1.5e3
+        header["BOOL"] = False
+        header["EMPTY"] = ""
+        header["LONGSTR"] = "long string with 'quotes' " * 10
+        header["AMP"] = "ends in &"
+        header["HIERARCH ESO DET ID"] = "CCD 1"
+        header["HIERARCH LONGKEYWORD"] = 3.5
+        header["STR"] = "duplicate"
+        fits.PrimaryHDU(header=header).writeto(path)
+        keywords = ("STR", "INT", "FLT", "BOOL", "EMPTY", "LONGSTR", "AMP", "ESO DET ID", "LONGKEYWORD",
+                    "MISSING")
+        full = fits.getheader(path)
+        self.assertEqual(read_raw_cards(path, keywords, hdu=0), {k: full[k] for k in keywords if k in full})
+
+    def test_unreadable(self):
+        path = os.path.join(self.tmpdir, "unsupported.fits")
+        write_test_fits(None, path, header={"INSTRUME": "Unknown"})
+        with self.assertRaises(ValueError):
+            determine_translator_from_file(path, hdu=0)
+        # There is no second HDU
+        self.assertIsNone(determine_translator_from_file(path, hdu=1))
+
+        path = os.path.join(self.tmpdir, "text.fits")
+        with open(path, "w") as fd:
+            fd.write("Not a FITS file")
+        self.assertIsNone(read_raw_cards(path, ("INSTRUME", )))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+import numpy as np
+
+from astro_metadata_translator import (ObservationInfo, HscTranslator, DecamTranslator, MegaPrimeTranslator,
+                                       SuprimeCamTranslator)
+from astro_metadata_translator.translators.identifiers import (decode_hsc_exposure_id,
+                                                               decode_hsc_exposure_ids,
+                                                               decode_suprimecam_exposure_id,
+                                                               decode_suprimecam_exposure_ids,
+                                                               calib_id_field, calib_id_fields,
+                                                               detector_exposure_ids)
+
+from helper import read_test_file
+
+
+class IdentifiersTestCase(unittest.TestCase):
+
+    def test_hsc(self):
+        test_data = (("HSCE00123456", None, 123456),
+                     ("HSCA90402400", None, 904024),
+                     ("HSCB00000200", None, 1000002),
+                     ("HSCA04090000", None, 40900),
+                     ("HSCA00000000", "HSCA04090107", 40900),
+                     ("HSCA00000000", "HSCA04090207", 40902),
+                     ("HSCA00000000", "HSCC00000101", 2000000),
+                     )
+        for exp_id, frame_id, expected in test_data:
+            with self.subTest(exp_id=exp_id, frame_id=frame_id):
+                self.assertEqual(decode_hsc_exposure_id(exp_id, frame_id), expected)
+        self.assertIsNone(decode_hsc_exposure_id("HSCA00000000"))
+        with self.assertRaises(RuntimeError):
+            decode_hsc_exposure_id("HSCA04090001")
+        with self.assertRaises(RuntimeError):
+            decode_hsc_exposure_id("HSCA00000000", "SUPA00000000")
+
+        exp_ids = [d[0] for d in test_data] + ["HSCA04090001", "HSCA00000000", "HSCE1234567", "HSCé00000000"]
+        frame_ids = [d[1] or "" for d in test_data] + ["", "SUPA00000000", "", ""]
+        np.testing.assert_array_equal(decode_hsc_exposure_ids(exp_ids, frame_ids),
+                                      [d[2] for d in test_data] + [-1, -1, -1, -1])
+        self.assertEqual(decode_hsc_exposure_ids(["HSCA00000000"])[0], -1)
+
+    def test_suprimecam(self):
+        test_data = (("SUPE00535770", None, 53577),
+                     ("SUPE00000000", "SUPA00535771", 53577),
+                     )
+        for exp_id, frame_id, expected in test_data:
+            with self.subTest(exp_id=exp_id, frame_id=frame_id):
+                self.assertEqual(decode_suprimecam_exposure_id(exp_id, frame_id), expected)
+        self.assertIsNone(decode_suprimecam_exposure_id("SUPE00000000"))
+        with self.assertRaises(RuntimeError):
+            decode_suprimecam_exposure_id("SUPE00535771")
+
+        exp_ids = [d[0] for d in test_data] + ["SUPE00535771", "HSCE00535770", "SUPE0053577"]
+        frame_ids = [d[1] or "" for d in test_data] + ["", "", ""]
+        np.testing.assert_array_equal(decode_suprimecam_exposure_ids(exp_ids, frame_ids),
+                                      [d[2] for d in test_data] + [-1, -1, -1])
+
+    def test_calib_id(self):
+        calib_id = "filter=g ccdnum=10 calibDate=2017-01-01"
+        self.assertEqual(calib_id_field(calib_id, "filter"), "g")
+        self.assertEqual(calib_id_field(calib_id, "ccdnum"), "10")
+        self.assertIsNone(calib_id_field(calib_id, "visit"))
+        self.assertEqual(calib_id_fields([calib_id, "ccdnum=3"], "ccdnum"), ["10", "3"])
+
+    def test_detector_exposure_ids(self):
+        np.testing.assert_array_equal(detector_exposure_ids([10, -1, 12], [5, 3, -1], 200),
+                                      [2005, -1, -1])
+
+    def test_detector_tables(self):
+        nums = HscTranslator.detector_nums_from_raw([112, 50, 115, 200, 112], [400, 400, 400, 400, 500])
+        np.testing.assert_array_equal(nums, [106, 50, 109, 200, 112])
+        np.testing.assert_array_equal(HscTranslator.detector_nums_from_raw([112]), [112])
+        extnames = ["ccd02", "ccd7", None, "PRIMARY"]
+        np.testing.assert_array_equal(MegaPrimeTranslator.detector_nums_from_extnames(extnames),
+                                      [2, 7, 99, 99])
+
+    def test_batch_detector_exposure_ids(self):
+        test_data = (("fitsheader-hsc.yaml", HscTranslator),
+                     ("fitsheader-decam.yaml", DecamTranslator),
+                     ("fitsheader-megaprime.yaml", MegaPrimeTranslator),
+                     ("fitsheader-suprimecam-CORR40535770.yaml", SuprimeCamTranslator),
+                     )
+        for file, translator in test_data:
+            with self.subTest(file=file):
+                obsinfo = ObservationInfo(read_test_file(file), translator_class=translator)
+                ids = translator.detector_exposure_ids([obsinfo.exposure_id, -1], [obsinfo.detector_num, 1])
+                np.testing.assert_array_equal(ids, [obsinfo.detector_exposure_id, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from astro_metadata_translator import ObservationIndex, ObservationInfo, find_files
+
+from helper import write_test_fits
+
+TEST_FILES = ("fitsheader-decam.yaml", "fitsheader-hsc.yaml", "fitsheader-megaprime.yaml",
+              "fitsheader-megaprime-calexp-849375-14.yaml")
+
+
+class ObservationIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.datadir = os.path.join(self.tmpdir, "data")
+        os.makedirs(os.path.join(self.datadir, "sub"))
+        self.headers = {}
+        for i, name in enumerate(TEST_FILES):
+            subdir = "sub" if i % 2 else ""
+            path = os.path.join(self.datadir, subdir, name.replace(".yaml", ".fits"))
+            self.headers[path] = write_test_fits(name, path, hdu=1)
+        with open(os.path.join(self.datadir, "notes.txt"), "w") as fh:
+            print("Not a FITS file", file=fh)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_find_files(self):
+        regex = r"\.fit[s]?\b"
+        self.assertEqual(len(list(find_files([self.datadir], regex))), 2)
+        self.assertEqual(sorted(find_files([self.datadir], regex, recursive=True)), sorted(self.headers))
+        self.assertEqual(list(find_files(["a.txt"], regex)), ["a.txt"])
+
+    def test_index(self):
+        dbfile = os.path.join(self.tmpdir, "index.sqlite3")
+        files = list(self.headers) + [os.path.join(self.datadir, "notes.txt")]
+        with ObservationIndex(dbfile) as index:
+            n_added, failed = index.add_files(files)
+            self.assertEqual(n_added, len(self.headers))
+            self.assertEqual([f for f, _ in failed], files[-1:])
+
+        # Reopen and query
+        with ObservationIndex(dbfile) as index:
+            self.assertEqual(len(index), len(self.headers))
+            for path, header in self.headers.items():
+                self.assertIn(path, index)
+                obsinfo = ObservationInfo(header)
+                indexed = index.observation_info(path)
+                for p in ("instrument", "exposure_id", "physical_filter", "observation_type"):
+                    self.assertEqual(getattr(indexed, p), getattr(obsinfo, p), msg=p)
+                self.assertEqual(indexed.datetime_begin.tai.isot, obsinfo.datetime_begin.tai.isot)
+
+            rows = index.query(instrument="MegaPrime")
+            self.assertEqual(len(rows), 2)
+            self.assertLessEqual(rows[0]["datetime_begin"], rows[1]["datetime_begin"])
+
+            rows = index.query(instrument="MegaPrime", physical_filter="r")
+            self.assertEqual([r["exposure_id"] for r in rows], [849375])
+
+            rows = index.query(observation_type="science", begin="2013-01-01T00:00:00")
+            self.assertEqual({r["instrument"] for r in rows}, {"DECam", "HSC"})
+            rows = index.query(end=rows[0]["datetime_begin"])
+            self.assertEqual({r["instrument"] for r in rows}, {"MegaPrime"})
+
+            rows = index.query(where="exposure_time > ?", parameters=(400.0, ), order_by="exposure_id")
+            self.assertEqual([r["instrument"] for r in rows], ["MegaPrime"])
+            self.assertEqual(len(index.query(limit=1)), 1)
+            with self.assertRaises(ValueError):
+                index.query(order_by="unknown; DROP TABLE observations")
+
+            self.assertTrue(index.remove(rows[0]["path"]))
+            self.assertFalse(index.remove(rows[0]["path"]))
+            self.assertEqual(len(index), len(self.headers) - 1)
+            with self.assertRaises(KeyError):
+                index.observation_info(rows[0]["path"])
+
+    def test_update(self):
+        index = ObservationIndex()
+        files = list(self.headers)
+        summary = index.update(files)
+        self.assertEqual(summary["added"], len(files))
+        self.assertEqual(summary["failed"], [])
+
+        # Nothing has changed
+        summary = index.update(files)
+        self.assertEqual(summary["unchanged"], len(files))
+        self.assertEqual(summary["added"] + summary["updated"] + summary["touched"], 0)
+
+        # Modification time changes without changing the header
+        stat = os.stat(files[0])
+        os.utime(files[0], (stat.st_atime, stat.st_mtime + 10))
+        # Header changes
+        header = self.headers[files[1]]
+        header["OBJECT"] = "Changed"
+        write_test_fits(TEST_FILES[1], files[1], hdu=1, header=header)
+        os.utime(files[1], (stat.st_atime, stat.st_mtime + 20))
+        # File deleted
+        os.remove(files[2])
+
+        summary = index.update(files[:2] + files[3:])
+        self.assertEqual(summary["touched"], 1)
+        self.assertEqual(summary["updated"], 1)
+        self.assertEqual(summary["unchanged"], 1)
+        self.assertEqual(summary["deleted"], 1)
+        self.assertEqual(index.observation_info(files[1]).object, "Changed")
+        self.assertNotIn(files[2], index)
+        self.assertEqual(index.deleted_paths(), [files[2]])
+        self.assertEqual(len(index), len(files) - 1)
+        self.assertEqual(len(index.query()), len(files) - 1)
+
+        # A new translator version means the rows are out of date
+        self.assertEqual(index.outdated_paths(), [])
+        translator_class = ObservationInfo(self.headers[files[0]]).translator_class
+        original = translator_class.translator_version
+        try:
+            translator_class.translator_version = "999"
+            self.assertEqual(index.outdated_paths(), [files[0]])
+            summary = index.update_outdated()
+            self.assertEqual(summary["updated"], 1)
+            self.assertEqual(index.outdated_paths(), [])
+        finally:
+            translator_class.translator_version = original
+
+        # The deleted file returns
+        write_test_fits(TEST_FILES[2], files[2], hdu=1)
+        summary = index.update(files)
+        self.assertEqual(summary["added"], 1)
+        self.assertEqual(index.deleted_paths(), [])
+        self.assertEqual(len(index), len(files))
+
+
+if __name__ == "__main__":
+    unittest.main()
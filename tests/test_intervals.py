@@ -0,0 +1,90 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+
+import numpy as np
+import astropy.units as u
+from astropy.time import Time
+
+from astro_metadata_translator import ObservationInfo, IntervalIndex, as_tai_mjd
+
+from helper import read_test_file, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+
+class IntervalIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        n = 5000
+        self.begin = np.sort(rng.uniform(58000.0, 58010.0, n))
+        self.end = self.begin + rng.exponential(0.01, n)
+        # Make a long interval that starts early
+        self.end[10] = 58009.0
+        self.begin[20] = np.nan
+        rng.shuffle(self.begin)
+        self.index = IntervalIndex(self.begin, self.end)
+
+    def test_overlapping(self):
+        self.assertEqual(len(self.index), len(self.begin) - 1)
+        for begin, end in ((58003.0, 58003.1), (58005.5, None), (57990.0, 57991.0), (58009.5, 58020.0)):
+            with self.subTest(begin=begin, end=end):
+                stop = begin if end is None else end
+                with np.errstate(invalid="ignore"):
+                    expected = set(np.flatnonzero((self.begin <= stop) & (self.end >= begin)))
+                found = self.index.overlapping(begin, end)
+                self.assertEqual(set(found), expected)
+                self.assertTrue(np.all(np.diff(self.begin[found]) >= 0))
+
+        time = Time(58003.0, format="mjd", scale="tai")
+        np.testing.assert_array_equal(self.index.overlapping(time, time + 0.1*u.day),
+                                      self.index.overlapping(58003.0, 58003.1))
+
+    def test_nearest_before(self):
+        times = [57000.0, 58004.0, 58015.0]
+        found = self.index.nearest_before(times)
+        self.assertEqual(found[0], -1)
+        with np.errstate(invalid="ignore"):
+            ends = np.where(np.isfinite(self.begin), self.end, np.nan)
+            self.assertEqual(found[1], np.nanargmax(np.where(ends <= 58004.0, ends, np.nan)))
+            begins = np.where(self.begin <= 58015.0, self.begin, np.nan)
+        self.assertEqual(self.index.nearest_before(58015.0, use_end=False), np.nanargmax(begins))
+        self.assertIsInstance(self.index.nearest_before(58004.0), int)
+        self.assertEqual(IntervalIndex([]).nearest_before(58004.0), -1)
+
+    def test_observations(self):
+        obsinfos = [ObservationInfo(read_test_file(file)) for file in TEST_FILES]
+        index = IntervalIndex.from_observations(obsinfos)
+        self.assertEqual(len(index), len(obsinfos))
+        for i, obsinfo in enumerate(obsinfos):
+            self.assertIn(i, index.overlapping(obsinfo.datetime_begin))
+        science = IntervalIndex.from_observations(obsinfos, observation_types=["science"])
+        self.assertEqual(len(science), sum(o.observation_type == "science" for o in obsinfos))
+
+        last = max(range(len(obsinfos)), key=lambda i: as_tai_mjd(obsinfos[i].datetime_end))
+        self.assertEqual(index.nearest_before("2020-01-01T00:00:00"), last)
+
+
+if __name__ == "__main__":
+    unittest.main()
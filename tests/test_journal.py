@@ -0,0 +1,90 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import math
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from astro_metadata_translator import ObservationInfo, TranslationJournal
+
+from helper import read_test_file
+
+
+class JournalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "journal.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_journal(self):
+        self.assertEqual(TranslationJournal.read(self.path), {})
+        obsinfo = ObservationInfo(read_test_file("fitsheader-hsc.yaml"))
+        with TranslationJournal(self.path) as journal:
+            journal.record("a.fits", obsinfo)
+            journal.record_failure("b.fits", ValueError("bad header"))
+            journal.record_failure("c.fits", "unreadable")
+
+        # Simulate a crash part way through writing a record
+        with open(self.path, "a") as fd:
+            fd.write('{"path": "d.fits", "observ')
+
+        with TranslationJournal(self.path) as journal:
+            journal.record("c.fits", obsinfo)
+
+        records = TranslationJournal.read(self.path)
+        self.assertEqual(set(records), {"a.fits", "b.fits", "c.fits"})
+        self.assertEqual(records["b.fits"]["error"], "ValueError('bad header')")
+        # The latest record wins
+        self.assertIn("observation", records["c.fits"])
+        restored = ObservationInfo.from_simple(records["a.fits"]["observation"])
+        self.assertEqual(restored.exposure_id, obsinfo.exposure_id)
+        self.assertEqual(restored.datetime_begin.tai.isot, obsinfo.datetime_begin.tai.isot)
+
+    def test_nan(self):
+        obsinfo = ObservationInfo(read_test_file("fitsheader-hsc.yaml"))
+        # Translators can calculate NaN values
+        obsinfo._relative_humidity = math.nan
+        self.assertTrue(math.isnan(obsinfo.to_simple()["relative_humidity"]))
+        with TranslationJournal(self.path) as journal:
+            journal.record("a.fits", obsinfo)
+
+        def reject(constant):
+            raise ValueError(f"Invalid JSON constant {constant}")
+
+        # The journal is strictly valid JSON
+        with open(self.path) as fd:
+            json.loads(fd.read(), parse_constant=reject)
+
+        records = TranslationJournal.read(self.path)
+        self.assertIsNone(records["a.fits"]["observation"]["relative_humidity"])
+        restored = ObservationInfo.from_simple(records["a.fits"]["observation"])
+        self.assertIsNone(restored.relative_humidity)
+        self.assertEqual(restored.exposure_id, obsinfo.exposure_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import threading
+import unittest
+
+import astropy.units as u
+
+from astro_metadata_translator import (ObservationInfo, MemoCache, memo_statistics, set_memo_limits,
+                                       clear_memo_caches, cached_geodetic_location)
+
+from helper import read_test_file
+
+
+class MemoTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        set_memo_limits(maxsize=1024)
+        clear_memo_caches()
+
+    def test_cache(self):
+        cache = MemoCache("test", maxsize=2)
+        self.assertEqual(cache.get("a", lambda: 1), 1)
+        self.assertEqual(cache.get("a", lambda: 2), 1)
+        cache.get("b", lambda: 3)
+        # Access "a" so that "b" is the oldest entry
+        cache.get("a", lambda: 4)
+        cache.get("c", lambda: 5)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("b", lambda: 6), 6)
+        stats = cache.statistics()
+        self.assertEqual(stats["hits"], 2)
+        self.assertEqual(stats["misses"], 4)
+        self.assertEqual(stats["evictions"], 2)
+        self.assertEqual(stats["hit_rate"], 2 / 6)
+
+        cache.maxsize = 0
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get("d", lambda: 7), 7)
+        self.assertEqual(len(cache), 0)
+        with self.assertRaises(ValueError):
+            cache.maxsize = -1
+
+    def test_threads(self):
+        cache = MemoCache("threads", maxsize=8)
+
+        def work():
+            for i in range(1000):
+                cache.get(i % 16, lambda: i % 16)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = cache.statistics()
+        self.assertEqual(stats["hits"] + stats["misses"], 4000)
+        self.assertLessEqual(stats["size"], 8)
+
+    def test_constructors(self):
+        clear_memo_caches()
+        location = cached_geodetic_location(-155.476667, 19.825556, 4139.0)
+        # Each caller gets its own modifiable copy
+        other = cached_geodetic_location(-155.476667, 19.825556, 4139.0)
+        self.assertIsNot(other, location)
+        self.assertEqual(other, location)
+        location[...] = cached_geodetic_location(0.0, 0.0)
+        self.assertNotEqual(other, location)
+        self.assertEqual(cached_geodetic_location(-155.476667, 19.825556, 4139.0), other)
+
+        # NaN keys would never be reused
+        cached_geodetic_location(math.nan, 19.825556)
+        stats = memo_statistics()
+        self.assertEqual(stats["cached_geodetic_location"]["size"], 2)
+        self.assertEqual(stats["cached_geodetic_location"]["hits"], 2)
+
+        with self.assertRaises(KeyError):
+            set_memo_limits(not_a_cache=5)
+        set_memo_limits(maxsize=0, cached_site_location=10)
+        self.assertEqual(memo_statistics()["cached_geodetic_location"]["maxsize"], 0)
+        self.assertEqual(memo_statistics()["cached_site_location"]["maxsize"], 10)
+
+    def test_translation(self):
+        clear_memo_caches()
+        header = read_test_file("fitsheader-hsc.yaml")
+        v1 = ObservationInfo(header)
+        v2 = ObservationInfo(header)
+        self.assertIsNot(v1.location, v2.location)
+        self.assertEqual(v1.location, v2.location)
+        self.assertEqual(v1, v2)
+        self.assertGreater(memo_statistics()["cached_geodetic_location"]["hits"], 0)
+
+        # Values read from each header are not shared
+        self.assertIsNot(v1.exposure_time, v2.exposure_time)
+        exposure_time = v1.exposure_time
+        exposure_time += 1*u.s
+        self.assertEqual(v1.exposure_time, v2.exposure_time + 1*u.s)
+
+
+if __name__ == "__main__":
+    unittest.main()
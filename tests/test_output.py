@@ -0,0 +1,107 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import csv
+import io
+import json
+import math
+import os
+import unittest
+
+from astropy.table import Table
+
+from astro_metadata_translator import ObservationInfo, COLUMNS, make_writer
+from astro_metadata_translator.output import pyarrow
+
+from helper import read_test_file, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+
+class OutputTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.rows = [(file, ObservationInfo(read_test_file(file)).to_simple()) for file in TEST_FILES]
+
+    def write(self, format, stream, chunk_size=3):
+        with make_writer(format, stream, chunk_size=chunk_size) as writer:
+            for file, simple in self.rows:
+                writer.write(file, simple)
+        return stream
+
+    def assertRowsEqual(self, rows):  # noqa: N802
+        self.assertEqual(len(rows), len(self.rows))
+        for row, (file, simple) in zip(rows, self.rows):
+            self.assertEqual(row["path"], file)
+            for name in COLUMNS:
+                expected = simple[name]
+                if expected is None or (isinstance(expected, float) and math.isnan(expected)):
+                    self.assertIn(row[name], (None, ""), msg=name)
+                elif isinstance(expected, float):
+                    self.assertAlmostEqual(float(row[name]), expected, msg=name)
+                else:
+                    self.assertEqual(type(expected)(row[name]), expected, msg=name)
+
+    def test_jsonl(self):
+        stream = self.write("jsonl", io.StringIO())
+        self.assertRowsEqual([json.loads(line) for line in stream.getvalue().splitlines()])
+
+    def test_csv(self):
+        stream = self.write("csv", io.StringIO())
+        self.assertRowsEqual(list(csv.DictReader(io.StringIO(stream.getvalue()))))
+
+    def test_ecsv(self):
+        stream = self.write("ecsv", io.StringIO())
+        table = Table.read(stream.getvalue(), format="ascii.ecsv")
+        self.assertEqual(table["exposure_id"].dtype.kind, "i")
+        self.assertEqual(table["datetime_begin"].dtype.kind, "f")
+        rows = [{name: (None if table[name].mask[i] else table[name][i]) if hasattr(table[name], "mask")
+                 else table[name][i] for name in table.colnames} for i in range(len(table))]
+        self.assertRowsEqual(rows)
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet(self):
+        import pyarrow.parquet
+        stream = self.write("parquet", io.BytesIO())
+        stream.seek(0)
+        self.assertRowsEqual(pyarrow.parquet.read_table(stream).to_pylist())
+
+    def test_streaming(self):
+        # Rows are available before the writer is closed
+        for format in ("jsonl", "csv", "ecsv"):
+            with self.subTest(format=format):
+                stream = io.StringIO()
+                writer = make_writer(format, stream)
+                file, simple = self.rows[0]
+                writer.write(file, simple)
+                self.assertIn(file, stream.getvalue())
+                writer.close()
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            make_writer("yaml", io.StringIO())
+        if pyarrow is None:
+            with self.assertRaises(ImportError):
+                make_writer("parquet", io.BytesIO())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import os
+import unittest
+
+from astropy.io import fits
+
+from astro_metadata_translator import ObservationInfo, pack_headers, unpack_headers, pack_columns, \
+    unpack_columns, translate_headers_multiprocess, COLUMNS
+
+from helper import read_test_file, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+
+class SerializationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.headers = [read_test_file(f) for f in TEST_FILES]
+
+    def test_pack_headers(self):
+        packed = pack_headers(self.headers)
+        headers = unpack_headers(packed)
+        self.assertEqual(len(headers), len(self.headers))
+        for original, header in zip(self.headers, headers):
+            self.assertEqual(header, dict(original))
+            self.assertEqual(ObservationInfo(header), ObservationInfo(original))
+
+    def test_pack_fits_header(self):
+        header = fits.Header()
+        header["INSTRUME"] = "DECam"
+        header["EXPTIME"] = 30.0
+        header["NEXTEND"] = 62
+        header["PHOTFLAG"] = True
+        header["UNDEF"] = None
+        header.add_comment("first")
+        header.add_comment("second")
+        unpacked, = unpack_headers(pack_headers([header]))
+        self.assertEqual(unpacked["INSTRUME"], "DECam")
+        self.assertIsInstance(unpacked["EXPTIME"], float)
+        self.assertIsInstance(unpacked["NEXTEND"], int)
+        self.assertIs(unpacked["PHOTFLAG"], True)
+        self.assertEqual(unpacked["COMMENT"], ["first", "second"])
+
+    def test_simple(self):
+        for file, header in zip(TEST_FILES, self.headers):
+            with self.subTest(file=file):
+                obsinfo = ObservationInfo(header)
+                simple = obsinfo.to_simple()
+                self.assertEqual(set(simple), set(COLUMNS))
+                newinfo = ObservationInfo.from_simple(simple)
+                for column, value in newinfo.to_simple().items():
+                    if isinstance(value, float):
+                        if math.isnan(value):
+                            self.assertTrue(math.isnan(simple[column]))
+                        else:
+                            self.assertAlmostEqual(value, simple[column], places=6, msg=column)
+                    else:
+                        self.assertEqual(value, simple[column], msg=column)
+                for p in ("instrument", "exposure_id", "observation_type", "exposure_time", "location"):
+                    self.assertEqual(str(getattr(newinfo, p)), str(getattr(obsinfo, p)), msg=p)
+                self.assertEqual(newinfo.datetime_begin.tai.isot, obsinfo.datetime_begin.tai.isot)
+
+        rows = [ObservationInfo(h).to_simple() for h in self.headers] + [None]
+        columns = unpack_columns(pack_columns(rows))
+        self.assertEqual(columns["exposure_id"][:-1], [r["exposure_id"] for r in rows[:-1]])
+        self.assertIsNone(columns["exposure_id"][-1])
+
+    def test_multiprocess(self):
+        headers = self.headers + [{"NOTHING": "HERE"}]
+        expected = [ObservationInfo(h).to_simple() for h in self.headers]
+        for shared_memory in (True, False):
+            with self.subTest(shared_memory=shared_memory):
+                columns, errors = translate_headers_multiprocess(headers, processes=2, chunksize=3,
+                                                                 shared_memory=shared_memory)
+                self.assertEqual(list(errors), [len(self.headers)])
+                self.assertEqual(columns["instrument"][:-1], [e["instrument"] for e in expected])
+                self.assertIsNone(columns["instrument"][-1])
+                self.assertEqual(columns["exposure_id"][-1], -1)
+                self.assertEqual(list(columns["exposure_id"][:-1]),
+                                 [-1 if e["exposure_id"] is None else e["exposure_id"] for e in expected])
+                self.assertEqual(list(columns["datetime_begin"][:-1]),
+                                 [e["datetime_begin"] for e in expected])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os.path
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+
+from astro_metadata_translator import ObservationInfo, TranslationServer, TranslationClient
+
+from helper import write_test_fits, read_test_file
+
+
+class ServerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.socket = os.path.join(self.tmpdir, "translate.sock")
+        self.server = TranslationServer(self.socket, hdu=0)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        self.assertFalse(os.path.exists(self.socket))
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def assertTranslationEqual(self, obsinfo, reference):
+        for name in ("instrument", "exposure_id", "physical_filter", "observation_type", "detector_num"):
+            self.assertEqual(getattr(obsinfo, name), getattr(reference, name), msg=name)
+        self.assertEqual(obsinfo.datetime_begin.tai.isot, reference.datetime_begin.tai.isot)
+
+    def test_translate(self):
+        path = os.path.join(self.tmpdir, "hsc.fits")
+        header = write_test_fits("fitsheader-hsc.yaml", path)
+        reference = ObservationInfo(header)
+        with TranslationClient(self.socket) as client:
+            self.assertTranslationEqual(client.translate_file(path), reference)
+            # Several requests can share a connection
+            self.assertTranslationEqual(client.translate_file(path, hdu=0), reference)
+
+            header = read_test_file("fitsheader-decam.yaml")
+            self.assertTranslationEqual(client.translate_header(header), ObservationInfo(header))
+
+            with self.assertRaises(RuntimeError):
+                client.translate_file(os.path.join(self.tmpdir, "missing.fits"))
+            with self.assertRaises(RuntimeError):
+                client.translate_header({"INSTRUME": "Unknown"})
+
+    def test_translation_cards_only(self):
+        path = os.path.join(self.tmpdir, "hsc.fits")
+        write_test_fits("fitsheader-hsc.yaml", path)
+        # The full header is read by default
+        obsinfo = self.server.translate({"file": path})
+        self.assertIn("SIMPLE", obsinfo.stripped_header())
+
+        server = TranslationServer(os.path.join(self.tmpdir, "cards.sock"), hdu=0,
+                                   translation_cards_only=True)
+        try:
+            obsinfo = server.translate({"file": path})
+        finally:
+            server.server_close()
+        self.assertNotIn("SIMPLE", obsinfo.stripped_header())
+        self.assertEqual(obsinfo.exposure_id, self.server.translate({"file": path}).exposure_id)
+
+    def test_bad_requests(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket)
+            with sock.makefile("rb") as responses:
+                for request in (b"not json\n", b"[1, 2]\n", b"{}\n"):
+                    sock.sendall(request)
+                    self.assertIn(b"error", responses.readline())
+
+    def test_existing_path(self):
+        # A regular file is not replaced
+        path = os.path.join(self.tmpdir, "regular")
+        with open(path, "w") as fd:
+            fd.write("content")
+        with self.assertRaises(FileExistsError):
+            TranslationServer(path)
+        with open(path) as fd:
+            self.assertEqual(fd.read(), "content")
+
+        # Nor is the socket of a running server
+        with self.assertRaises(OSError):
+            TranslationServer(self.socket)
+        self.assertTrue(os.path.exists(self.socket))
+        with TranslationClient(self.socket) as client:
+            header = read_test_file("fitsheader-decam.yaml")
+            self.assertTranslationEqual(client.translate_header(header), ObservationInfo(header))
+
+        # A socket with no server is replaced
+        stale = os.path.join(self.tmpdir, "stale.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(stale)
+        server = TranslationServer(stale)
+        server.server_close()
+        self.assertFalse(os.path.exists(stale))
+
+
+if __name__ == "__main__":
+    unittest.main()
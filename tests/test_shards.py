@@ -0,0 +1,97 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import io
+import json
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from astro_metadata_translator import ObservationInfo, TranslationJournal, make_writer, parse_shard, \
+    shard_index, select_shard, merge_shards
+
+from helper import read_test_file
+
+
+class ShardsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/5"), (2, 5))
+        for bad in ("5/5", "-1/5", "1", "a/b", "0/0"):
+            with self.subTest(spec=bad):
+                with self.assertRaises(ValueError):
+                    parse_shard(bad)
+
+    def test_select_shard(self):
+        files = [f"dir{d}/file{i}.fits" for d in range(10) for i in range(20)]
+        shards = [list(select_shard(files, i, 4)) for i in range(4)]
+        self.assertEqual(sorted(f for shard in shards for f in shard), sorted(files))
+        self.assertTrue(all(shards))
+        # Assignment does not depend on the other files in the list
+        self.assertEqual(list(select_shard(files[::-1], 1, 4)), shards[1][::-1])
+        self.assertEqual(shard_index("./dir1//file1.fits", 4), shard_index("dir1/file1.fits", 4))
+
+        for i in range(4):
+            directories = {os.path.dirname(f) for f in select_shard(files, i, 4, by="directory")}
+            for j in range(4):
+                if j != i:
+                    others = {os.path.dirname(f) for f in select_shard(files, j, 4, by="directory")}
+                    self.assertFalse(directories & others)
+        with self.assertRaises(ValueError):
+            shard_index("file.fits", 4, by="size")
+
+    def test_merge(self):
+        hsc = ObservationInfo(read_test_file("fitsheader-hsc.yaml"))
+        decam = ObservationInfo(read_test_file("fitsheader-decam.yaml"))
+
+        shard0 = os.path.join(self.tmpdir, "shard0.jsonl")
+        with open(shard0, "w") as fd:
+            with make_writer("jsonl", fd) as writer:
+                writer.write("a.fits", hsc)
+                writer.write("b.fits", decam)
+
+        # A second shard that is a journal, translating a copy of a.fits
+        # and overlapping with the first shard.
+        shard1 = os.path.join(self.tmpdir, "shard1.jsonl")
+        with TranslationJournal(shard1) as journal:
+            journal.record("copy-of-a.fits", hsc)
+            journal.record("b.fits", decam)
+            journal.record_failure("c.fits", "unreadable")
+
+        output = io.StringIO()
+        with make_writer("jsonl", output) as writer:
+            rows, duplicates = merge_shards([shard0, shard1], writer=writer)
+        self.assertEqual([r["path"] for r in rows], ["a.fits", "b.fits", "copy-of-a.fits"])
+        self.assertEqual(duplicates, {("HSC", hsc.exposure_id, hsc.detector_exposure_id):
+                                      ["a.fits", "copy-of-a.fits"]})
+        written = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(written, rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+
+import numpy as np
+import astropy.units as u
+from astropy.coordinates import SkyCoord
+
+from astro_metadata_translator import ObservationInfo, ObservationIndex, SpatialIndex
+
+from helper import read_test_file, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+
+class SpatialIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1234)
+        n = 20000
+        self.ra = rng.uniform(0.0, 360.0, n)
+        self.dec = np.degrees(np.arcsin(rng.uniform(-1.0, 1.0, n)))
+        self.ra[:3] = np.nan
+        self.coords = SkyCoord(self.ra, self.dec, unit=u.deg)
+
+    def test_cone_search(self):
+        index = SpatialIndex(self.ra, self.dec, band_height=0.5)
+        self.assertEqual(len(index), len(self.ra) - 3)
+        # Include the poles and the RA wrap
+        for ra, dec, radius in ((10.0, 20.0, 2.0), (359.5, -5.0, 3.0), (0.2, 0.0, 1.0),
+                                (180.0, 89.0, 2.5), (45.0, -88.5, 2.0), (100.0, 60.0, 25.0),
+                                (200.0, 30.0, 0.001), (0.0, 0.0, 180.0)):
+            with self.subTest(ra=ra, dec=dec, radius=radius):
+                separation = self.coords.separation(SkyCoord(ra, dec, unit=u.deg)).degree
+                expected = set(np.flatnonzero(separation <= radius))
+                indices, found = index.cone_search(ra, dec, radius, return_separation=True)
+                self.assertEqual(set(indices), expected)
+                self.assertTrue(np.all(np.diff(found) >= 0))
+                np.testing.assert_allclose(found, separation[indices], atol=1e-9)
+
+        # Quantities are accepted
+        np.testing.assert_array_equal(index.cone_search(10.0*u.deg, 20.0*u.deg, 2.0*u.deg),
+                                      index.cone_search(10.0, 20.0, 2.0))
+
+    def test_observations(self):
+        obsinfos = [ObservationInfo(read_test_file(file)) for file in TEST_FILES]
+        index = SpatialIndex.from_observations(obsinfos)
+        with_coords = [i for i, o in enumerate(obsinfos) if o.tracking_radec is not None]
+        self.assertEqual(len(index), len(with_coords))
+        for i in with_coords:
+            radec = obsinfos[i].tracking_radec.icrs
+            self.assertIn(i, index.cone_search(radec.ra, radec.dec, 1*u.arcsec))
+
+        db = ObservationIndex()
+        for file, obsinfo in zip(TEST_FILES, obsinfos):
+            db.add(file, obsinfo)
+        radec = obsinfos[with_coords[0]].tracking_radec.icrs
+        rows = db.cone_search(radec.ra, radec.dec, 1.0)
+        self.assertEqual(rows[0]["path"], os.path.abspath(TEST_FILES[with_coords[0]]))
+        self.assertLess(rows[0]["separation"], 1e-6)
+        db.remove(TEST_FILES[with_coords[0]])
+        self.assertNotIn(os.path.abspath(TEST_FILES[with_coords[0]]),
+                         [r["path"] for r in db.cone_search(radec.ra, radec.dec, 1.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
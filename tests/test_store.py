@@ -0,0 +1,113 @@
+# This file is part of astro_metadata_translator.
+#
+# Developed for the LSST Data Management System.
+# This product includes software developed by the LSST Project
+# (http://www.lsst.org).
+# See the COPYRIGHT file at the top-level directory of this distribution
+# for details of code ownership.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from astro_metadata_translator import ObservationInfo, ObservationStore, write_observation_store, COLUMNS
+
+from helper import read_test_file, TESTDIR
+
+TEST_FILES = sorted(os.listdir(os.path.join(TESTDIR, "data")))
+
+
+class StoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.obsinfos = [ObservationInfo(read_test_file(f)) for f in TEST_FILES]
+        self.simple = [o.to_simple() for o in self.obsinfos]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def assertSimpleEqual(self, simple, reference):
+        for name in COLUMNS:
+            value = reference[name]
+            if isinstance(value, float) and math.isnan(value):
+                value = None
+            self.assertEqual(simple[name], value, msg=name)
+
+    def test_round_trip(self):
+        path = os.path.join(self.tmpdir, "store")
+        write_observation_store(path, self.obsinfos)
+        store = ObservationStore(path)
+        self.assertEqual(len(store), len(self.obsinfos))
+        self.assertIsInstance(store.array, np.memmap)
+
+        for i, reference in enumerate(self.simple):
+            with self.subTest(file=TEST_FILES[i]):
+                self.assertSimpleEqual(store.simple(i), reference)
+                obsinfo = store[i]
+                self.assertEqual(obsinfo.exposure_id, self.obsinfos[i].exposure_id)
+                self.assertEqual(obsinfo.physical_filter, self.obsinfos[i].physical_filter)
+
+        np.testing.assert_array_equal(store.column("exposure_id"),
+                                      [-1 if s["exposure_id"] is None else s["exposure_id"]
+                                       for s in self.simple])
+        self.assertEqual(list(store.column("instrument")), [s["instrument"] for s in self.simple])
+        self.assertEqual(len(store.dictionary("instrument")), len({s["instrument"] for s in self.simple}))
+        self.assertEqual(len(list(store)), len(store))
+
+    def test_where(self):
+        store = write_observation_store(os.path.join(self.tmpdir, "store"), self.simple)
+        expected = [i for i, s in enumerate(self.simple) if s["instrument"] == "HSC"]
+        self.assertGreater(len(expected), 0)
+        np.testing.assert_array_equal(store.where(instrument="HSC"), expected)
+        expected = [i for i, s in enumerate(self.simple)
+                    if s["instrument"] == "HSC" and s["observation_type"] == "science"]
+        np.testing.assert_array_equal(store.where(instrument="HSC", observation_type="science"), expected)
+        self.assertEqual(len(store.where(instrument="NotAnInstrument")), 0)
+
+        # Mostly unique columns are not held in dictionaries
+        with self.assertRaises(ValueError):
+            store.dictionary("observation_id")
+        self.assertNotIn("observation_id", store.array.dtype.names)
+        for i, simple in enumerate(self.simple):
+            np.testing.assert_array_equal(store.where(observation_id=simple["observation_id"]), [i])
+            self.assertEqual(store.column("observation_id")[i], simple["observation_id"])
+        expected = [i for i, s in enumerate(self.simple) if s["object"] is None]
+        np.testing.assert_array_equal(store.where(object=None), expected)
+        self.assertEqual(len(store.where(observation_id="unknown")), 0)
+        self.assertEqual(store.simple(-1)["observation_id"], self.simple[-1]["observation_id"])
+        with self.assertRaises(ValueError):
+            store.where(exposure_id=1)
+
+    def test_columns(self):
+        columns = {c: [s[c] for s in self.simple] for c in COLUMNS}
+        path = os.path.join(self.tmpdir, "store")
+        store = write_observation_store(path, columns)
+        for i, reference in enumerate(self.simple):
+            self.assertSimpleEqual(store.simple(i), reference)
+
+        with self.assertRaises(FileExistsError):
+            write_observation_store(path, self.simple)
+        store = write_observation_store(path, self.simple[:2], overwrite=True)
+        self.assertEqual(len(store), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -19,10 +19,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import unittest
 from astropy.time import Time
 
-from astro_metadata_translator import FitsTranslator, StubTranslator, ObservationInfo
+from astro_metadata_translator import FitsTranslator, StubTranslator, ObservationInfo, \
+    cache_translation
+from astro_metadata_translator.translator import _trivial_map_keywords
+
+from helper import read_test_file, TESTDIR
 
 
 class InstrumentTestTranslator(FitsTranslator, StubTranslator):
@@ -42,6 +47,26 @@ class InstrumentTestTranslator(FitsTranslator, StubTranslator):
     _const_map = {"format": "HDF5"}
 
 
+class LegacyTestTranslator(InstrumentTestTranslator):
+    """Translator signalling a missing value by raising"""
+
+    name = None
+
+    @cache_translation
+    def to_physical_filter(self):
+        raise KeyError("No filter")
+
+
+def static_card_names(translator_class):
+    """Return the keywords declared by the trivial mappings and
+    ``_extra_cards`` of a translation class and its parents."""
+    names = set()
+    for base in translator_class.__mro__:
+        names.update(_trivial_map_keywords(base.__dict__.get("_trivial_map", {})))
+        names.update(base.__dict__.get("_extra_cards", ()))
+    return names
+
+
 class TranslatorTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -77,6 +102,76 @@ class TranslatorTestCase(unittest.TestCase):
         self.assertEqual(translator.to_format(), "HDF5")
         self.assertEqual(translator.to_foobar(), "bar")
 
+    def test_card_accessors(self):
+        header = dict(self.header)
+        header["OBSTYPE"] = " Object "
+        header["AIRTEMP"] = "12.5"
+        translator = FitsTranslator(header)
+
+        self.assertEqual(translator._get_card_lower("OBSTYPE"), "object")
+        self.assertEqual(translator._get_card_upper("OBSTYPE"), "OBJECT")
+        self.assertEqual(translator._get_card_str("OBSTYPE"), "Object")
+        self.assertEqual(translator._get_card("OBSTYPE"), " Object ")
+        self.assertEqual(translator._get_card_float(["TEMPERAT", "AIRTEMP"]), 12.5)
+        self.assertEqual(translator._get_card_float("OBSGEO-X"), -5464588.84421314)
+
+        # Memoized values are used even if the header is modified
+        header["OBSTYPE"] = "dark"
+        self.assertEqual(translator._get_card_lower("OBSTYPE"), "object")
+
+        # Defaults are not recorded as used
+        self.assertEqual(translator._get_card_str("NOTHERE", default="none"), "none")
+        with self.assertRaises(KeyError):
+            translator._get_card_str("NOTHERE")
+        self.assertTrue(translator._has_card("BAZ"))
+        self.assertFalse(translator._has_card("NOTHERE"))
+
+        self.assertEqual(translator.cards_used(), frozenset(["OBSTYPE", "AIRTEMP", "OBSGEO-X"]))
+
+    def test_missing_values(self):
+        header = dict(self.header)
+        del header["BAZ"]
+        del header["OBSID"]
+        translator = InstrumentTestTranslator(header)
+
+        # Public methods raise
+        with self.assertRaisesRegex(KeyError, "Could not find .*BAZ"):
+            translator.to_foobar()
+
+        # Missing values are cached and reported without raising
+        missing = translator._translate("foobar")
+        self.assertIs(translator._translate("foobar"), missing)
+        self.assertIn("BAZ", missing.reason)
+        self.assertEqual(translator._translate("instrument"), "SCUBA_test")
+
+        # Methods can still raise to signal a missing value
+        translator = LegacyTestTranslator(header)
+        self.assertEqual(translator._translate("physical_filter").reason, "'No filter'")
+        with self.assertRaisesRegex(KeyError, "No filter"):
+            translator.to_physical_filter()
+
+        # The header can not be recognized without an instrument
+        del header["INSTRUME"]
+        self.assertFalse(InstrumentTestTranslator.can_translate(header))
+
+    def test_missing_observation_info(self):
+        header = dict(self.header)
+        del header["OBSID"]
+
+        with self.assertRaises(KeyError) as cm:
+            with self.assertWarns(UserWarning):
+                ObservationInfo(header, translator_class=InstrumentTestTranslator, pedantic=True)
+        self.assertIn("'observation_id'", str(cm.exception))
+        self.assertIsInstance(cm.exception.__cause__, KeyError)
+        self.assertIn("OBSID", str(cm.exception.__cause__))
+
+        with self.assertLogs(level="WARNING") as cm:
+            with self.assertWarns(UserWarning):
+                obsinfo = ObservationInfo(header, translator_class=InstrumentTestTranslator)
+        self.assertIsNone(obsinfo.observation_id)
+        self.assertEqual(obsinfo.telescope, "LSST")
+        self.assertTrue(any("observation_id" in line for line in cm.output))
+
     def test_translator(self):
         header = self.header
 
@@ -109,6 +204,38 @@ class TranslatorTestCase(unittest.TestCase):
         self.assertIn("OBSGEO-Y", used)
         self.assertNotIn("TELESCOP", used)
 
+    def test_card_tracking(self):
+        for file in sorted(os.listdir(os.path.join(TESTDIR, "data"))):
+            with self.subTest(file=file):
+                header = read_test_file(file)
+                reference = ObservationInfo(header)
+                used = reference.cards_used
+
+                bitmask = ObservationInfo(header, card_tracking="bitmask")
+                self.assertEqual(bitmask, reference)
+                self.assertEqual(bitmask.cards_used, used)
+                self.assertEqual(bitmask.stripped_header(), reference.stripped_header())
+
+                # All the cards used are known in advance by the class.
+                # Bitmask tracking appends unknown cards to _card_names so
+                # the static tables are checked directly.
+                translator_class = type(bitmask._translator)
+                self.assertLessEqual(used, static_card_names(translator_class))
+
+                untracked = ObservationInfo(header, card_tracking=None)
+                self.assertEqual(untracked, reference)
+                self.assertEqual(untracked.cards_used, frozenset())
+
+        # Keywords unknown to the class are assigned new bits
+        translator = InstrumentTestTranslator(self.header, card_tracking="bitmask")
+        translator._used_these_cards("NEWCARD1", "BAZ")
+        translator._used_these_cards("NEWCARD1")
+        self.assertEqual(translator.cards_used(), frozenset(["NEWCARD1", "BAZ"]))
+        self.assertIn("NEWCARD1", InstrumentTestTranslator._card_names)
+
+        with self.assertRaises(ValueError):
+            InstrumentTestTranslator(self.header, card_tracking="list")
+
 
 if __name__ == "__main__":
     unittest.main()